@@ -0,0 +1,112 @@
+"""
+Dynamic Micro-Batching Module
+Coalesces concurrent single-row predictions into batched model calls
+
+Every model call has a large fixed cost (Keras ``predict`` in particular), so
+rows from concurrent requests are queued per model and scored together. A
+batch is dispatched as soon as it holds ``max_batch_size`` rows or the oldest
+row has waited ``max_wait_ms`` milliseconds, whichever comes first.
+"""
+
+import os
+import asyncio
+import numpy as np
+
+
+class MicroBatcher:
+    """Per-model request queues drained into batched scaler and model calls"""
+
+    def __init__(self, score_batch, max_batch_size=32, max_wait_ms=5.0):
+        """
+        Initialize the batcher.
+
+        Args:
+            score_batch: Coroutine function (features, model_name) returning
+                (predicted class indices, probabilities) for a feature matrix,
+                optionally followed by values that describe the whole batch,
+                such as its timings
+            max_batch_size (int): Largest number of rows per model call
+            max_wait_ms (float): Longest time the first row of a batch waits
+        """
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queues = {}
+        self._tasks = {}
+        self._loop = None
+
+    @classmethod
+    def from_env(cls, score_batch):
+        """Build a batcher from the BATCH_MAX_SIZE and BATCH_MAX_WAIT_MS environment variables."""
+        return cls(
+            score_batch,
+            max_batch_size=int(os.environ.get('BATCH_MAX_SIZE', 32)),
+            max_wait_ms=float(os.environ.get('BATCH_MAX_WAIT_MS', 5.0)),
+        )
+
+    def _queue(self, model_name):
+        """Return the queue for a model, starting its dispatcher on first use."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and tasks belong to one event loop
+            self._queues, self._tasks, self._loop = {}, {}, loop
+        if model_name not in self._queues:
+            self._queues[model_name] = asyncio.Queue()
+            self._tasks[model_name] = loop.create_task(self._dispatch(model_name))
+        return self._queues[model_name]
+
+    async def predict(self, features, model_name):
+        """
+        Score one feature vector as part of the next batch for its model.
+
+        Args:
+            features (np.ndarray): Feature vector of length n_mfcc
+            model_name (str): Name of the model to use
+
+        Returns:
+            tuple: (predicted class index, probability vector), followed by
+                any batch values returned by score_batch
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue(model_name).put((np.ravel(features), future))
+        return await future
+
+    async def _dispatch(self, model_name):
+        """Collect rows for one model and score them batch by batch."""
+        queue = self._queues[model_name]
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up (timeouts, disconnects) are skipped
+            batch = [(row, future) for row, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                features = np.vstack([row for row, _ in batch])
+                predicted_class_idx, probabilities, *shared = await self.score_batch(features, model_name)
+                for i, (_, future) in enumerate(batch):
+                    if not future.done():
+                        future.set_result((predicted_class_idx[i], probabilities[i], *shared))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def shutdown(self):
+        """Cancel the dispatcher tasks."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._queues, self._tasks, self._loop = {}, {}, None
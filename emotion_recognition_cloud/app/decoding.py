@@ -0,0 +1,416 @@
+"""
+Audio Decoding Module
+Streams compressed uploads to PCM and resamples them to the model rate
+
+WAV, FLAC, OGG and MP3 are decoded block by block with libsndfile
+(soundfile); containers it cannot read, such as M4A, are decoded by an
+ffmpeg subprocess whose PCM output is read from a pipe. Either way the
+samples arrive as int16 blocks that are resampled on the fly by a
+polyphase filter, so no intermediate WAV file or full-length copy of the
+decoded signal is ever needed.
+"""
+
+import io
+import os
+import json
+import math
+import struct
+import shutil
+import tempfile
+import subprocess
+from functools import partial
+import numpy as np
+import soundfile
+from scipy.signal import firwin, upfirdn
+
+# Sample frames decoded per block
+DECODE_BLOCK_FRAMES = 1 << 16
+
+# Leading bytes of the containers scipy.io.wavfile reads
+WAV_MAGIC = (b'RIFF', b'RIFX', b'RF64')
+
+
+def is_wav(source):
+    """Whether a path, buffer or file-like object holds a WAV container."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:4]) in WAV_MAGIC
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(4) in WAV_MAGIC
+    position = source.tell()
+    magic = source.read(4)
+    source.seek(position)
+    return magic in WAV_MAGIC
+
+
+# WAVE format tags scipy.io.wavfile can read: PCM, IEEE float and extensible
+WAV_FORMAT_PCM = 0x0001
+WAV_FORMAT_FLOAT = 0x0003
+WAV_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def to_int16_scale(signal):
+    """
+    Bring samples read by scipy.io.wavfile to the int16 scale the extractor expects.
+
+    int16 passes through unchanged. 8-bit unsigned, 24- and 32-bit integer
+    and IEEE float samples are rescaled with full scale at 32768, so every
+    encoding of a recording gives the same features.
+    """
+    if signal.dtype == np.int16:
+        return signal
+    if signal.dtype == np.uint8:
+        return (signal.astype(np.int16) - 128) * 256
+    if signal.dtype.kind == 'i':
+        # wavfile left-justifies 24-bit samples in int32
+        return np.divide(signal, 1 << (8 * signal.itemsize - 16), dtype=np.float32)
+    if signal.dtype.kind == 'f':
+        return signal * signal.dtype.type(32768)
+    raise ValueError(f"Unsupported WAV sample type {signal.dtype}")
+
+
+# Size field meaning "unknown" in streamed WAVs and "see ds64" in RF64
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+class WavHeader:
+    """Format and size of a WAV stream, read from its first bytes"""
+
+    def __init__(self, format_tag, channels, sample_rate, bits_per_sample, block_align,
+                 data_bytes):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits_per_sample = bits_per_sample
+        self.block_align = block_align
+        # None when the writer did not know the length
+        self.data_bytes = data_bytes
+
+    @property
+    def duration(self):
+        """Length in seconds, or None when the data size is unknown."""
+        if self.data_bytes is None or not self.block_align or not self.sample_rate:
+            return None
+        return self.data_bytes // self.block_align / self.sample_rate
+
+
+def parse_wav_header(head):
+    """
+    Parse the format and data size of a WAV stream from its leading bytes.
+
+    Chunks are walked up to the start of the data chunk, so head only needs
+    to cover the header, not the samples.
+
+    Args:
+        head (bytes): First bytes of a RIFF, RIFX or RF64 stream
+
+    Returns:
+        WavHeader: The stream's format, with the subformat of extensible files resolved
+
+    Raises:
+        ValueError: If head is not a WAV stream or ends before the data chunk
+    """
+    if len(head) < 12 or head[:4] not in WAV_MAGIC or head[8:12] != b'WAVE':
+        raise ValueError("Not a WAV file")
+    endian = '>' if head[:4] == b'RIFX' else '<'
+    fmt = None
+    ds64_data_bytes = None
+    position = 12
+    while position + 8 <= len(head):
+        chunk_id = head[position:position + 4]
+        (size,) = struct.unpack(endian + 'I', head[position + 4:position + 8])
+        body = head[position + 8:position + 8 + size]
+        if chunk_id == b'ds64' and len(body) >= 16:
+            (ds64_data_bytes,) = struct.unpack(endian + 'Q', body[8:16])
+        elif chunk_id == b'fmt ':
+            if len(body) < 16:
+                raise ValueError("Truncated WAV fmt chunk")
+            fmt = struct.unpack(endian + 'HHIIHH', body[:16])
+            if fmt[0] == WAV_FORMAT_EXTENSIBLE and len(body) >= 26:
+                # The first two bytes of the subformat GUID are the actual format tag
+                (subformat,) = struct.unpack(endian + 'H', body[24:26])
+                fmt = (subformat,) + fmt[1:]
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            if size == _UNKNOWN_SIZE:
+                data_bytes = ds64_data_bytes
+            else:
+                data_bytes = size or None
+            format_tag, channels, sample_rate, _, block_align, bits = fmt
+            return WavHeader(format_tag, channels, sample_rate, bits, block_align, data_bytes)
+        # Chunks are word aligned
+        position += 8 + size + (size & 1)
+    raise ValueError("WAV header does not end within the first bytes of the file")
+
+
+class PolyphaseResampler:
+    """
+    Chunked rational resampling, equal to scipy.signal.resample_poly.
+
+    The anti-aliasing filter is the one resample_poly designs (Kaiser
+    window, beta 5, ten zero crossings per side). Only the input samples
+    still inside the filter support are kept between chunks, so the
+    concatenated output of push() and finish() matches resampling the
+    whole signal at once.
+    """
+
+    def __init__(self, fs_in, fs_out):
+        """
+        Initialize the resampler.
+
+        Args:
+            fs_in (int): Input sample rate in Hz
+            fs_out (int): Output sample rate in Hz
+        """
+        gcd = math.gcd(int(fs_in), int(fs_out))
+        self.up = int(fs_out) // gcd
+        self.down = int(fs_in) // gcd
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        h = firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * self.up
+        # Same delay compensation as resample_poly
+        n_pre_pad = self.down - half_len % self.down
+        self.filter = np.concatenate((np.zeros(n_pre_pad), h))
+        self.delay = (half_len + n_pre_pad) // self.down
+
+        self.n_in = 0
+        self.n_out = 0
+        self._buffer = None
+        self._start = 0
+        self._next = 0
+
+    def _compute(self):
+        """Outputs whose filter support is complete, after the delay is dropped."""
+        n_available = self._start + len(self._buffer)
+        last = ((n_available - 1) * self.up) // self.down
+        if n_available == 0 or last < self._next:
+            return self._buffer[:0]
+
+        # The buffer starts on a multiple of down, so outputs align with it
+        offset = self._start * self.up // self.down
+        y = upfirdn(self.filter, self._buffer, self.up, self.down, axis=0)
+        out = y[self._next - offset:last - offset + 1]
+        first = self._next
+        self._next = last + 1
+
+        # Drop the input no later output can reach
+        needed = -(-(self._next * self.down - len(self.filter) + 1) // self.up)
+        keep_from = max(self._start, needed - needed % self.down)
+        self._buffer = self._buffer[keep_from - self._start:]
+        self._start = keep_from
+        return out[max(0, self.delay - first):]
+
+    def push(self, block):
+        """
+        Resample the next block of samples along axis 0.
+
+        Returns:
+            np.ndarray: The float64 output samples that block completes
+        """
+        block = np.asarray(block, dtype=np.float64)
+        self.n_in += len(block)
+        if self._buffer is None:
+            self._buffer = block
+        else:
+            self._buffer = np.concatenate((self._buffer, block))
+        out = self._compute()
+        self.n_out += len(out)
+        return out
+
+    def finish(self):
+        """Flush the filter tail; the total output length is ceil(n_in * up / down)."""
+        if self._buffer is None:
+            return np.empty(0)
+        total = -(-self.n_in * self.up // self.down)
+        last = self.delay + total - 1
+        n_needed = -(-last * self.down // self.up) + 1
+        n_pad = max(0, n_needed - self._start - len(self._buffer))
+        self._buffer = np.concatenate(
+            (self._buffer, np.zeros((n_pad,) + self._buffer.shape[1:]))
+        )
+        out = self._compute()[:total - self.n_out]
+        self.n_out += len(out)
+        return out
+
+
+def resample(signal, fs_in, fs_out):
+    """Resample a whole signal along axis 0 with PolyphaseResampler."""
+    if int(fs_in) == int(fs_out):
+        return signal
+    resampler = PolyphaseResampler(fs_in, fs_out)
+    head = resampler.push(signal)
+    return np.concatenate((head, resampler.finish()))
+
+
+class DecodedBlocks:
+    """
+    Iterator over decoded blocks that owns its decoder resources.
+
+    Generators only run their cleanup once iteration has started, so the
+    open file, subprocess or temporary copy behind the blocks is released
+    by close() instead, which callers must reach even when they fail
+    before reading a block. Usable as a context manager.
+    """
+
+    def __init__(self, blocks, cleanup=None):
+        """
+        Args:
+            blocks: Iterator of decoded blocks
+            cleanup: Called once by close() after the iterator is closed
+        """
+        self._blocks = blocks
+        self._cleanup = cleanup
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._blocks)
+
+    def close(self):
+        """Stop decoding and release the decoder; safe to call more than once."""
+        close = getattr(self._blocks, 'close', None)
+        if close is not None:
+            close()
+        cleanup, self._cleanup = self._cleanup, None
+        if cleanup is not None:
+            cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def _soundfile_blocks(sound_file, block_frames):
+    yield from sound_file.blocks(block_frames, dtype='int16', always_2d=True)
+
+
+def _ffmpeg_input(source):
+    """Return a seekable input path for ffmpeg and whether it is a temporary copy."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source), False
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    source.seek(0)
+    # MP4 containers may keep their index at the end, so ffmpeg needs to seek
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        shutil.copyfileobj(source, f)
+    return f.name, True
+
+
+def _ffmpeg_stream_info(path):
+    """Sample rate and channel count of the first audio stream."""
+    probe = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+         '-show_entries', 'stream=sample_rate,channels', '-of', 'json', path],
+        capture_output=True, check=True
+    )
+    streams = json.loads(probe.stdout).get('streams')
+    if not streams:
+        raise ValueError("No audio stream found")
+    return int(streams[0]['sample_rate']), int(streams[0]['channels'])
+
+
+def _ffmpeg_blocks(path, channels, block_frames):
+    process = subprocess.Popen(
+        ['ffmpeg', '-v', 'error', '-i', path, '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        block_bytes = 2 * channels * block_frames
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            usable = len(data) - len(data) % (2 * channels)
+            yield np.frombuffer(data[:usable], dtype='<i2').reshape(-1, channels)
+        if process.wait() != 0:
+            raise ValueError(f"ffmpeg failed: {process.stderr.read().decode(errors='replace').strip()}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def _unlink(path):
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+def decode_blocks(source, block_frames=DECODE_BLOCK_FRAMES):
+    """
+    Open any supported audio source for block-wise decoding.
+
+    Args:
+        source: File path, encoded bytes or a binary file-like object
+        block_frames (int): Sample frames per decoded block
+
+    Returns:
+        tuple: (sample rate, channels, DecodedBlocks of int16 blocks of
+            shape (n, channels)); close the blocks when done
+
+    Raises:
+        ValueError: If neither libsndfile nor ffmpeg can decode the source
+    """
+    data = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+    try:
+        sound_file = soundfile.SoundFile(data)
+        blocks = DecodedBlocks(_soundfile_blocks(sound_file, block_frames), sound_file.close)
+        return sound_file.samplerate, sound_file.channels, blocks
+    except RuntimeError:
+        pass
+
+    path, temporary = _ffmpeg_input(data)
+    try:
+        fs, channels = _ffmpeg_stream_info(path)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        if temporary:
+            os.unlink(path)
+        raise ValueError(f"Unsupported or corrupt audio: {str(e)}") from e
+    blocks = _ffmpeg_blocks(path, channels, block_frames)
+    return fs, channels, DecodedBlocks(blocks, partial(_unlink, path) if temporary else None)
+
+
+def decode_stream(source, sample_rate=None, block_frames=DECODE_BLOCK_FRAMES):
+    """
+    Decode a source block by block, resampled to sample_rate when given.
+
+    Returns:
+        tuple: (output sample rate, channels, DecodedBlocks of (n, channels)
+            blocks); resampled blocks are float64 on the int16 scale
+    """
+    fs, channels, blocks = decode_blocks(source, block_frames)
+    if not sample_rate or int(sample_rate) == fs:
+        return fs, channels, blocks
+
+    def resampled():
+        resampler = PolyphaseResampler(fs, sample_rate)
+        for block in blocks:
+            out = resampler.push(block)
+            if len(out):
+                yield out
+        tail = resampler.finish()
+        if len(tail):
+            yield tail
+
+    return int(sample_rate), channels, DecodedBlocks(resampled(), blocks.close)
+
+
+def decode_audio(source, sample_rate=None):
+    """
+    Decode a whole source into one array.
+
+    Returns:
+        tuple: (sample rate, signal), mono signals as 1-D arrays like wavfile.read
+    """
+    fs, channels, blocks = decode_stream(source, sample_rate)
+    with blocks:
+        decoded = list(blocks)
+    signal = np.concatenate(decoded) if decoded else np.empty((0, channels), dtype=np.int16)
+    return fs, signal[:, 0] if channels == 1 else signal
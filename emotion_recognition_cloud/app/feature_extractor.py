@@ -1,6 +1,9 @@
 """
 MFCC Feature Extraction Module
 Extracted from the Complete Emotion Recognition Pipeline notebook
+
+This is the reference implementation. The API serves features through the
+vectorized engine in mfcc_engine.py, which is checked against this class.
 """
 
 import numpy as np
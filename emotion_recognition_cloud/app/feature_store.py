@@ -0,0 +1,141 @@
+"""
+Feature Store Module
+Append-only, content-addressed storage of MFCC feature vectors
+
+Each extractor parameter set gets its own directory holding two files that
+only ever grow: ``vectors.bin`` with one fixed-size float64 row per entry,
+readable as a memory map, and ``keys.txt`` with the SHA-256 digest of the
+audio file stored in the matching row. A row is written before its key, so
+after a crash the store is repaired on open by dropping any trailing row or
+partial key line that has no counterpart.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+
+from .mfcc_engine import params_digest
+
+# Default extractor parameters, matching MelFreqCepsCoef
+DEFAULT_PARAMS = {
+    'n_mfcc': 40,
+    'frame_length': 0.03,
+    'overlap': 50,
+    'n_filters': 22,
+}
+
+KEYS_FILE = 'keys.txt'
+VECTORS_FILE = 'vectors.bin'
+PARAMS_FILE = 'params.json'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """Content-addressed feature vectors for one extractor parameter set"""
+
+    def __init__(self, root, params=None):
+        """
+        Open or create the store for a parameter set under root.
+
+        Args:
+            root (str): Directory holding all parameter sets
+            params (dict): Extractor parameters, DEFAULT_PARAMS when omitted
+        """
+        self.params = dict(params or DEFAULT_PARAMS)
+        self.n_mfcc = self.params['n_mfcc']
+        self.row_bytes = self.n_mfcc * np.dtype(np.float64).itemsize
+        self.path = os.path.join(root, params_digest(self.params))
+        os.makedirs(self.path, exist_ok=True)
+
+        params_path = os.path.join(self.path, PARAMS_FILE)
+        if not os.path.exists(params_path):
+            with open(params_path, 'w') as f:
+                json.dump(self.params, f, indent=2, sort_keys=True)
+
+        self.keys_path = os.path.join(self.path, KEYS_FILE)
+        self.vectors_path = os.path.join(self.path, VECTORS_FILE)
+        self._index = {}
+        self.__Recover()
+
+    def __Recover(self):
+        """Load the key index and truncate any half-written tail."""
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    keys.append(line.decode('ascii').strip())
+
+        n_rows = 0
+        if os.path.exists(self.vectors_path):
+            n_rows = os.path.getsize(self.vectors_path) // self.row_bytes
+
+        n_entries = min(len(keys), n_rows)
+        keys = keys[:n_entries]
+        keys_bytes = sum(len(key) + 1 for key in keys)
+
+        with open(self.keys_path, 'ab') as f:
+            f.truncate(keys_bytes)
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(n_entries * self.row_bytes)
+
+        self._index = {key: row for row, key in enumerate(keys)}
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def add(self, keys, features):
+        """
+        Append feature vectors for new content digests.
+
+        Vectors are flushed to disk before their keys, so an interrupted
+        write never leaves a key pointing at a missing row.
+
+        Args:
+            keys (list): Content digests, one per row
+            features (np.ndarray): Feature matrix of shape (len(keys), n_mfcc)
+        """
+        new = [(key, row) for key, row in zip(keys, features) if key not in self._index]
+        if not new:
+            return
+
+        # Duplicate content within one call is stored once
+        unique = dict(new)
+        rows = np.asarray(list(unique.values()), dtype=np.float64).reshape(-1, self.n_mfcc)
+        with open(self.vectors_path, 'ab') as f:
+            f.write(rows.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.keys_path, 'a') as f:
+            f.write(''.join(f'{key}\n' for key in unique))
+            f.flush()
+            os.fsync(f.fileno())
+
+        start = len(self._index)
+        for offset, key in enumerate(unique):
+            self._index[key] = start + offset
+
+    def vectors(self):
+        """Memory-mapped (n_entries, n_mfcc) view of all stored vectors."""
+        if not self._index:
+            return np.empty((0, self.n_mfcc))
+        return np.memmap(self.vectors_path, dtype=np.float64, mode='r',
+                         shape=(len(self._index), self.n_mfcc))
+
+    def get_many(self, keys):
+        """Return the stored vectors for keys as a (len(keys), n_mfcc) array."""
+        rows = [self._index[key] for key in keys]
+        return np.asarray(self.vectors()[rows]) if rows else np.empty((0, self.n_mfcc))
@@ -0,0 +1,157 @@
+"""
+KNN Serving Backend
+Nearest-neighbor emotion classifier answering label and probabilities in one query
+
+The scikit-learn classifier runs a full neighbor search for ``predict`` and
+again for ``predict_proba``. KNNIndex keeps the training vectors in one
+contiguous float32 matrix, searches once per batch and derives both outputs
+from the same neighbors. Searches are exact: brute force with BLAS matrix
+products by default, or a prebuilt KD-tree persisted next to the model.
+"""
+
+import os
+import pickle
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Query rows scored per distance matrix, bounding its memory
+QUERY_CHUNK = 256
+
+BACKENDS = ('brute', 'kdtree')
+
+
+class KNNIndex:
+    """Euclidean k-nearest-neighbor classifier over a float32 reference set"""
+
+    def __init__(self, reference, labels, classes, n_neighbors=5, weights='uniform', tree=None):
+        """
+        Initialize the index.
+
+        Args:
+            reference (np.ndarray): Training vectors of shape (n_reference, n_features)
+            labels (np.ndarray): Index into classes for every reference vector
+            classes (np.ndarray): Class values returned by predict
+            n_neighbors (int): Number of neighbors that vote
+            weights (str): 'uniform' or 'distance', as in scikit-learn
+            tree (cKDTree): Optional prebuilt tree over reference
+        """
+        if weights not in ('uniform', 'distance'):
+            raise ValueError(f"Unsupported weights '{weights}'")
+        self.reference = np.ascontiguousarray(reference, dtype=np.float32)
+        self.labels = np.asarray(labels, dtype=np.intp)
+        self.classes_ = np.asarray(classes)
+        self.n_neighbors = min(int(n_neighbors), len(self.reference))
+        self.weights = weights
+        self.tree = tree
+        self._reference_sq = np.einsum('ij,ij->i', self.reference, self.reference)
+
+    @classmethod
+    def from_sklearn(cls, model, backend='brute'):
+        """
+        Build an index from a fitted KNeighborsClassifier.
+
+        Raises:
+            ValueError: If the model is not a euclidean, single-output classifier
+        """
+        metric = model.effective_metric_
+        if metric not in ('euclidean', 'minkowski') or (
+                metric == 'minkowski' and model.effective_metric_params_.get('p', 2) != 2):
+            raise ValueError(f"Only euclidean KNN models are supported, got '{metric}'")
+        if callable(model.weights) or np.ndim(model._y) != 1:
+            raise ValueError("Only single-output KNN models with string weights are supported")
+        index = cls(model._fit_X, model._y, model.classes_, model.n_neighbors, model.weights)
+        if backend == 'kdtree':
+            index.build_tree()
+        return index
+
+    def build_tree(self):
+        """Build a KD-tree over the reference vectors."""
+        self.tree = cKDTree(self.reference)
+        return self.tree
+
+    def save(self, path):
+        """Persist the index as .npz, with the tree pickled alongside if built."""
+        np.savez(path, reference=self.reference, labels=self.labels, classes=self.classes_,
+                 n_neighbors=self.n_neighbors, weights=self.weights)
+        if self.tree is not None:
+            with open(_tree_path(path), 'wb') as f:
+                pickle.dump(self.tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, backend='brute'):
+        """Load an index saved with save(), using its tree for backend='kdtree'."""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(data['reference'], data['labels'], data['classes'],
+                        int(data['n_neighbors']), str(data['weights']))
+        if backend == 'kdtree':
+            if os.path.exists(_tree_path(path)):
+                with open(_tree_path(path), 'rb') as f:
+                    index.tree = pickle.load(f)
+            else:
+                index.build_tree()
+        return index
+
+    def kneighbors(self, X):
+        """
+        Find the nearest reference vectors for each query row.
+
+        Returns:
+            tuple: (distances, indices), both of shape (n_queries, n_neighbors)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        k = self.n_neighbors
+        if self.tree is not None:
+            distances, indices = self.tree.query(X, k=k)
+            return (distances.reshape(len(X), k).astype(np.float32),
+                    indices.reshape(len(X), k))
+
+        indices = np.empty((len(X), k), dtype=np.intp)
+        for start in range(0, len(X), QUERY_CHUNK):
+            chunk = X[start:start + QUERY_CHUNK]
+            sq = self._reference_sq - 2.0 * (chunk @ self.reference.T)
+            nearest = np.argpartition(sq, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(sq, nearest, axis=1), axis=1, kind='stable')
+            indices[start:start + len(chunk)] = np.take_along_axis(nearest, order, axis=1)
+
+        # Exact distances for the few selected neighbors only
+        distances = np.linalg.norm(self.reference[indices] - X[:, None, :], axis=2)
+        return distances, indices
+
+    def predict_with_proba(self, X):
+        """
+        Predict classes and probabilities from a single neighbor search.
+
+        Args:
+            X (np.ndarray): Query vectors of shape (n_queries, n_features)
+
+        Returns:
+            tuple: (predicted class values, probabilities of shape (n_queries, n_classes))
+        """
+        distances, indices = self.kneighbors(X)
+        if self.weights == 'distance':
+            with np.errstate(divide='ignore'):
+                votes = 1.0 / distances
+            # Exact matches take all the weight, as in scikit-learn
+            exact = distances == 0
+            rows = exact.any(axis=1)
+            votes[rows] = exact[rows]
+        else:
+            votes = np.ones(distances.shape)
+
+        probabilities = np.zeros((len(X), len(self.classes_)))
+        np.add.at(probabilities, (np.arange(len(X))[:, None], self.labels[indices]), votes)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return self.classes_[np.argmax(probabilities, axis=1)], probabilities
+
+    def predict(self, X):
+        """Predicted class values for the query rows."""
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        """Class probabilities for the query rows."""
+        return self.predict_with_proba(X)[1]
+
+
+def _tree_path(path):
+    """Location of the pickled tree saved next to an index file."""
+    return os.path.splitext(path)[0] + '.tree.pkl'
@@ -4,29 +4,61 @@ Based on the Complete Emotion Recognition Pipeline notebook
 """
 
 import os
-import io
-import tempfile
+import asyncio
+import json
+import time
+from functools import partial
+from contextlib import asynccontextmanager
 import uvicorn
 import numpy as np
 from datetime import datetime
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional, List
 import logging
 
 from .model_loader import EmotionRecognitionModel
+from .mfcc_engine import (
+    extract_timed, extract_features_timed, extract_mfcc_batch, extract_timeline, warm_up
+)
+from .workers import WorkerPool, ServiceSaturated
+from .batching import MicroBatcher
+from .prediction_cache import PredictionCache
+from .feature_store import DEFAULT_PARAMS
+from .streaming import StreamSession
+from .metrics import (
+    REGISTRY, MODEL_DURATION, MODEL_REQUESTS, ERRORS, AUDIO_SECONDS,
+    ServerTimingMiddleware, record_extraction, record_stage, stage_timer
+)
+from .profiling import SamplingProfiler, profile_call
+from .uploads import (
+    UploadLimits, UploadRejected, RequestSizeLimitMiddleware, receive_upload
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app):
+    """Start and warm up the worker pools, and stop them with the batch dispatchers on shutdown."""
+    precision = emotion_model.precision if emotion_model is not None else 'float32'
+    await worker_pool.start(warm_up, SAMPLE_RATE or 16000, precision)
+    try:
+        yield
+    finally:
+        batcher.shutdown()
+        worker_pool.shutdown()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Emotion Recognition API",
     description="API for emotion recognition from speech using MLP, SVM, and KNN models",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -36,8 +68,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the per-stage timings
+    expose_headers=["Server-Timing"],
 )
 
+# Upload limits; whole request bodies are capped before any parsing
+upload_limits = UploadLimits.from_env()
+app.add_middleware(RequestSizeLimitMiddleware,
+                   max_bytes=int(os.environ.get('MAX_REQUEST_BYTES', 1024 * 1024 * 1024)))
+
+# Request counts, latency histograms and a Server-Timing header per request
+app.add_middleware(ServerTimingMiddleware)
+
 # Mount static files directory to serve web_app.html
 # Get the directory where this file is located
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -64,6 +106,184 @@ except Exception as e:
     logger.info("🔄 API will run in limited mode without models")
     emotion_model = None
 
+# Rate uploads are resampled to before extraction; 0, the default, keeps the source rate
+# the shipped models were trained at
+SAMPLE_RATE = int(os.environ.get('SAMPLE_RATE', 0)) or None
+
+# Most files accepted by one /predict-batch request
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 200))
+
+# Longest /ws/predict stream in seconds; 0, the default, leaves streams unbounded
+MAX_STREAM_SECONDS = float(os.environ.get('MAX_STREAM_SECONDS', 0))
+
+# Soft-vote weights of /predict-ensemble, e.g. "MLP:0.5,SVM:0.3,KNN:0.2"; empty means equal
+ENSEMBLE_WEIGHTS = os.environ.get('ENSEMBLE_WEIGHTS', '')
+
+# Bounded pools for extraction and inference, sized from the environment
+worker_pool = WorkerPool.from_env()
+
+REGISTRY.gauge('emotion_admitted_requests', "Requests holding an admission slot",
+               function=lambda: worker_pool.in_flight)
+REGISTRY.gauge('emotion_queue_depth', "Admitted requests waiting for an extraction worker",
+               function=lambda: worker_pool.queue_depth)
+REGISTRY.gauge('emotion_admission_capacity', "Requests admitted at once, running or queued",
+               function=lambda: worker_pool.capacity)
+
+
+def _score_timed(features, model_name):
+    """
+    Scale and score a feature matrix, measuring both calls.
+    
+    Runs on an inference thread, outside the request's context, so the
+    durations are returned for the caller to record with _record_scoring.
+    
+    Returns:
+        tuple: (predicted class indices, probabilities, (scale seconds, model seconds))
+    """
+    start_time = time.perf_counter()
+    features_scaled = emotion_model.scale_features(features)
+    scaled_time = time.perf_counter()
+    predicted_class_idx, probabilities = emotion_model.predict_scaled(features_scaled, model_name)
+    end_time = time.perf_counter()
+    MODEL_DURATION.observe(end_time - scaled_time, model=model_name)
+    return predicted_class_idx, probabilities, (scaled_time - start_time, end_time - scaled_time)
+
+
+def _record_scoring(durations):
+    """Record the scale and model durations returned by _score_timed for the current request."""
+    record_stage('scale', durations[0])
+    record_stage('model', durations[1])
+
+
+async def _score_batch(features, model_name):
+    """Score a feature matrix on the inference pool."""
+    return await worker_pool.run_inference(_score_timed, features, model_name)
+
+
+async def _extract(source, profile=False):
+    """
+    Extract one upload's features in the process pool, recording its stages.
+    
+    With profile set, the worker runs the extraction under the stack
+    profiler and its stacks are added to the sampled profile.
+    """
+    extract = partial(extract_features_timed, sample_rate=SAMPLE_RATE,
+                      precision=emotion_model.precision)
+    start_time = time.perf_counter()
+    if profile:
+        (features, timings), stacks = await worker_pool.run_extraction(
+            partial(profile_call, extract), source
+        )
+        profiler.add(stacks, root=('predict', 'extract'))
+    else:
+        features, timings = await worker_pool.run_extraction(extract, source)
+    record_extraction(timings, time.perf_counter() - start_time)
+    return features
+
+
+async def _score_profiled(features, model_name):
+    """Score one feature vector outside the micro-batches under the stack profiler."""
+    (predicted_class_idx, probabilities, durations), stacks = await worker_pool.run_inference(
+        profile_call, _score_timed, np.reshape(features, (1, -1)), model_name
+    )
+    profiler.add(stacks, root=('predict', 'inference'))
+    return predicted_class_idx[0], probabilities[0], durations
+
+
+async def _receive(file, endpoint):
+    """
+    Validate an upload from its header and read it, timed as the upload stage.
+    
+    Raises:
+        HTTPException: With the status of a failed validation
+    """
+    try:
+        with stage_timer('upload'):
+            return await receive_upload(file, upload_limits)
+    except UploadRejected as e:
+        ERRORS.inc(endpoint=endpoint, reason='rejected')
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+# Coalesces concurrent /predict rows into batched model calls
+batcher = MicroBatcher.from_env(_score_batch)
+
+# Upload-to-features and features-to-prediction caches for resubmitted clips
+prediction_cache = PredictionCache.from_env()
+
+# Profiles a fraction of /predict requests when PROFILE_SAMPLE_RATE or /profiling enables it
+profiler = SamplingProfiler.from_env()
+
+
+def _extraction_params():
+    """Everything besides the audio that determines an upload's features."""
+    return dict(DEFAULT_PARAMS, sample_rate=SAMPLE_RATE, precision=emotion_model.precision)
+
+
+def _parse_weights(spec, models):
+    """
+    Parse "MODEL:weight,..." into a weight per model.
+    
+    Models left out of a non-empty spec get weight 0.
+    
+    Raises:
+        ValueError: On malformed entries, unknown models or weights that sum to 0
+    """
+    if not spec:
+        return {name: 1.0 for name in models}
+    weights = {name: 0.0 for name in models}
+    for entry in spec.split(','):
+        name, sep, value = entry.partition(':')
+        name = name.strip()
+        if not sep or name not in weights:
+            raise ValueError(f"Invalid weight '{entry}'; expected MODEL:weight for one of {models}")
+        try:
+            weights[name] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid weight '{entry}'; the weight must be a number")
+        if weights[name] < 0:
+            raise ValueError(f"Weight of {name} must not be negative")
+    if sum(weights.values()) <= 0:
+        raise ValueError("Ensemble weights must have a positive sum")
+    return weights
+
+
+def _timed_predict(features_scaled, model_name):
+    """Score scaled features with one model and measure the model call."""
+    start_time = time.perf_counter()
+    predicted_class_idx, probabilities = emotion_model.predict_scaled(features_scaled, model_name)
+    elapsed = time.perf_counter() - start_time
+    MODEL_DURATION.observe(elapsed, model=model_name)
+    return predicted_class_idx, probabilities, elapsed * 1000
+
+
+def _busy_error(e, endpoint):
+    """Count a back-pressure failure and map it to an HTTP response."""
+    ERRORS.inc(endpoint=endpoint, reason='saturated' if isinstance(e, ServiceSaturated) else 'timeout')
+    if isinstance(e, ServiceSaturated):
+        return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    return HTTPException(status_code=503, detail="Server busy: request timed out waiting for a worker")
+
+
+class _CleanupStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that runs a cleanup callback once it is done.
+
+    The callback runs even when the body is never iterated, sending fails or
+    the client disconnects, where a finally block in the body generator
+    would only run when the abandoned generator is garbage collected.
+    """
+
+    def __init__(self, content, cleanup, **kwargs):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.cleanup()
+
 
 @app.get("/")
 def home():
@@ -101,12 +321,32 @@ def get_models():
     
     return {
         "available_models": emotion_model.get_available_models(),
-        "emotion_classes": emotion_model.get_emotion_classes()
+        "emotion_classes": emotion_model.get_emotion_classes(),
+        "model_status": emotion_model.get_model_status()
+    }
+
+
+@app.delete("/models/{model_name}")
+def evict_model(model_name: str):
+    """Unload a model from memory; it is loaded again on its next request."""
+    if emotion_model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    available_models = emotion_model.get_available_models()
+    if model_name not in available_models:
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Unknown model. Available models: {available_models}"
+        )
+    
+    return {
+        "model": model_name,
+        "evicted": emotion_model.evict_model(model_name)
     }
 
 
 @app.post("/predict")
-def predict_emotion(
+async def predict_emotion(
     file: UploadFile = File(...),
     model: str = Query(default="MLP", description="Model to use: MLP, SVM, or KNN")
 ):
@@ -175,21 +415,34 @@ def predict_emotion(
             detail="Unsupported file format. Please upload a WAV, MP3, M4A, or FLAC file."
         )
     
+    MODEL_REQUESTS.inc(endpoint='/predict', model=model)
+    profile = profiler.should_sample()
+    
+    # Reject bad headers before the body is read; large uploads are spooled to disk
+    upload = await _receive(file, '/predict')
+    
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            content = file.file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        # Make prediction
-        result = emotion_model.predict_emotion(temp_file_path, model)
-        
-        # Clean up temporary file
-        os.unlink(temp_file_path)
-        
-        if 'error' in result:
-            raise HTTPException(status_code=500, detail=result['error'])
+        # A resubmitted clip skips extraction, and scoring too for a model already asked
+        features_key = prediction_cache.upload_key(upload.digest, _extraction_params())
+        features = prediction_cache.get_features(features_key)
+        prediction = None if features is None else prediction_cache.get_prediction(features, model)
+        if prediction is None:
+            with worker_pool.admit():
+                if features is None:
+                    # Extract features in the process pool
+                    features = await _extract(upload.source, profile)
+                    prediction_cache.put_features(features_key, features)
+                # Score them in a micro-batch
+                with stage_timer('inference'):
+                    if profile:
+                        predicted_class_idx, probabilities, durations = await _score_profiled(features, model)
+                    else:
+                        predicted_class_idx, probabilities, durations = await batcher.predict(features, model)
+                _record_scoring(durations)
+                prediction = (predicted_class_idx, probabilities)
+            prediction_cache.put_prediction(features, model, prediction)
+        predicted_class_idx, probabilities = prediction
+        result = emotion_model.format_prediction(predicted_class_idx, probabilities)
         
         # Format response
         response = {
@@ -203,25 +456,164 @@ def predict_emotion(
         
         return JSONResponse(content=response)
         
+    except (ServiceSaturated, asyncio.TimeoutError) as e:
+        raise _busy_error(e, '/predict')
     except Exception as e:
+        ERRORS.inc(endpoint='/predict', reason='failed')
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    finally:
+        upload.close()
+
+
+@app.post("/predict-ensemble")
+async def predict_emotion_ensemble(
+    file: UploadFile = File(...),
+    models: Optional[str] = Query(default=None, description="Comma-separated models, default all"),
+    weights: Optional[str] = Query(default=None, description="Soft-vote weights, e.g. MLP:0.5,SVM:0.3,KNN:0.2")
+):
+    """
+    Predict emotion with several models and combine them by soft voting.
+    
+    Features are extracted and scaled once, then every model scores them
+    concurrently on the inference pool, so the request takes about as long
+    as the slowest model.
+    
+    Args:
+        file: Audio file (WAV format recommended)
+        models: Models to combine, all available ones by default
+        weights: Weight per model; ENSEMBLE_WEIGHTS or equal weights by default
+    
+    Returns:
+        JSON response with the ensemble prediction and each model's prediction
+    """
+    if emotion_model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    available_models = emotion_model.get_available_models()
+    model_names = [m.strip() for m in models.split(',')] if models else available_models
+    invalid = [m for m in model_names if m not in available_models]
+    if invalid or not model_names:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid model. Available models: {available_models}"
+        )
+    try:
+        # Weights may name any available model; only the combined ones vote
+        all_weights = _parse_weights(weights if weights is not None else ENSEMBLE_WEIGHTS,
+                                     available_models)
+        vote_weights = {name: all_weights[name] for name in model_names}
+        if sum(vote_weights.values()) <= 0:
+            raise ValueError("Ensemble weights of the selected models must have a positive sum")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not file.filename.lower().endswith(('.wav', '.mp3', '.m4a', '.flac')):
+        raise HTTPException(
+            status_code=415, 
+            detail="Unsupported file format. Please upload a WAV, MP3, M4A, or FLAC file."
+        )
+    
+    for name in model_names:
+        MODEL_REQUESTS.inc(endpoint='/predict-ensemble', model=name)
+    
+    upload = await _receive(file, '/predict-ensemble')
+    
+    try:
+        features_key = prediction_cache.upload_key(upload.digest, _extraction_params())
+        features = prediction_cache.get_features(features_key)
+        predictions = {}
+        if features is not None:
+            for name in model_names:
+                cached = prediction_cache.get_prediction(features, name)
+                if cached is not None:
+                    predictions[name] = cached + (0.0,)
+        pending = [name for name in model_names if name not in predictions]
+        if pending:
+            with worker_pool.admit():
+                if features is None:
+                    features = await _extract(upload.source)
+                    prediction_cache.put_features(features_key, features)
+                # Scale once, then run every remaining model at the same time
+                with stage_timer('scale'):
+                    features_scaled = await worker_pool.run_inference(
+                        emotion_model.scale_features, features
+                    )
+                with stage_timer('inference'):
+                    outputs = await asyncio.gather(*(
+                        worker_pool.run_inference(_timed_predict, features_scaled, name)
+                        for name in pending
+                    ))
+            for name, (predicted_class_idx, probabilities, elapsed_ms) in zip(pending, outputs):
+                prediction = (int(predicted_class_idx[0]), probabilities[0])
+                prediction_cache.put_prediction(features, name, prediction)
+                predictions[name] = prediction + (elapsed_ms,)
+        
+        ensemble_idx, ensemble_probabilities = emotion_model.soft_vote(
+            {name: predictions[name][1] for name in model_names}, vote_weights
+        )
+        result = emotion_model.format_prediction(ensemble_idx, ensemble_probabilities)
+        
+        per_model = {}
+        for name in model_names:
+            predicted_class_idx, probabilities, elapsed_ms = predictions[name]
+            model_result = emotion_model.format_prediction(predicted_class_idx, probabilities)
+            per_model[name] = {
+                "predicted_emotion": model_result['predicted_class'],
+                "confidence": model_result['confidence'],
+                "all_probabilities": model_result['all_probabilities'],
+                "inference_ms": round(elapsed_ms, 3)
+            }
+        
+        return JSONResponse(content={
+            "success": True,
+            "models_used": model_names,
+            "weights": vote_weights,
+            "predicted_emotion": result['predicted_class'],
+            "confidence": result['confidence'],
+            "all_probabilities": result['all_probabilities'],
+            "models": per_model,
+            "filename": file.filename
+        })
+        
+    except (ServiceSaturated, asyncio.TimeoutError) as e:
+        raise _busy_error(e, '/predict-ensemble')
+    except Exception as e:
+        ERRORS.inc(endpoint='/predict-ensemble', reason='failed')
+        logger.error(f"Ensemble prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    finally:
+        upload.close()
+
+
+def _extraction_chunks(indices):
+    """Split upload indices into chunks, about two per extraction worker."""
+    size = max(1, -(-len(indices) // (2 * worker_pool.extraction_workers)))
+    return [indices[k:k + size] for k in range(0, len(indices), size)]
 
 
 @app.post("/predict-batch")
-def predict_emotion_batch(
+async def predict_emotion_batch(
     files: List[UploadFile] = File(...),
-    model: str = Query(default="MLP", description="Model to use: MLP, SVM, or KNN")
+    model: str = Query(default="MLP", description="Model to use: MLP, SVM, or KNN"),
+    stream: bool = Query(default=False, description="Stream per-file results as NDJSON as they finish")
 ):
     """
     Predict emotions from multiple uploaded audio files.
     
+    The uploads are extracted in chunks spread over every extraction
+    worker. Without streaming, all feature rows are then stacked and scored
+    in one scaler and model call. With stream=true, each chunk is scored as
+    soon as it is extracted and its results are sent as NDJSON lines, one
+    per file with its index in the request, followed by an end event.
+    
     Args:
         files: List of audio files
         model: Model to use (MLP, SVM, or KNN)
+        stream: Whether to stream the results
     
     Returns:
-        JSON response with batch prediction results
+        JSON response with batch prediction results, or an NDJSON stream
     """
     if emotion_model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
@@ -234,66 +626,458 @@ def predict_emotion_batch(
             detail=f"Invalid model. Available models: {available_models}"
         )
     
-    if len(files) > 10:  # Limit batch size
+    if len(files) > BATCH_MAX_FILES:  # Limit batch size
         raise HTTPException(
             status_code=400, 
-            detail="Too many files. Maximum 10 files per batch."
+            detail=f"Too many files. Maximum {BATCH_MAX_FILES} files per batch."
         )
     
-    results = []
+    results = [None] * len(files)
+    uploads = []
+    batch_indices = []
     
-    for file in files:
+    for i, file in enumerate(files):
+        # Validate file type
+        if not file.filename.lower().endswith(('.wav', '.mp3', '.m4a', '.flac')):
+            results[i] = {
+                "filename": file.filename,
+                "success": False,
+                "error": "Unsupported file format"
+            }
+            continue
+        
+        # A bad header only fails its own file
         try:
-            # Validate file type
-            if not file.filename.lower().endswith(('.wav', '.mp3', '.m4a', '.flac')):
-                results.append({
-                    "filename": file.filename,
-                    "success": False,
-                    "error": "Unsupported file format"
-                })
-                continue
-            
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-                content = file.file.read()
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-            
-            # Make prediction
-            result = emotion_model.predict_emotion(temp_file_path, model)
-            
-            # Clean up temporary file
-            os.unlink(temp_file_path)
-            
-            if 'error' in result:
-                results.append({
-                    "filename": file.filename,
-                    "success": False,
-                    "error": result['error']
-                })
-            else:
-                results.append({
-                    "filename": file.filename,
-                    "success": True,
-                    "predicted_emotion": result['predicted_class'],
-                    "confidence": result['confidence'],
-                    "all_probabilities": result['all_probabilities']
-                })
-                
-        except Exception as e:
-            results.append({
+            with stage_timer('upload'):
+                uploads.append(await receive_upload(file, upload_limits))
+        except UploadRejected as e:
+            ERRORS.inc(endpoint='/predict-batch', reason='rejected')
+            results[i] = {
                 "filename": file.filename,
                 "success": False,
-                "error": str(e)
-            })
+                "error": e.detail
+            }
+            continue
+        batch_indices.append(i)
+    MODEL_REQUESTS.inc(len(uploads), endpoint='/predict-batch', model=model)
+    
+    # Resubmitted clips come from the cache; only the rest is extracted and scored
+    params = _extraction_params()
+    keys = [prediction_cache.upload_key(upload.digest, params) for upload in uploads]
+    features = [prediction_cache.get_features(key) for key in keys]
+    predictions = [None if f is None else prediction_cache.get_prediction(f, model) for f in features]
+    errors = [None] * len(uploads)
+    missing = [j for j, f in enumerate(features) if f is None]
+    
+    async def extract(chunk):
+        """Extract a chunk of uploads in one pool task."""
+        with stage_timer('extract'):
+            start_time = time.perf_counter()
+            (extracted, extraction_errors), timings = await worker_pool.run_extraction(
+                partial(extract_timed, extract_mfcc_batch, sample_rate=SAMPLE_RATE,
+                        precision=emotion_model.precision),
+                [uploads[j].source for j in chunk]
+            )
+            record_extraction(timings, time.perf_counter() - start_time)
+        for row, j in enumerate(chunk):
+            errors[j] = extraction_errors[row]
+            if errors[j] is None:
+                features[j] = extracted[row]
+                prediction_cache.put_features(keys[j], extracted[row])
+    
+    async def score(rows):
+        """Score the rows without a prediction or error in one model call."""
+        rows = [j for j in rows if predictions[j] is None and errors[j] is None]
+        if not rows:
+            return
+        with stage_timer('inference'):
+            predicted_class_idx, probabilities, durations = await _score_batch(
+                np.vstack([features[j] for j in rows]), model
+            )
+        _record_scoring(durations)
+        for row, j in enumerate(rows):
+            predictions[j] = (predicted_class_idx[row], probabilities[row])
+            prediction_cache.put_prediction(features[j], model, predictions[j])
+    
+    def file_result(j):
+        """Result entry of one accepted upload."""
+        filename = files[batch_indices[j]].filename
+        if errors[j] is not None:
+            return {
+                "filename": filename,
+                "success": False,
+                "error": f"Prediction failed: {errors[j]}"
+            }
+        result = emotion_model.format_prediction(*predictions[j])
+        return {
+            "filename": filename,
+            "success": True,
+            "predicted_emotion": result['predicted_class'],
+            "confidence": result['confidence'],
+            "all_probabilities": result['all_probabilities']
+        }
+    
+    def fail(rows, error):
+        """Record an error for the rows still without a prediction or error."""
+        for j in rows:
+            if predictions[j] is None and errors[j] is None:
+                errors[j] = error
+    
+    async def guarded(step, rows):
+        """Run extract or score on rows; a failure other than a timeout only fails those rows."""
+        try:
+            await step(rows)
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            ERRORS.inc(endpoint='/predict-batch', reason='failed')
+            fail(rows, str(e))
+    
+    needs_work = any(prediction is None for prediction in predictions)
+    
+    if not stream:
+        try:
+            if needs_work:
+                with worker_pool.admit():
+                    # Extract every chunk concurrently, then score all rows in one call
+                    await asyncio.gather(*(guarded(extract, chunk) for chunk in _extraction_chunks(missing)))
+                    await guarded(score, range(len(uploads)))
+        except (ServiceSaturated, asyncio.TimeoutError) as e:
+            raise _busy_error(e, '/predict-batch')
+        finally:
+            for upload in uploads:
+                upload.close()
+        
+        for j, i in enumerate(batch_indices):
+            results[i] = file_result(j)
+        
+        return JSONResponse(content={
+            "model_used": model,
+            "total_files": len(files),
+            "results": results
+        })
+    
+    # The slot is held until the response is done, so saturation still answers 429
+    try:
+        if needs_work:
+            worker_pool.acquire()
+    except ServiceSaturated as e:
+        for upload in uploads:
+            upload.close()
+        raise _busy_error(e, '/predict-batch')
+    
+    def line(i, entry):
+        return json.dumps(dict(entry, index=i)) + "\n"
+    
+    tasks = []
+    
+    def cleanup():
+        # A client that disconnects stops the remaining chunks
+        for task in tasks:
+            task.cancel()
+        if needs_work:
+            worker_pool.release()
+        for upload in uploads:
+            upload.close()
+    
+    async def stream_results():
+        # Rejected files and cached predictions go out first
+        for i, entry in enumerate(results):
+            if entry is not None:
+                yield line(i, entry)
+        cached = [j for j, p in enumerate(predictions) if p is not None]
+        for j in cached:
+            yield line(batch_indices[j], file_result(j))
+        
+        # Cached features only need scoring
+        ready = [j for j, p in enumerate(predictions) if p is None and features[j] is not None]
+        chunks = ([ready] if ready else []) + _extraction_chunks(missing)
+        
+        async def run(chunk):
+            try:
+                if features[chunk[0]] is None:
+                    await guarded(extract, chunk)
+                await guarded(score, chunk)
+            except asyncio.TimeoutError:
+                ERRORS.inc(endpoint='/predict-batch', reason='timeout')
+                fail(chunk, "Server busy: request timed out waiting for a worker")
+            return chunk
+        
+        tasks.extend(asyncio.ensure_future(run(chunk)) for chunk in chunks)
+        for finished in asyncio.as_completed(tasks):
+            for j in await finished:
+                yield line(batch_indices[j], file_result(j))
+        yield json.dumps({"event": "end", "model_used": model, "total_files": len(files)}) + "\n"
+    
+    return _CleanupStreamingResponse(stream_results(), cleanup, media_type="application/x-ndjson")
+
+
+@app.post("/predict-timeline")
+async def predict_emotion_timeline(
+    file: UploadFile = File(...),
+    model: str = Query(default="MLP", description="Model to use: MLP, SVM, or KNN"),
+    window: float = Query(default=3.0, gt=0, description="Segment length in seconds"),
+    hop: float = Query(default=1.0, gt=0, description="Seconds between segment starts")
+):
+    """
+    Predict an emotion timeline over sliding segments of an audio file.
+    
+    Overlapping segments share their frames, which are transformed once, and
+    all segments are scored in one model call.
+    
+    Args:
+        file: Audio file (WAV format recommended)
+        model: Model to use (MLP, SVM, or KNN)
+        window: Segment length in seconds
+        hop: Seconds between segment starts
+    
+    Returns:
+        JSON response with one entry per segment; probabilities follow the
+        order of emotion_classes, and silent segments have no prediction
+    """
+    if emotion_model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    available_models = emotion_model.get_available_models()
+    if model not in available_models:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid model. Available models: {available_models}"
+        )
+    
+    if not file.filename.lower().endswith(('.wav', '.mp3', '.m4a', '.flac')):
+        raise HTTPException(
+            status_code=415, 
+            detail="Unsupported file format. Please upload a WAV, MP3, M4A, or FLAC file."
+        )
+    
+    MODEL_REQUESTS.inc(endpoint='/predict-timeline', model=model)
+    upload = await _receive(file, '/predict-timeline')
+    
+    try:
+        with worker_pool.admit():
+            with stage_timer('extract'):
+                start_time = time.perf_counter()
+                (starts, ends, features), timings = await worker_pool.run_extraction(
+                    partial(extract_timed, extract_timeline, sample_rate=SAMPLE_RATE,
+                            precision=emotion_model.precision),
+                    upload.source, window, hop
+                )
+                record_extraction(timings, time.perf_counter() - start_time)
+            with stage_timer('inference'):
+                predictions = await worker_pool.run_inference(
+                    emotion_model.predict_timeline, features, model
+                )
+    except (ServiceSaturated, asyncio.TimeoutError) as e:
+        raise _busy_error(e, '/predict-timeline')
+    except Exception as e:
+        ERRORS.inc(endpoint='/predict-timeline', reason='failed')
+        logger.error(f"Timeline prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    finally:
+        upload.close()
+    
+    segments = []
+    for start, end, prediction in zip(starts, ends, predictions):
+        segment = {"start": round(float(start), 3), "end": round(float(end), 3)}
+        if prediction is None:
+            segment.update(predicted_emotion=None, confidence=None, probabilities=None)
+        else:
+            emotion, confidence, probabilities = prediction
+            segment.update(
+                predicted_emotion=emotion,
+                confidence=round(confidence, 4),
+                probabilities=[round(float(p), 4) for p in probabilities]
+            )
+        segments.append(segment)
     
     return JSONResponse(content={
+        "success": True,
         "model_used": model,
-        "total_files": len(files),
-        "results": results
+        "filename": file.filename,
+        "window": window,
+        "hop": hop,
+        "emotion_classes": emotion_model.get_emotion_classes(),
+        "segments": segments
     })
 
 
+@app.websocket("/ws/predict")
+async def predict_emotion_stream(
+    websocket: WebSocket,
+    model: str = "MLP",
+    sample_rate: int = 16000,
+    channels: int = 1,
+    window: float = 3.0,
+    hop: float = 1.0
+):
+    """
+    Predict emotions over a live audio stream.
+    
+    The client sends binary messages of little-endian 16-bit PCM (channels
+    interleaved) split at any point, and the text message "end" to flush the
+    stream. Each time a window completes, the server sends a JSON message with
+    its start and end times and the prediction for the last `window` seconds,
+    every `hop` seconds.
+    
+    Args:
+        model: Model to use (MLP, SVM, or KNN)
+        sample_rate: Sample rate of the stream in Hz
+        channels: Number of interleaved channels
+        window: Seconds of audio per prediction
+        hop: Seconds between predictions
+    """
+    await websocket.accept()
+    if emotion_model is None:
+        await websocket.send_json({"success": False, "error": "Model not loaded"})
+        await websocket.close(code=1011)
+        return
+    
+    available_models = emotion_model.get_available_models()
+    if model not in available_models:
+        await websocket.send_json({
+            "success": False,
+            "error": f"Invalid model. Available models: {available_models}"
+        })
+        await websocket.close(code=1008)
+        return
+    try:
+        if sample_rate <= 0 or channels <= 0:
+            raise ValueError("sample_rate and channels must be positive")
+        session = StreamSession(sample_rate, channels, window, hop, sample_rate=SAMPLE_RATE,
+                                precision=emotion_model.precision)
+    except ValueError as e:
+        await websocket.send_json({"success": False, "error": str(e)})
+        await websocket.close(code=1008)
+        return
+    
+    MODEL_REQUESTS.inc(endpoint='/ws/predict', model=model)
+    
+    # Bytes of a trailing partial sample carried over to the next message
+    sample_bytes = 2 * channels
+    remainder = b""
+    n_windows = 0
+    
+    async def send_windows(windows):
+        for w in windows:
+            message = {"success": True, "start": round(w['start'], 3), "end": round(w['end'], 3)}
+            # Windows without voiced frames have NaN features and are not scored
+            if np.isnan(w['features']).any():
+                message.update(predicted_emotion=None, confidence=None, all_probabilities=None)
+            else:
+                predicted_class_idx, probabilities, durations = await batcher.predict(w['features'], model)
+                _record_scoring(durations)
+                result = emotion_model.format_prediction(predicted_class_idx, probabilities)
+                message.update(
+                    predicted_emotion=result['predicted_class'],
+                    confidence=result['confidence'],
+                    all_probabilities=result['all_probabilities']
+                )
+            await websocket.send_json(message)
+        return len(windows)
+    
+    # A stream holds an admission slot for as long as it is open
+    try:
+        worker_pool.acquire()
+    except ServiceSaturated as e:
+        ERRORS.inc(endpoint='/ws/predict', reason='saturated')
+        await websocket.send_json({"success": False, "error": str(e)})
+        await websocket.close(code=1013)
+        return
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                data = remainder + message["bytes"]
+                usable = len(data) - len(data) % sample_bytes
+                remainder = data[usable:]
+                pcm = np.frombuffer(data[:usable], dtype="<i2")
+                # Framing state lives in this process, so chunks run on the inference threads
+                windows = await worker_pool.run_inference(session.push, pcm)
+                n_windows += await send_windows(windows)
+                if MAX_STREAM_SECONDS and session.framer.n_samples / session.fs > MAX_STREAM_SECONDS:
+                    ERRORS.inc(endpoint='/ws/predict', reason='rejected')
+                    await websocket.send_json({
+                        "success": False,
+                        "error": f"Stream exceeds {MAX_STREAM_SECONDS:g} s"
+                    })
+                    await websocket.close(code=1009)
+                    return
+            elif message.get("text", "").strip().lower() == "end":
+                n_windows += await send_windows(session.finish())
+                AUDIO_SECONDS.inc(session.framer.n_samples / session.fs)
+                await websocket.send_json({
+                    "event": "end",
+                    "windows": n_windows,
+                    "duration": round(session.framer.n_samples / session.fs, 3)
+                })
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        return
+    except asyncio.TimeoutError:
+        ERRORS.inc(endpoint='/ws/predict', reason='timeout')
+        await websocket.send_json({"success": False, "error": "Server busy: request timed out waiting for a worker"})
+        await websocket.close(code=1013)
+    except Exception as e:
+        ERRORS.inc(endpoint='/ws/predict', reason='failed')
+        logger.error(f"Streaming prediction error: {e}")
+        await websocket.send_json({"success": False, "error": f"Prediction failed: {str(e)}"})
+        await websocket.close(code=1011)
+    finally:
+        worker_pool.release()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Request, stage latency, error, queue and audio metrics in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/profiling")
+def get_profiling():
+    """Sample rate of the request profiler and the size of its aggregate."""
+    return profiler.stats()
+
+
+@app.put("/profiling")
+def set_profiling(
+    sample_rate: float = Query(..., ge=0, le=1, description="Fraction of /predict requests to profile, 0 disables")
+):
+    """Enable, adjust or disable request profiling at runtime."""
+    profiler.set_sample_rate(sample_rate)
+    return profiler.stats()
+
+
+@app.get("/profiling/stacks", response_class=PlainTextResponse)
+def get_profile_stacks():
+    """Aggregated stacks of the profiled requests in the collapsed flame graph format."""
+    return PlainTextResponse(profiler.collapsed())
+
+
+@app.delete("/profiling/stacks")
+def clear_profile_stacks():
+    """Drop the aggregated stacks."""
+    profiler.reset()
+    return profiler.stats()
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Hit, miss and eviction counters of the feature and prediction caches."""
+    return prediction_cache.stats()
+
+
+@app.delete("/cache")
+def clear_cache():
+    """Empty the feature and prediction caches."""
+    prediction_cache.clear()
+    return {"cleared": True, **prediction_cache.stats()}
+
+
 @app.get("/emotion-classes")
 def get_emotion_classes():
     """Get all available emotion classes."""
@@ -0,0 +1,304 @@
+"""
+Metrics Module
+Prometheus-style counters, gauges and histograms with per-request stage timing
+
+The metrics live in the serving process and are rendered in the Prometheus
+text exposition format by the /metrics endpoint. Recording a value takes a
+lock and, for histograms, a bisect over the bucket bounds, so the
+instrumentation stays on at full load.
+
+ServerTimingMiddleware gives every HTTP request a RequestTimer. Code
+handling the request reports stage durations through record_stage, which
+feeds the stage histogram and the request's ``Server-Timing`` response
+header at once.
+"""
+
+import time
+import bisect
+import threading
+from contextvars import ContextVar
+
+# Upper bounds in seconds, from sub-millisecond model calls to long uploads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Name, help text and label names shared by every metric type"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        """(suffix, label values, extra labels, value) tuples to render."""
+        with self._lock:
+            return [('', key, (), value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for suffix, key, extra, value in self._samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} '
+                         f'{_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the counter of a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, stored or read from a callback at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        """
+        Initialize the gauge.
+
+        Args:
+            function: Callable returning the current value of an unlabelled
+                gauge, called on every scrape instead of storing a value
+        """
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self):
+        if self.function is not None:
+            return [('', (), (), self.function())]
+        return super()._samples()
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observations per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def _samples(self):
+        with self._lock:
+            snapshot = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append(('_bucket', key, (('le', _format_value(float(bound))),), cumulative))
+            samples.append(('_sum', key, (), total))
+            samples.append(('_count', key, (), cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+# Metrics of the serving process
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'emotion_http_requests_total', "HTTP requests by path, method and status code",
+    ('path', 'method', 'status'))
+HTTP_DURATION = REGISTRY.histogram(
+    'emotion_http_request_duration_seconds', "HTTP request latency by path", ('path',))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    'emotion_http_requests_in_flight', "HTTP requests being handled")
+STAGE_DURATION = REGISTRY.histogram(
+    'emotion_stage_duration_seconds',
+    "Latency of each prediction stage: upload, queue, decode, mfcc, extract, scale, model "
+    "and inference",
+    ('stage',))
+MODEL_DURATION = REGISTRY.histogram(
+    'emotion_model_duration_seconds', "Model call latency by model, excluding scaling", ('model',))
+MODEL_REQUESTS = REGISTRY.counter(
+    'emotion_model_requests_total', "Prediction requests by endpoint and model",
+    ('endpoint', 'model'))
+ERRORS = REGISTRY.counter(
+    'emotion_errors_total', "Failed prediction requests by endpoint and reason",
+    ('endpoint', 'reason'))
+AUDIO_SECONDS = REGISTRY.counter(
+    'emotion_audio_seconds_total', "Seconds of audio run through feature extraction")
+
+# Paths recorded under their own label; everything else is 'other'
+INSTRUMENTED_PATHS = frozenset((
+    '/predict', '/predict-ensemble', '/predict-batch', '/predict-timeline', '/health', '/models',
+    '/metrics', '/cache/stats', '/cache', '/emotion-classes', '/profiling', '/profiling/stacks', '/',
+))
+
+
+class RequestTimer:
+    """Stage durations of one request, rendered as a Server-Timing header"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = []
+
+    def add(self, stage, seconds):
+        self.stages.append((stage, seconds))
+
+    def header(self):
+        """Server-Timing value with every stage and the total in milliseconds."""
+        entries = [f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in self.stages]
+        entries.append(f'total;dur={(time.perf_counter() - self.start) * 1000:.3f}')
+        return ', '.join(entries)
+
+
+_current_timer = ContextVar('request_timer', default=None)
+
+
+def record_stage(stage, seconds):
+    """Observe a stage duration and add it to the current request's Server-Timing."""
+    STAGE_DURATION.observe(seconds, stage=stage)
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(stage, seconds)
+
+
+class stage_timer:
+    """Context manager timing a block as one stage"""
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record_stage(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def record_extraction(timings, queued_seconds):
+    """
+    Record the timings reported by mfcc_engine.extract_timed.
+
+    Args:
+        timings (dict): Stage seconds and audio_seconds from the worker
+        queued_seconds (float): Wall time of the pool call, of which
+            whatever the worker did not spend extracting was queueing and
+            transfer between processes
+    """
+    record_stage('queue', max(0.0, queued_seconds - timings['total']))
+    if 'decode' in timings:
+        record_stage('decode', timings['decode'])
+    record_stage('mfcc', timings['mfcc'])
+    if 'audio_seconds' in timings:
+        AUDIO_SECONDS.inc(timings['audio_seconds'])
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware counting HTTP requests and adding a Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        path = scope['path'] if scope['path'] in INSTRUMENTED_PATHS else 'other'
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        status = [500]
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', timer.header().encode('latin-1')))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            _current_timer.reset(token)
+            HTTP_REQUESTS.inc(path=path, method=scope['method'], status=status[0])
+            HTTP_DURATION.observe(time.perf_counter() - timer.start, path=path)
@@ -4,114 +4,453 @@ Handles loading of trained models and making predictions
 """
 
 import os
+import gc
+import time
+import importlib.util
+import threading
 import numpy as np
 import joblib
-import tensorflow as tf
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from .feature_extractor import MelFreqCepsCoef
+from .mfcc_engine import VectorizedMFCC, extract_mfcc_batch, PRECISIONS
+from .numpy_mlp import NumpyMLP
+from .knn_backend import KNNIndex
+from .svm_backend import SVMScorer, RFFSVMScorer
+
+
+# The Keras MLP can only be served where TensorFlow is installed
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+
+# Files each model is loaded from; the MLP needs its NumPy export unless TensorFlow is present
+MODEL_FILES = {
+    'MLP': ('mlp_emotion_model.npz',) + (('mlp_emotion_model.h5',) if HAS_TENSORFLOW else ()),
+    'SVM': ('svm_emotion_model.pkl', 'svm_emotion_rff.npz'),
+    'KNN': ('knn_emotion_index.npz', 'knn_emotion_model.pkl'),
+}
+
+
+def _current_rss():
+    """Resident set size of this process in bytes, or None when unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _estimate_nbytes(obj, seen=None, depth=0):
+    """Approximate memory held by a model's NumPy arrays."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen or depth > 4:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, 'count_params'):
+        # Keras model: float32 weights
+        return int(obj.count_params()) * 4
+    if isinstance(obj, dict):
+        return sum(_estimate_nbytes(v, seen, depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_estimate_nbytes(v, seen, depth + 1) for v in obj)
+    if hasattr(obj, '__dict__'):
+        return _estimate_nbytes(vars(obj), seen, depth + 1)
+    return 0
 
 
 class EmotionRecognitionModel:
     """Emotion Recognition Model Handler"""
     
-    def __init__(self, models_dir="saved_models"):
-        """Initialize the model handler with saved models."""
+    def __init__(self, models_dir="saved_models", preload=None, precision=None):
+        """
+        Initialize the model handler.
+        
+        The scaler and label encoder are always loaded. Models are loaded on
+        first use, except those listed in preload (or the PRELOAD_MODELS
+        environment variable, a comma-separated list or 'all', the default).
+        Features are extracted and fed to the models in precision (or the
+        FEATURE_PRECISION environment variable, 'float32' by default).
+        """
+        if precision is None:
+            precision = os.environ.get('FEATURE_PRECISION', 'float32')
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}'. Choose from {list(PRECISIONS)}")
+        self.precision = precision
+        self.dtype = np.dtype(precision)
         self.models_dir = models_dir
         self.models = {}
+        self.model_stats = {}
         self.scaler = None
         self.label_encoder = None
-        self.load_models()
+        self._locks = {name: threading.Lock() for name in MODEL_FILES}
+        
+        if preload is None:
+            preload = os.environ.get('PRELOAD_MODELS', 'all')
+        if isinstance(preload, str):
+            preload = self.get_available_models() if preload == 'all' else [
+                name.strip() for name in preload.split(',') if name.strip()
+            ]
+        self.load_models(preload)
     
-    def load_models(self):
-        """Load all trained models and preprocessing objects."""
+    def load_models(self, model_names=()):
+        """Load the preprocessing objects and warm up the requested models."""
         try:
             # Load preprocessing objects
             self.scaler = joblib.load(os.path.join(self.models_dir, 'feature_scaler.pkl'))
             self.label_encoder = joblib.load(os.path.join(self.models_dir, 'label_encoder.pkl'))
-            
-            # Load MLP model
-            self.models['MLP'] = tf.keras.models.load_model(
-                os.path.join(self.models_dir, 'mlp_emotion_model.h5'),
-                compile=False
-            )
-            
-            # Load SVM model
-            self.models['SVM'] = joblib.load(
-                os.path.join(self.models_dir, 'svm_emotion_model.pkl')
-            )
-            
-            # Load KNN model
-            self.models['KNN'] = joblib.load(
-                os.path.join(self.models_dir, 'knn_emotion_model.pkl')
-            )
-            
-            print("✅ All models loaded successfully!")
+            print("✅ Preprocessing objects loaded successfully!")
             
         except Exception as e:
             print(f"❌ Error loading models: {e}")
             raise e
+        
+        for model_name in model_names:
+            try:
+                self.get_model(model_name)
+            except Exception as e:
+                # A broken model only disables itself, not the whole API
+                print(f"❌ Error loading {model_name} model: {e}")
+    
+    def get_model(self, model_name):
+        """
+        Return a loaded model, loading and warming it up on first use.
+        
+        Raises:
+            KeyError: If the model name is unknown
+        """
+        # Held for the lookup too, so an eviction cannot land between it and the stats update
+        with self._locks[model_name]:
+            if model_name not in self.models:
+                self._load_model(model_name)
+            self.model_stats[model_name]['last_used'] = time.time()
+            return self.models[model_name]
+    
+    def _load_model(self, model_name):
+        """Load one model, run a warm-up inference and record its cost."""
+        rss_before = _current_rss()
+        start_time = time.perf_counter()
+        try:
+            if model_name == 'MLP':
+                model = self.load_mlp()
+            elif model_name == 'KNN':
+                model = self.load_knn()
+            elif model_name == 'SVM':
+                model = self.load_svm()
+            else:
+                model = joblib.load(os.path.join(self.models_dir, MODEL_FILES[model_name][0]))
+            load_time = time.perf_counter() - start_time
+            
+            # Warm-up so the first real request does not pay one-off costs
+            start_time = time.perf_counter()
+            warmup = np.zeros((1, self.scaler.n_features_in_), dtype=self.dtype)
+            self._run_model(model_name, model, self.scaler.transform(warmup))
+            warmup_time = time.perf_counter() - start_time
+        except Exception as e:
+            self.model_stats[model_name] = {'loaded': False, 'error': str(e)}
+            raise
+        rss_after = _current_rss()
+        
+        self.models[model_name] = model
+        self.model_stats[model_name] = {
+            'loaded': True,
+            'load_time_seconds': round(load_time, 4),
+            'warmup_time_seconds': round(warmup_time, 4),
+            'memory_bytes': _estimate_nbytes(model),
+            'rss_delta_bytes': (rss_after - rss_before) if rss_before is not None else None,
+            'loaded_at': time.time(),
+            'last_used': None,
+        }
+        print(f"✅ {model_name} model loaded in {load_time:.2f} seconds")
+    
+    def evict_model(self, model_name):
+        """
+        Drop a loaded model from memory; it is reloaded on next use.
+        
+        Returns:
+            bool: True if the model was loaded
+        """
+        with self._locks[model_name]:
+            model = self.models.pop(model_name, None)
+            if model is None:
+                return False
+            self.model_stats[model_name] = {'loaded': False, 'evicted_at': time.time()}
+        del model
+        gc.collect()
+        return True
+    
+    def get_model_status(self):
+        """Load state, load time and memory usage for every available model."""
+        return {
+            name: self.model_stats.get(name, {'loaded': False})
+            for name in self.get_available_models()
+        }
+    
+    def load_mlp(self):
+        """
+        Load the MLP, preferring the exported NumPy runtime.
+        
+        TensorFlow is only imported when the NumPy artifact is missing or
+        MLP_RUNTIME=keras is set.
+        """
+        npz_path = os.path.join(self.models_dir, 'mlp_emotion_model.npz')
+        runtime = os.environ.get('MLP_RUNTIME', 'numpy')
+        
+        if runtime == 'numpy' and os.path.exists(npz_path):
+            model = NumpyMLP.load(npz_path)
+            if not model.matches_scaler(self.scaler):
+                raise ValueError(
+                    "mlp_emotion_model.npz was exported with a different feature scaler; "
+                    "re-run scripts/export_mlp_numpy.py"
+                )
+            return model
+        
+        try:
+            import tensorflow as tf
+        except ImportError:
+            raise ImportError(
+                "TensorFlow is not installed and mlp_emotion_model.npz was not found. "
+                "Run scripts/export_mlp_numpy.py where TensorFlow is available."
+            )
+        return tf.keras.models.load_model(
+            os.path.join(self.models_dir, 'mlp_emotion_model.h5'),
+            compile=False
+        )
+    
+    def load_knn(self):
+        """
+        Load the KNN model as a single-query KNNIndex.
+        
+        KNN_BACKEND selects 'brute' (default), 'kdtree' or 'sklearn'. A
+        prebuilt knn_emotion_index.npz is used when present; otherwise the
+        scikit-learn model is converted at load time.
+        """
+        backend = os.environ.get('KNN_BACKEND', 'brute')
+        index_path = os.path.join(self.models_dir, 'knn_emotion_index.npz')
+        if backend != 'sklearn' and os.path.exists(index_path):
+            return KNNIndex.load(index_path, backend)
+        
+        model = joblib.load(os.path.join(self.models_dir, 'knn_emotion_model.pkl'))
+        if backend == 'sklearn':
+            return model
+        try:
+            return KNNIndex.from_sklearn(model, backend)
+        except ValueError as e:
+            print(f"⚠️  Serving KNN with scikit-learn: {e}")
+            return model
+    
+    def load_svm(self):
+        """
+        Load the SVM as a single-pass SVMScorer.
+        
+        SVM_BACKEND selects 'exact' (default), 'rff' or 'sklearn'. 'rff'
+        serves the random Fourier feature approximation written by
+        scripts/build_svm_rff.py to svm_emotion_rff.npz.
+        """
+        backend = os.environ.get('SVM_BACKEND', 'exact')
+        rff_path = os.path.join(self.models_dir, 'svm_emotion_rff.npz')
+        if backend == 'rff':
+            if os.path.exists(rff_path):
+                return RFFSVMScorer.load(rff_path)
+            print("⚠️  svm_emotion_rff.npz not found, serving the exact SVM")
+        
+        model = joblib.load(os.path.join(self.models_dir, 'svm_emotion_model.pkl'))
+        if backend == 'sklearn':
+            return model
+        try:
+            return SVMScorer.from_sklearn(model)
+        except ValueError as e:
+            print(f"⚠️  Serving SVM with scikit-learn: {e}")
+            return model
+    
+    def predict_features(self, features, model_name='MLP'):
+        """
+        Score a matrix of MFCC feature vectors with one scaler and model call.
+        
+        Args:
+            features (np.ndarray): Feature matrix of shape (n_samples, n_mfcc)
+            model_name (str): Name of the model to use ('MLP', 'SVM', 'KNN')
+        
+        Returns:
+            tuple: (predicted class indices, class probabilities)
+        """
+        return self.predict_scaled(self.scale_features(features), model_name)
+    
+    def scale_features(self, features):
+        """
+        Clean and scale a feature matrix for the models.
+        
+        Returns:
+            np.ndarray: Scaled features in the serving precision
+        """
+        # One copy in the serving precision, cleaned and scaled in place
+        features = np.array(features, dtype=self.dtype, ndmin=2)
+        np.nan_to_num(features, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        return self.scaler.transform(features, copy=False)
+    
+    def predict_scaled(self, features_scaled, model_name='MLP'):
+        """
+        Score already scaled features with one model.
+        
+        Returns:
+            tuple: (predicted class indices, class probabilities)
+        """
+        # Get model, loading it on first use
+        model = self.get_model(model_name)
+        
+        return self._run_model(model_name, model, features_scaled)
+    
+    def _run_model(self, model_name, model, features_scaled):
+        """Run one model on scaled features."""
+        if model_name == 'MLP':
+            # For MLP, get probabilities
+            probabilities = model.predict(features_scaled, verbose=0)
+            predicted_class_idx = np.argmax(probabilities, axis=1)
+        elif hasattr(model, 'predict_with_proba'):
+            # Label and probabilities from a single pass over the model
+            predicted_class_idx, probabilities = model.predict_with_proba(features_scaled)
+        else:
+            # For SVM and KNN
+            predicted_class_idx = model.predict(features_scaled)
+            if hasattr(model, 'predict_proba'):
+                probabilities = model.predict_proba(features_scaled)
+            else:
+                probabilities = np.zeros((len(features_scaled), len(self.label_encoder.classes_)))
+                probabilities[np.arange(len(features_scaled)), predicted_class_idx] = 1.0
+        
+        return predicted_class_idx, probabilities
+    
+    def soft_vote(self, probabilities, weights=None):
+        """
+        Combine per-model probabilities into an ensemble prediction.
+        
+        Args:
+            probabilities (dict): Model name to probability vector
+            weights (dict): Model name to vote weight; equal weights when omitted
+        
+        Returns:
+            tuple: (predicted class index, ensemble probabilities)
+        """
+        names = list(probabilities)
+        w = np.array([1.0 if weights is None else float(weights.get(name, 0.0)) for name in names])
+        if w.sum() <= 0:
+            raise ValueError("Ensemble weights must have a positive sum")
+        stacked = np.vstack([np.asarray(probabilities[name], dtype=np.float64) for name in names])
+        ensemble = w @ stacked / w.sum()
+        return int(np.argmax(ensemble)), ensemble
+    
+    def format_prediction(self, predicted_class_idx, probabilities):
+        """Build the results dictionary for one scored sample."""
+        # Get class name
+        predicted_class = self.label_encoder.classes_[predicted_class_idx]
+        
+        # Create results dictionary
+        results_dict = {
+            'predicted_class': predicted_class,
+            'confidence': float(probabilities[predicted_class_idx]),
+            'all_probabilities': {}
+        }
+        
+        # Add probabilities for all classes
+        for i, class_name in enumerate(self.label_encoder.classes_):
+            results_dict['all_probabilities'][class_name] = float(probabilities[i])
+        
+        return results_dict
     
-    def predict_emotion(self, file_path, model_name='MLP'):
+    def predict_emotion(self, source, model_name='MLP', fs=None):
         """
-        Predict emotion from an audio file using the specified model.
+        Predict emotion from audio using the specified model.
         
         Args:
-            file_path (str): Path to the audio file
+            source: Path to a WAV file, WAV bytes, a file-like object or a
+                NumPy array of samples
             model_name (str): Name of the model to use ('MLP', 'SVM', 'KNN')
+            fs (int): Sample rate, required when source is a NumPy array
         
         Returns:
             dict: Prediction results with probabilities
         """
         try:
-            # Extract features from the audio file
-            mfcc_extractor = MelFreqCepsCoef(file_path)
+            # Extract features from the audio
+            mfcc_extractor = VectorizedMFCC(source, fs=fs, precision=self.precision)
             features = mfcc_extractor.mfccsscalade.reshape(1, -1)
             
-            # Clean any NaN or Inf values
-            features = np.nan_to_num(features, nan=0.0, posinf=0.0, neginf=0.0)
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Get model
-            model = self.models[model_name]
-            
-            # Make prediction
-            if model_name == 'MLP':
-                # For MLP, get probabilities
-                probabilities = model.predict(features_scaled, verbose=0)[0]
-                predicted_class_idx = np.argmax(probabilities)
-            else:
-                # For SVM and KNN
-                predicted_class_idx = model.predict(features_scaled)[0]
-                if hasattr(model, 'predict_proba'):
-                    probabilities = model.predict_proba(features_scaled)[0]
-                else:
-                    probabilities = np.zeros(len(self.label_encoder.classes_))
-                    probabilities[predicted_class_idx] = 1.0
-            
-            # Get class name
-            predicted_class = self.label_encoder.classes_[predicted_class_idx]
-            
-            # Create results dictionary
-            results_dict = {
-                'predicted_class': predicted_class,
-                'confidence': float(probabilities[predicted_class_idx]),
-                'all_probabilities': {}
-            }
-            
-            # Add probabilities for all classes
-            for i, class_name in enumerate(self.label_encoder.classes_):
-                results_dict['all_probabilities'][class_name] = float(probabilities[i])
-            
-            return results_dict
+            predicted_class_idx, probabilities = self.predict_features(features, model_name)
+            return self.format_prediction(predicted_class_idx[0], probabilities[0])
             
         except Exception as e:
             return {'error': f'Prediction failed: {str(e)}'}
     
+    def predict_emotion_batch(self, sources, model_name='MLP'):
+        """
+        Predict emotions for many audio sources with batched extraction.
+        
+        Features for all sources are extracted together and scored with a
+        single scaler and model call.
+        
+        Args:
+            sources (list): Paths, WAV bytes, file-like objects or (signal, fs) tuples
+            model_name (str): Name of the model to use ('MLP', 'SVM', 'KNN')
+        
+        Returns:
+            list: One prediction or {'error': ...} dictionary per source
+        """
+        try:
+            features, errors = extract_mfcc_batch(sources, precision=self.precision)
+            return self.predict_feature_batch(features, errors, model_name)
+            
+        except Exception as e:
+            return [{'error': f'Prediction failed: {str(e)}'} for _ in sources]
+    
+    def predict_feature_batch(self, features, errors, model_name='MLP'):
+        """
+        Score extracted feature rows, keeping the per-row error slots.
+        
+        Args:
+            features (np.ndarray): Feature matrix of shape (n_sources, n_mfcc)
+            errors (list): Extraction error per row, or None
+            model_name (str): Name of the model to use ('MLP', 'SVM', 'KNN')
+        
+        Returns:
+            list: One prediction or {'error': ...} dictionary per row
+        """
+        valid = [i for i, error in enumerate(errors) if error is None]
+        results = [{'error': f'Prediction failed: {error}'} for error in errors]
+        if valid:
+            predicted_class_idx, probabilities = self.predict_features(features[valid], model_name)
+            for row, i in enumerate(valid):
+                results[i] = self.format_prediction(predicted_class_idx[row], probabilities[row])
+        return results
+    
+    def predict_timeline(self, features, model_name='MLP'):
+        """
+        Score timeline windows in one model call.
+        
+        Args:
+            features (np.ndarray): Window features of shape (n_windows, n_mfcc);
+                NaN rows mark windows without voiced frames
+            model_name (str): Name of the model to use ('MLP', 'SVM', 'KNN')
+        
+        Returns:
+            list: Per window (class name, confidence, probability row), or
+                None for windows without voiced frames
+        """
+        voiced = ~np.isnan(features).any(axis=1)
+        segments = [None] * len(features)
+        if voiced.any():
+            predicted_class_idx, probabilities = self.predict_features(features[voiced], model_name)
+            for row, i in enumerate(np.flatnonzero(voiced)):
+                segments[i] = (
+                    self.label_encoder.classes_[predicted_class_idx[row]],
+                    float(probabilities[row][predicted_class_idx[row]]),
+                    np.asarray(probabilities[row], dtype=np.float64)
+                )
+        return segments
+    
     def get_available_models(self):
-        """Get list of available models."""
-        return list(self.models.keys())
+        """Get list of models whose files are present, loaded or not."""
+        return [
+            name for name, files in MODEL_FILES.items()
+            if any(os.path.exists(os.path.join(self.models_dir, f)) for f in files)
+        ]
     
     def get_emotion_classes(self):
         """Get list of emotion classes."""
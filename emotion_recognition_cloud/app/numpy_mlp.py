@@ -0,0 +1,135 @@
+"""
+NumPy MLP Runtime
+Serves the trained Keras MLP without importing TensorFlow
+
+The MLP is a plain stack of Dense layers (Dropout is the identity at
+inference time), so its forward pass is a few matrix products. The trained
+weights are exported once to ``mlp_emotion_model.npz`` with
+``scripts/export_mlp_numpy.py``; the API then loads that artifact and only
+falls back to TensorFlow when it is missing.
+"""
+
+import numpy as np
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': _relu,
+    'softmax': _softmax,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+}
+
+# Keras layers that do nothing at inference time
+PASSTHROUGH_LAYERS = ('InputLayer', 'Dropout')
+
+
+class NumpyMLP:
+    """Forward pass of an exported Dense stack with a Keras-like predict()"""
+
+    def __init__(self, layers, scaler_mean=None, scaler_scale=None):
+        """
+        Initialize the runtime from exported layers.
+
+        Args:
+            layers (list): (kernel, bias, activation name) per Dense layer
+            scaler_mean (np.ndarray): Mean of the scaler used in training
+            scaler_scale (np.ndarray): Scale of the scaler used in training
+        """
+        for _, _, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation '{activation}'")
+        self.layers = [(np.asarray(kernel, dtype=np.float32), np.asarray(bias, dtype=np.float32),
+                        activation) for kernel, bias, activation in layers]
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+
+    @classmethod
+    def from_keras(cls, model, scaler=None):
+        """
+        Extract the Dense weights of a trained Keras Sequential model.
+
+        Args:
+            model: Keras model made of Dense, Dropout and Activation layers
+            scaler: Fitted StandardScaler whose statistics are stored alongside
+
+        Returns:
+            NumpyMLP: Runtime reproducing the model's predictions
+        """
+        layers = []
+        for layer in model.layers:
+            kind = type(layer).__name__
+            config = layer.get_config()
+            if kind in PASSTHROUGH_LAYERS:
+                continue
+            if kind == 'Dense':
+                kernel, bias = layer.get_weights()
+                layers.append((kernel, bias, config['activation']))
+            elif kind == 'Activation' and layers and layers[-1][2] == 'linear':
+                kernel, bias, _ = layers[-1]
+                layers[-1] = (kernel, bias, config['activation'])
+            else:
+                raise ValueError(f"Cannot export layer '{layer.name}' of type {kind}")
+        if scaler is None:
+            return cls(layers)
+        return cls(layers, scaler.mean_, scaler.scale_)
+
+    @classmethod
+    def load(cls, path):
+        """Load a runtime saved with save()."""
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(a) for a in data['activations']]
+            layers = [(data[f'kernel_{i}'], data[f'bias_{i}'], activation)
+                      for i, activation in enumerate(activations)]
+            scaler_mean = data['scaler_mean'] if 'scaler_mean' in data else None
+            scaler_scale = data['scaler_scale'] if 'scaler_scale' in data else None
+        return cls(layers, scaler_mean, scaler_scale)
+
+    def save(self, path):
+        """Write the weights and scaler statistics to an .npz artifact."""
+        arrays = {'activations': np.array([activation for _, _, activation in self.layers])}
+        for i, (kernel, bias, _) in enumerate(self.layers):
+            arrays[f'kernel_{i}'] = kernel
+            arrays[f'bias_{i}'] = bias
+        if self.scaler_mean is not None:
+            arrays['scaler_mean'] = self.scaler_mean
+            arrays['scaler_scale'] = self.scaler_scale
+        np.savez(path, **arrays)
+
+    def matches_scaler(self, scaler):
+        """Whether the stored scaler statistics agree with a fitted scaler."""
+        if self.scaler_mean is None:
+            return True
+        return (np.allclose(self.scaler_mean, scaler.mean_)
+                and np.allclose(self.scaler_scale, scaler.scale_))
+
+    def predict(self, x, verbose=0):
+        """
+        Class probabilities for a batch of scaled feature vectors.
+
+        Args:
+            x (np.ndarray): Scaled features of shape (n_samples, n_features)
+            verbose: Ignored, accepted for Keras compatibility
+
+        Returns:
+            np.ndarray: float32 probabilities of shape (n_samples, n_classes)
+        """
+        x = np.asarray(x, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
@@ -0,0 +1,157 @@
+"""
+Prediction Cache Module
+Two-level in-memory cache for repeated uploads
+
+The first level maps the SHA-256 of an upload plus the extractor parameters
+to its MFCC feature vector, so a resubmitted clip skips decoding and
+extraction. The second level maps a feature vector plus a model name to the
+model output, so asking another model about the same clip only costs that
+model's forward pass, and asking the same model again costs nothing.
+Both levels are size-bounded LRUs whose entries also expire after a TTL.
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from .mfcc_engine import params_digest
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with a time-to-live and hit/miss counters"""
+
+    def __init__(self, max_entries=1024, ttl=3600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Entries kept before the least recently used is evicted;
+                0 disables the cache
+            ttl (float): Seconds an entry stays valid, or 0 for no expiry
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries."""
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Size, limits and counters of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class PredictionCache:
+    """Upload-to-features and features-to-prediction caches"""
+
+    def __init__(self, max_features=1024, max_predictions=4096, ttl=3600.0):
+        """
+        Initialize both cache levels.
+
+        Args:
+            max_features (int): Feature vectors kept (first level)
+            max_predictions (int): Model outputs kept (second level)
+            ttl (float): Seconds an entry of either level stays valid
+        """
+        self.features = LRUCache(max_features, ttl)
+        self.predictions = LRUCache(max_predictions, ttl)
+
+    @classmethod
+    def from_env(cls):
+        """Build the cache from CACHE_MAX_FEATURES, CACHE_MAX_PREDICTIONS and CACHE_TTL."""
+        return cls(
+            max_features=int(os.environ.get('CACHE_MAX_FEATURES', 1024)),
+            max_predictions=int(os.environ.get('CACHE_MAX_PREDICTIONS', 4096)),
+            ttl=float(os.environ.get('CACHE_TTL', 3600)),
+        )
+
+    @staticmethod
+    def upload_key(digest, params):
+        """First-level key: an upload's SHA-256 content digest plus extractor parameters."""
+        return digest, params_digest(params)
+
+    @staticmethod
+    def prediction_key(features, model_name):
+        """Second-level key: feature vector bytes plus model name."""
+        features = np.ascontiguousarray(features)
+        return hashlib.sha256(features.tobytes()).hexdigest(), str(features.dtype), model_name
+
+    def get_features(self, key):
+        """Cached feature vector for a first-level key, or None."""
+        return self.features.get(key)
+
+    def put_features(self, key, features):
+        """Cache a feature vector, read-only so callers cannot alter the shared copy."""
+        features = np.array(features)
+        features.flags.writeable = False
+        self.features.put(key, features)
+
+    def get_prediction(self, features, model_name):
+        """Cached (predicted class index, probabilities) for features and a model, or None."""
+        return self.predictions.get(self.prediction_key(features, model_name))
+
+    def put_prediction(self, features, model_name, prediction):
+        """Cache one model output for a feature vector."""
+        predicted_class_idx, probabilities = prediction
+        probabilities = np.array(probabilities)
+        probabilities.flags.writeable = False
+        self.predictions.put(self.prediction_key(features, model_name),
+                             (predicted_class_idx, probabilities))
+
+    def clear(self):
+        """Empty both levels."""
+        self.features.clear()
+        self.predictions.clear()
+
+    def stats(self):
+        """Counters of both levels."""
+        return {'features': self.features.stats(), 'predictions': self.predictions.stats()}
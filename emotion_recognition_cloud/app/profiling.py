@@ -0,0 +1,151 @@
+"""
+Profiling Module
+Opt-in sampling of live prediction requests into flame-graph stacks
+
+A SamplingProfiler picks a configurable fraction of requests. Only those run
+their extraction and model calls under a StackProfiler, which records the
+time spent in every distinct call stack, C functions such as NumPy and
+SciPy routines included. Extraction runs in worker processes and inference
+on pool threads, so the stacks are captured where the work runs and merged
+in the serving process. The aggregate is dumped in the collapsed stack
+format ("frame;frame;frame microseconds") read by flamegraph.pl,
+speedscope and similar tools.
+
+With a sample rate of 0 the only cost per request is one comparison.
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+
+
+class StackProfiler:
+    """Deterministic profiler accumulating self time per call stack"""
+
+    def __init__(self):
+        self.stacks = {}
+        self._frames = []
+        self._names = {}
+
+    def _code_name(self, code):
+        name = self._names.get(code)
+        if name is None:
+            name = self._names[code] = (
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+        return name
+
+    @staticmethod
+    def _c_name(function):
+        module = getattr(function, '__module__', None)
+        name = getattr(function, '__qualname__', getattr(function, '__name__', repr(function)))
+        return f"{module}.{name}" if module else name
+
+    def _callback(self, frame, event, arg):
+        now = time.perf_counter_ns()
+        if event == 'call':
+            self._frames.append([self._code_name(frame.f_code), now, 0])
+        elif event == 'c_call':
+            self._frames.append([self._c_name(arg), now, 0])
+        elif self._frames:
+            # Returns of frames entered before profiling started find an empty stack
+            key = tuple(entry[0] for entry in self._frames)
+            _, start, children = self._frames.pop()
+            elapsed = now - start
+            self.stacks[key] = self.stacks.get(key, 0) + elapsed - children
+            if self._frames:
+                self._frames[-1][2] += elapsed
+
+    def __enter__(self):
+        sys.setprofile(self._callback)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.setprofile(None)
+        return False
+
+
+def profile_call(fn, *args, **kwargs):
+    """
+    Run fn under a StackProfiler in the current thread.
+
+    Module-level so it can be shipped to process pool workers.
+
+    Returns:
+        tuple: (fn's result, dict of call stack tuple to self time in nanoseconds)
+    """
+    profiler = StackProfiler()
+    with profiler:
+        result = fn(*args, **kwargs)
+    return result, profiler.stacks
+
+
+class SamplingProfiler:
+    """Request sampling decision and the aggregated stacks of sampled requests"""
+
+    def __init__(self, sample_rate=0.0):
+        """
+        Initialize the profiler.
+
+        Args:
+            sample_rate (float): Fraction of requests profiled, 0 disables
+        """
+        self.sample_rate = 0.0
+        self.set_sample_rate(sample_rate)
+        self.profiles = 0
+        self._stacks = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build the profiler from PROFILE_SAMPLE_RATE."""
+        return cls(float(os.environ.get('PROFILE_SAMPLE_RATE', 0.0)))
+
+    def set_sample_rate(self, sample_rate):
+        """Change the profiled fraction of requests at runtime."""
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = float(sample_rate)
+
+    def should_sample(self):
+        """Whether the current request is profiled."""
+        return self.sample_rate > 0.0 and random.random() < self.sample_rate
+
+    def add(self, stacks, root=()):
+        """Merge the stacks of one profiled call under the given root frames."""
+        root = tuple(root)
+        with self._lock:
+            self.profiles += 1
+            for key, nanoseconds in stacks.items():
+                key = root + key
+                self._stacks[key] = self._stacks.get(key, 0) + nanoseconds
+
+    def collapsed(self):
+        """Aggregated stacks as collapsed text, one 'frame;frame value' line in microseconds."""
+        with self._lock:
+            items = sorted(self._stacks.items())
+        lines = []
+        for key, nanoseconds in items:
+            microseconds = nanoseconds // 1000
+            if microseconds > 0:
+                frames = ';'.join(frame.replace(';', ':') for frame in key)
+                lines.append(f"{frames} {microseconds}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def reset(self):
+        """Drop the aggregated stacks."""
+        with self._lock:
+            self._stacks.clear()
+            self.profiles = 0
+
+    def stats(self):
+        """Current settings and the size of the aggregate."""
+        with self._lock:
+            return {
+                'enabled': self.sample_rate > 0.0,
+                'sample_rate': self.sample_rate,
+                'profiles': self.profiles,
+                'stacks': len(self._stacks),
+            }
@@ -0,0 +1,428 @@
+"""
+Streaming Emotion Recognition
+Rolling-window MFCC features over PCM that arrives in chunks
+
+The extractor frames a whole clip at once. StreamFramer keeps the samples
+that do not yet fill a frame between chunks, so a stream cut into arbitrary
+pieces yields exactly the frames of the concatenated signal. StreamSession
+turns those frames into MFCC rows as they arrive and keeps only the rows of
+the current analysis window, so memory stays bounded however long the
+stream runs. Every ``hop`` seconds it summarizes the last ``window``
+seconds exactly as the extractor summarizes a clip of that length.
+
+IncrementalMFCC produces the whole-signal feature vector instead. The
+legacy vector only needs the column sums of the voiced MFCC rows and the
+mean and variance of the full MFCC matrix, so those are kept as running
+statistics and merged chunk by chunk (Chan et al.'s parallel form of
+Welford's update), in memory independent of the signal length.
+extract_file_mmap feeds it from a memory-mapped WAV and extract_stream
+from the decoding module, so the samples of a large or compressed file are
+only ever converted and resampled one block at a time.
+extract_timeline_blocks feeds a StreamSession from the same readers.
+"""
+
+import io
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+import soundfile
+import scipy.io.wavfile as wavfile
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .decoding import (
+    PolyphaseResampler, decode_stream, is_wav, parse_wav_header, to_int16_scale,
+    DECODE_BLOCK_FRAMES
+)
+from .mfcc_engine import (
+    get_extraction_plan, to_mono, frame_mfcc, summarize_mfcc, window_frame_counts
+)
+
+
+# Samples per channel converted to float at a time when reading memory-mapped WAVs
+MMAP_BLOCK_SAMPLES = 1 << 18
+
+# Leading bytes of a WAV file searched for its format chunk
+WAV_HEADER_BYTES = 64 * 1024
+
+
+class StreamFramer:
+    """Cuts a chunked signal into the frames of the legacy extractor"""
+
+    def __init__(self, plan):
+        """
+        Initialize the framer.
+
+        Args:
+            plan (ExtractionPlan): Frame size and hop of the extractor
+        """
+        self.plan = plan
+        self.n_frames = 0
+        self.n_samples = 0
+        self._pending = np.empty(0, dtype=plan.dtype)
+
+    def push(self, audio):
+        """
+        Add mono samples and return the frames they complete.
+
+        Like the legacy extractor, a frame is only emitted once at least one
+        sample past its end has arrived, which drops a final frame ending
+        exactly on the last sample.
+
+        Returns:
+            np.ndarray: New frames of shape (n_new, frame_size)
+        """
+        plan = self.plan
+        self.n_samples += len(audio)
+        buffer = np.concatenate((self._pending, audio))
+        # buffer starts at the first sample of frame self.n_frames
+        n_new = max(0, -(-(len(buffer) - plan.frame_size) // plan.hop_size))
+        if n_new == 0:
+            self._pending = buffer
+            return np.empty((0, plan.frame_size), dtype=plan.dtype)
+        frames = sliding_window_view(buffer, plan.frame_size)[::plan.hop_size][:n_new]
+        self.n_frames += n_new
+        # Copy so the consumed part of the buffer can be freed
+        self._pending = buffer[n_new * plan.hop_size:].copy()
+        return frames
+
+
+class StreamSession:
+    """Rolling-window feature vectors for one audio stream"""
+
+    def __init__(self, fs, channels=1, window=3.0, hop=1.0, voicing=None, sample_rate=None,
+                 **params):
+        """
+        Initialize the session.
+
+        Args:
+            fs (int): Sample rate of the stream in Hz
+            channels (int): Interleaved channels per sample
+            window (float): Seconds of audio summarized per prediction
+            hop (float): Seconds between predictions
+            voicing: Voicing detector or name, see voicing.get_voicing_detector
+            sample_rate (int): Rate the stream is resampled to, or None to keep fs
+            **params: Extractor parameters forwarded to get_extraction_plan
+        """
+        self.channels = int(channels)
+        self.resampler = None
+        if sample_rate and int(sample_rate) != int(fs):
+            self.resampler = PolyphaseResampler(fs, sample_rate)
+            fs = sample_rate
+        self.fs = int(fs)
+        self.plan = get_extraction_plan(self.fs, **params)
+        self.voicing = voicing
+        self.framer = StreamFramer(self.plan)
+
+        self.window_frames, self.hop_frames = window_frame_counts(self.plan, window, hop)
+        # MFCC row per frame of the current window, None for unvoiced frames
+        self._rows = deque(maxlen=self.window_frames)
+        self._last_emitted = 0
+
+    def _window(self, end_frame):
+        """Summarize the frames held, ending before end_frame, into one window."""
+        start_frame = end_frame - len(self._rows)
+        voiced = [row for row in self._rows if row is not None]
+        mfcc = np.array(voiced).reshape(len(voiced), self.plan.dct_matrix.shape[1])
+        features = summarize_mfcc(mfcc, len(self._rows))[1]
+        self._last_emitted = end_frame
+        hop = self.plan.hop_size
+        return {
+            'start': start_frame * hop / self.fs,
+            'end': ((end_frame - 1) * hop + self.plan.frame_size) / self.fs,
+            'features': features,
+        }
+
+    def push(self, pcm):
+        """
+        Add PCM samples and return the windows they complete.
+
+        Args:
+            pcm (np.ndarray): Integer samples, interleaved if multichannel
+
+        Returns:
+            list: Dicts with 'start' and 'end' seconds and 'features'
+        """
+        pcm = np.asarray(pcm)
+        if self.channels > 1:
+            pcm = pcm.reshape(-1, self.channels)
+        if self.resampler is not None:
+            pcm = self.resampler.push(pcm)
+        return self._process(to_mono(pcm, self.plan.dtype))
+
+    def _process(self, audio):
+        """Frame mono audio and collect the windows it completes."""
+        frames = self.framer.push(audio)
+        if len(frames) == 0:
+            return []
+
+        mfcc, voiced = frame_mfcc(frames, self.plan, self.voicing)
+        rows = iter(mfcc)
+        first_frame = self.framer.n_frames - len(frames)
+        windows = []
+        for i, is_voiced in enumerate(voiced):
+            self._rows.append(next(rows) if is_voiced else None)
+            n_seen = first_frame + i + 1
+            if n_seen >= self.window_frames and (n_seen - self.window_frames) % self.hop_frames == 0:
+                windows.append(self._window(n_seen))
+        return windows
+
+    def finish(self):
+        """
+        Flush the stream, summarizing frames not covered by a full window.
+
+        Returns:
+            list: Windows completed by the resampler tail, then the final
+                window unless every frame was already covered
+        """
+        windows = []
+        if self.resampler is not None:
+            windows = self._process(to_mono(self.resampler.finish(), self.plan.dtype))
+        if self.framer.n_frames == self._last_emitted or not self._rows:
+            return windows
+        return windows + [self._window(self.framer.n_frames)]
+
+
+class IncrementalMFCC:
+    """Whole-signal MFCC feature vector computed from pushed chunks"""
+
+    def __init__(self, fs, channels=1, voicing=None, **params):
+        """
+        Initialize the extractor.
+
+        Args:
+            fs (int): Sample rate in Hz
+            channels (int): Interleaved channels per sample
+            voicing: Voicing detector or name, see voicing.get_voicing_detector
+            **params: Extractor parameters forwarded to get_extraction_plan
+        """
+        self.fs = int(fs)
+        self.channels = int(channels)
+        self.plan = get_extraction_plan(self.fs, **params)
+        self.voicing = voicing
+        self.framer = StreamFramer(self.plan)
+        self.finished = False
+
+        n_mfcc = self.plan.dct_matrix.shape[1]
+        self.n_voiced = 0
+        self.voiced_sum = np.zeros(n_mfcc)
+        # Running mean and sum of squared deviations over every matrix entry,
+        # the zero columns of unvoiced frames included
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    @property
+    def n_frames(self):
+        """Frames processed so far."""
+        return self.framer.n_frames
+
+    @property
+    def duration(self):
+        """Seconds of audio pushed so far."""
+        return self.framer.n_samples / self.fs
+
+    def push(self, pcm):
+        """
+        Add integer PCM samples, interleaved if multichannel.
+
+        Returns:
+            int: Number of frames completed by these samples
+        """
+        if self.finished:
+            raise RuntimeError("Cannot push samples after finalize()")
+        pcm = np.asarray(pcm)
+        if self.channels > 1:
+            pcm = pcm.reshape(-1, self.channels)
+        frames = self.framer.push(to_mono(pcm, self.plan.dtype))
+        if len(frames) == 0:
+            return 0
+
+        mfcc, voiced = frame_mfcc(frames, self.plan, self.voicing)
+        self.n_voiced += len(mfcc)
+        self.voiced_sum += mfcc.sum(axis=0)
+
+        n_mfcc = mfcc.shape[1]
+        count = n_mfcc * len(frames)
+        mean = mfcc.sum() / count
+        n_zeros = n_mfcc * (len(frames) - len(mfcc))
+        m2 = np.sum((mfcc - mean) ** 2) + n_zeros * mean ** 2
+
+        total = self._count + count
+        delta = mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += m2 + delta ** 2 * self._count * count / total
+        self._count = total
+        return len(frames)
+
+    def snapshot(self):
+        """
+        Feature vector of the frames processed so far.
+
+        Returns:
+            np.ndarray: Vector of length n_mfcc, NaN until a voiced frame arrives
+        """
+        # Running statistics are kept in float64 whatever the working precision
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.n_voiced == 0:
+                return np.full(len(self.voiced_sum), np.nan, dtype=self.plan.dtype)
+            std = np.sqrt(self._m2 / self._count)
+            features = (self.voiced_sum / self.n_voiced - self._mean) / std
+        return features.astype(self.plan.dtype)
+
+    def finalize(self):
+        """
+        End the signal and return its feature vector.
+
+        Matches extract_mfcc on the concatenation of every pushed chunk.
+        """
+        self.finished = True
+        return self.snapshot()
+
+
+def extract_file_mmap(path, block_samples=MMAP_BLOCK_SAMPLES, voicing=None, sample_rate=None,
+                      timings=None, **params):
+    """
+    Extract the averaged MFCC feature vector of a WAV file through a memory map.
+
+    The PCM data stays in the page cache; each block of block_samples is
+    converted and framed on its own, so peak memory is bounded by the block
+    size instead of the file length. 24-bit files, which cannot be mapped,
+    are read block by block instead.
+
+    Args:
+        path (str): WAV file path
+        block_samples (int): Samples per channel processed at a time
+        voicing: Voicing detector or name, see voicing.get_voicing_detector
+        sample_rate (int): Rate to resample to, or None to keep the file rate
+        timings (dict): Filled with the 'audio_seconds' processed when given
+        **params: Extractor parameters forwarded to get_extraction_plan
+
+    Returns:
+        np.ndarray: Feature vector of length n_mfcc, equal to extract_mfcc on the whole file
+    """
+    with _wav_blocks(path, block_samples) as (fs, channels, blocks):
+        return _extract_blocks(blocks, fs, channels, voicing, sample_rate, timings, params)
+
+
+@contextmanager
+def _wav_blocks(path, block_samples):
+    """
+    Read a WAV file as blocks of block_samples samples per channel.
+
+    Yields:
+        tuple: (sample rate, channels, iterator of (n, channels) or (n,) blocks)
+    """
+    with open(path, 'rb') as f:
+        head = f.read(WAV_HEADER_BYTES)
+    try:
+        bits_per_sample = parse_wav_header(head).bits_per_sample
+    except ValueError:
+        # Left for wavfile to accept or reject
+        bits_per_sample = None
+    if bits_per_sample == 24:
+        # wavfile cannot map 3-byte samples; libsndfile reads them block by block,
+        # left-justified in int32 like wavfile's in-memory reader
+        with soundfile.SoundFile(path) as sound_file:
+            yield (sound_file.samplerate, sound_file.channels,
+                   sound_file.blocks(block_samples, dtype='int32', always_2d=True))
+        return
+
+    fs, signal = wavfile.read(path, mmap=True)
+    try:
+        channels = 1 if signal.ndim == 1 else signal.shape[1]
+        yield fs, channels, (signal[start:start + block_samples]
+                             for start in range(0, len(signal), block_samples))
+    finally:
+        # Release the mapping before the file handle goes away
+        del signal
+
+
+def _extract_blocks(blocks, fs, channels, voicing, sample_rate, timings, params):
+    """Run blocks of WAV samples through an IncrementalMFCC, resampling them on the way."""
+    resampler = None
+    if sample_rate and int(sample_rate) != fs:
+        resampler = PolyphaseResampler(fs, sample_rate)
+        fs = sample_rate
+    extractor = IncrementalMFCC(fs, channels=channels, voicing=voicing, **params)
+    for block in blocks:
+        block = to_int16_scale(block)
+        extractor.push(block if resampler is None else resampler.push(block))
+    if resampler is not None:
+        extractor.push(resampler.finish())
+    if timings is not None:
+        timings['audio_seconds'] = extractor.duration
+    return extractor.finalize()
+
+
+def extract_stream(source, sample_rate=None, block_frames=DECODE_BLOCK_FRAMES, voicing=None,
+                   timings=None, **params):
+    """
+    Extract the averaged MFCC feature vector of any decodable source block by block.
+
+    Args:
+        source: File path, encoded bytes or a binary file-like object
+        sample_rate (int): Rate to resample to, or None to keep the source rate
+        block_frames (int): Sample frames decoded at a time
+        voicing: Voicing detector or name, see voicing.get_voicing_detector
+        timings (dict): Filled with the 'audio_seconds' processed when given
+        **params: Extractor parameters forwarded to get_extraction_plan
+
+    Returns:
+        np.ndarray: Feature vector of length n_mfcc
+    """
+    fs, channels, blocks = decode_stream(source, sample_rate, block_frames)
+    # Closed even if the extractor cannot be built, so no decoder or temporary copy leaks
+    with blocks:
+        extractor = IncrementalMFCC(fs, channels=channels, voicing=voicing, **params)
+        for block in blocks:
+            extractor.push(block)
+    if timings is not None:
+        timings['audio_seconds'] = extractor.duration
+    return extractor.finalize()
+
+
+def extract_timeline_blocks(source, window=3.0, hop=1.0, sample_rate=None,
+                            block_samples=MMAP_BLOCK_SAMPLES, voicing=None, timings=None,
+                            **params):
+    """
+    Sliding-window feature vectors of a file read block by block.
+
+    WAV files are read in blocks of block_samples and other formats decoded
+    block by block, and the blocks run through a StreamSession, so only the
+    frames of one window are held at a time.
+
+    Args:
+        source: File path, encoded bytes or a binary file-like object
+        window (float): Window length in seconds
+        hop (float): Seconds between window starts
+        sample_rate (int): Rate to resample to, or None to keep the source rate
+        block_samples (int): Samples per channel read at a time
+        voicing: Voicing detector or name, see voicing.get_voicing_detector
+        timings (dict): Filled with the 'audio_seconds' processed when given
+        **params: Extractor parameters forwarded to get_extraction_plan
+
+    Returns:
+        tuple: (start seconds, end seconds, features of shape (n_windows, n_mfcc))
+            like mfcc_engine.extract_timeline
+    """
+    if is_wav(source):
+        with _wav_blocks(source, block_samples) as (fs, channels, blocks):
+            session = StreamSession(fs, channels, window, hop, voicing, sample_rate, **params)
+            windows = [w for block in blocks for w in session.push(to_int16_scale(block))]
+    else:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        fs, channels, blocks = decode_stream(source, sample_rate)
+        with blocks:
+            session = StreamSession(fs, channels, window, hop, voicing, **params)
+            windows = [w for block in blocks for w in session.push(block)]
+    windows += session.finish()
+    if timings is not None:
+        timings['audio_seconds'] = session.framer.n_samples / session.fs
+
+    n_mfcc = session.plan.dct_matrix.shape[1]
+    features = np.empty((len(windows), n_mfcc), dtype=session.plan.dtype)
+    for row, w in enumerate(windows):
+        features[row] = w['features']
+    return (np.array([w['start'] for w in windows]), np.array([w['end'] for w in windows]),
+            features)
@@ -0,0 +1,262 @@
+"""
+SVM Serving Backend
+Single-pass SVM scoring that returns label and probabilities together
+
+``SVC.predict`` and ``SVC.predict_proba`` each evaluate the kernel against
+every support vector. SVMScorer computes the kernel matrix once per batch,
+turns it into the one-vs-one decision values with a single matrix product,
+and derives both the libsvm vote and the Platt-scaled, pairwise-coupled
+probabilities from those values.
+
+RFFSVMScorer replaces the exact RBF kernel with random Fourier features, so
+each pairwise decision function collapses to one weight vector and scoring
+no longer depends on the number of support vectors.
+"""
+
+import numpy as np
+
+# Pairwise probabilities are clipped like libsvm does
+MIN_PROB = 1e-7
+
+
+def _sigmoid_predict(decision, prob_a, prob_b):
+    """Platt scaling as implemented in libsvm, stable for both signs."""
+    fapb = decision * prob_a + prob_b
+    positive = fapb >= 0
+    out = np.empty_like(fapb)
+    exp_neg = np.exp(-fapb[positive])
+    out[positive] = exp_neg / (1.0 + exp_neg)
+    out[~positive] = 1.0 / (1.0 + np.exp(fapb[~positive]))
+    return out
+
+
+def _couple_probabilities(pairwise, n_classes):
+    """
+    Combine pairwise probabilities into class probabilities.
+
+    Vectorized over samples, this follows libsvm's multiclass_probability
+    (Wu, Lin and Weng, 2004, method 2) update for update, so results match
+    SVC.predict_proba.
+
+    Args:
+        pairwise (np.ndarray): r[n, i, j], probability of class i against j
+
+    Returns:
+        np.ndarray: Probabilities of shape (n_samples, n_classes)
+    """
+    n = len(pairwise)
+    k = n_classes
+    r_sq = pairwise ** 2
+    Q = -pairwise.transpose(0, 2, 1) * pairwise
+    diagonal = r_sq.sum(axis=1) - r_sq[:, np.arange(k), np.arange(k)]
+    Q[:, np.arange(k), np.arange(k)] = diagonal
+
+    p = np.full((n, k), 1.0 / k)
+    active = np.ones(n, dtype=bool)
+    eps = 0.005 / k
+    for _ in range(max(100, k)):
+        Qp = np.einsum('nij,nj->ni', Q, p)
+        pQp = np.einsum('ni,ni->n', p, Qp)
+        active &= np.abs(Qp - pQp[:, None]).max(axis=1) >= eps
+        if not active.any():
+            break
+        a = np.flatnonzero(active)
+        Qa, pa, Qpa, pQpa = Q[a], p[a], Qp[a], pQp[a]
+        for t in range(k):
+            diff = (-Qpa[:, t] + pQpa) / Qa[:, t, t]
+            pa[:, t] += diff
+            pQpa = (pQpa + diff * (diff * Qa[:, t, t] + 2 * Qpa[:, t])) / (1 + diff) / (1 + diff)
+            Qpa = (Qpa + diff[:, None] * Qa[:, t, :]) / (1 + diff)[:, None]
+            pa /= (1 + diff)[:, None]
+        p[a] = pa
+    return p
+
+
+class SVMScorer:
+    """One-vs-one SVC evaluated with a single kernel matrix per batch"""
+
+    def __init__(self, support_vectors, pair_coef, intercept, classes, kernel='rbf',
+                 gamma=1.0, coef0=0.0, degree=3, prob_a=None, prob_b=None):
+        """
+        Initialize the scorer.
+
+        Args:
+            support_vectors (np.ndarray): Support vectors, (n_sv, n_features)
+            pair_coef (np.ndarray): Dual coefficients per class pair, (n_sv, n_pairs)
+            intercept (np.ndarray): Intercept per class pair
+            classes (np.ndarray): Class values returned by predict
+            kernel (str): 'rbf', 'linear', 'poly' or 'sigmoid'
+            prob_a, prob_b (np.ndarray): Platt scaling parameters per pair
+        """
+        if kernel not in ('rbf', 'linear', 'poly', 'sigmoid'):
+            raise ValueError(f"Unsupported kernel '{kernel}'")
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=np.float64)
+        self.pair_coef = np.asarray(pair_coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.kernel = kernel
+        self.gamma = float(gamma)
+        self.coef0 = float(coef0)
+        self.degree = int(degree)
+        self.prob_a = prob_a
+        self.prob_b = prob_b
+        self._sv_sq = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+
+        n_classes = len(self.classes_)
+        self.pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Build a scorer from a fitted sklearn SVC.
+
+        Raises:
+            ValueError: For precomputed or callable kernels
+        """
+        if not isinstance(model.kernel, str) or model.kernel == 'precomputed':
+            raise ValueError(f"Unsupported kernel '{model.kernel}'")
+        support_vectors = model.support_vectors_
+        # libsvm layout, before sklearn flips the signs for binary problems
+        dual_coef = model._dual_coef_
+        n_classes = len(model.classes_)
+        starts = np.concatenate(([0], np.cumsum(model._n_support)))
+
+        pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+        pair_coef = np.zeros((len(support_vectors), len(pairs)))
+        for p, (i, j) in enumerate(pairs):
+            pair_coef[starts[i]:starts[i + 1], p] = dual_coef[j - 1, starts[i]:starts[i + 1]]
+            pair_coef[starts[j]:starts[j + 1], p] = dual_coef[i, starts[j]:starts[j + 1]]
+
+        has_proba = getattr(model, 'probA_', None) is not None and len(model.probA_) > 0
+        return cls(support_vectors, pair_coef, model._intercept_, model.classes_,
+                   kernel=model.kernel, gamma=model._gamma, coef0=model.coef0, degree=model.degree,
+                   prob_a=model.probA_ if has_proba else None,
+                   prob_b=model.probB_ if has_proba else None)
+
+    def kernel_matrix(self, X):
+        """Kernel between query rows and support vectors, (n_queries, n_sv)."""
+        dot = X @ self.support_vectors.T
+        if self.kernel == 'linear':
+            return dot
+        if self.kernel == 'poly':
+            return (self.gamma * dot + self.coef0) ** self.degree
+        if self.kernel == 'sigmoid':
+            return np.tanh(self.gamma * dot + self.coef0)
+        sq = np.einsum('ij,ij->i', X, X)[:, None] - 2.0 * dot + self._sv_sq
+        return np.exp(-self.gamma * np.maximum(sq, 0.0))
+
+    def decision_values(self, X):
+        """One-vs-one decision values, (n_queries, n_pairs)."""
+        return self.kernel_matrix(X) @ self.pair_coef + self.intercept
+
+    def predict_with_proba(self, X):
+        """
+        Predict classes and probabilities from one kernel evaluation.
+
+        Args:
+            X (np.ndarray): Query vectors of shape (n_queries, n_features)
+
+        Returns:
+            tuple: (predicted class values, probabilities of shape (n_queries, n_classes))
+        """
+        X = np.asarray(X, dtype=np.float64)
+        decision = self.decision_values(X)
+        n, n_classes = len(X), len(self.classes_)
+
+        # libsvm one-vs-one voting, ties go to the lower class index
+        votes = np.zeros((n, n_classes), dtype=np.intp)
+        for p, (i, j) in enumerate(self.pairs):
+            positive = decision[:, p] > 0
+            votes[:, i] += positive
+            votes[:, j] += ~positive
+        predicted = self.classes_[np.argmax(votes, axis=1)]
+
+        if self.prob_a is None:
+            probabilities = np.zeros((n, n_classes))
+            probabilities[np.arange(n), np.argmax(votes, axis=1)] = 1.0
+            return predicted, probabilities
+
+        pairwise_p = np.clip(_sigmoid_predict(decision, self.prob_a, self.prob_b),
+                             MIN_PROB, 1 - MIN_PROB)
+        # scikit-learn's libsvm couples two-class problems as well
+        pairwise = np.zeros((n, n_classes, n_classes))
+        for p, (i, j) in enumerate(self.pairs):
+            pairwise[:, i, j] = pairwise_p[:, p]
+            pairwise[:, j, i] = 1 - pairwise_p[:, p]
+        return predicted, _couple_probabilities(pairwise, n_classes)
+
+    def predict(self, X):
+        """Predicted class values for the query rows."""
+        return self.predict_with_proba(X)[0]
+
+    def predict_proba(self, X):
+        """Class probabilities for the query rows."""
+        return self.predict_with_proba(X)[1]
+
+
+class RFFSVMScorer(SVMScorer):
+    """RBF SVC approximated with random Fourier features"""
+
+    def __init__(self, omega, offset, pair_weights, intercept, classes, prob_a=None, prob_b=None):
+        """
+        Initialize the approximate scorer.
+
+        Args:
+            omega (np.ndarray): Random projection, (n_features, n_components)
+            offset (np.ndarray): Random phases, (n_components,)
+            pair_weights (np.ndarray): Decision weights per pair, (n_components, n_pairs)
+        """
+        self.omega = np.asarray(omega, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.pair_weights = np.asarray(pair_weights, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.prob_a = prob_a
+        self.prob_b = prob_b
+        n_classes = len(self.classes_)
+        self.pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+
+    @classmethod
+    def from_scorer(cls, scorer, n_components=2048, random_state=0):
+        """
+        Approximate an exact RBF scorer.
+
+        The kernel expansion sum_sv alpha * k(sv, x) becomes w . z(x) with
+        w = sum_sv alpha * z(sv), so the support vectors are only needed here.
+        """
+        if scorer.kernel != 'rbf':
+            raise ValueError("Random Fourier features only approximate the RBF kernel")
+        rng = np.random.default_rng(random_state)
+        n_features = scorer.support_vectors.shape[1]
+        omega = rng.normal(scale=np.sqrt(2 * scorer.gamma), size=(n_features, n_components))
+        offset = rng.uniform(0, 2 * np.pi, size=n_components)
+        approx = cls(omega, offset, np.zeros((n_components, len(scorer.pairs))),
+                     scorer.intercept, scorer.classes_, scorer.prob_a, scorer.prob_b)
+        approx.pair_weights = approx.features(scorer.support_vectors).T @ scorer.pair_coef
+        return approx
+
+    def features(self, X):
+        """Random Fourier feature map z(x), (n_rows, n_components)."""
+        projection = X @ self.omega + self.offset
+        return np.sqrt(2.0 / self.omega.shape[1]) * np.cos(projection)
+
+    def decision_values(self, X):
+        """Approximate one-vs-one decision values, (n_queries, n_pairs)."""
+        return self.features(X) @ self.pair_weights + self.intercept
+
+    def save(self, path):
+        """Persist the approximation as .npz."""
+        arrays = {'omega': self.omega, 'offset': self.offset, 'pair_weights': self.pair_weights,
+                  'intercept': self.intercept, 'classes': self.classes_}
+        if self.prob_a is not None:
+            arrays['prob_a'] = self.prob_a
+            arrays['prob_b'] = self.prob_b
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load an approximation saved with save()."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['omega'], data['offset'], data['pair_weights'], data['intercept'],
+                       data['classes'], data['prob_a'] if 'prob_a' in data else None,
+                       data['prob_b'] if 'prob_b' in data else None)
@@ -0,0 +1,307 @@
+"""
+Upload Handling Module
+Size limits, early header validation and bounded-memory spooling of uploads
+
+An upload is checked from its first bytes before the rest is read: the
+container is recognized from its magic bytes and WAV headers are parsed, so
+unsupported codecs, sample rates or channel counts and recordings longer than
+the configured limit are rejected without touching the samples. Accepted
+uploads are read in chunks and hashed on the way; small ones stay in memory,
+larger ones are spooled to a temporary file whose path is handed to the
+extractor, which memory-maps or stream-decodes it block by block.
+
+RequestSizeLimitMiddleware caps whole request bodies, by Content-Length when
+the client sends one and by counting the received bytes otherwise.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from starlette.exceptions import HTTPException
+
+from .decoding import parse_wav_header, WAV_MAGIC, WAV_FORMAT_PCM, WAV_FORMAT_FLOAT
+
+# Leading bytes inspected before the rest of an upload is read
+HEADER_BYTES = 64 * 1024
+
+# Bytes read from an upload at a time
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadRejected(Exception):
+    """Raised when an upload fails validation; carries the HTTP status to return"""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class UploadLimits:
+    """Limits applied to every uploaded audio file"""
+
+    def __init__(self, max_bytes=512 * 1024 * 1024, max_seconds=3600.0, max_sample_rate=192000,
+                 max_channels=8, spool_bytes=8 * 1024 * 1024):
+        """
+        Initialize the limits.
+
+        Args:
+            max_bytes (int): Largest accepted file
+            max_seconds (float): Longest accepted recording, checked from the
+                WAV header before the samples are read
+            max_sample_rate (int): Highest accepted WAV sample rate in Hz
+            max_channels (int): Most channels accepted in a WAV file
+            spool_bytes (int): Uploads larger than this are spooled to disk
+                instead of being kept in memory
+        """
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.max_sample_rate = max_sample_rate
+        self.max_channels = max_channels
+        self.spool_bytes = spool_bytes
+
+    @classmethod
+    def from_env(cls):
+        """Build the limits from MAX_UPLOAD_BYTES, MAX_AUDIO_SECONDS, MAX_SAMPLE_RATE,
+        MAX_CHANNELS and UPLOAD_SPOOL_BYTES."""
+        return cls(
+            max_bytes=int(os.environ.get('MAX_UPLOAD_BYTES', 512 * 1024 * 1024)),
+            max_seconds=float(os.environ.get('MAX_AUDIO_SECONDS', 3600)),
+            max_sample_rate=int(os.environ.get('MAX_SAMPLE_RATE', 192000)),
+            max_channels=int(os.environ.get('MAX_CHANNELS', 8)),
+            spool_bytes=int(os.environ.get('UPLOAD_SPOOL_BYTES', 8 * 1024 * 1024)),
+        )
+
+
+def sniff_container(head):
+    """
+    Recognize an audio container from its leading bytes.
+
+    Returns:
+        str: 'wav', 'flac', 'ogg', 'mp3' or 'm4a', or None if unrecognized
+    """
+    if head[:4] in WAV_MAGIC:
+        return 'wav'
+    if head[:4] == b'fLaC':
+        return 'flac'
+    if head[:4] == b'OggS':
+        return 'ogg'
+    if head[:3] == b'ID3' or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    if head[4:8] == b'ftyp':
+        return 'm4a'
+    return None
+
+
+def check_header(head, limits):
+    """
+    Validate an upload from its first bytes.
+
+    Returns:
+        WavHeader: The parsed header for WAV uploads, None for other containers
+
+    Raises:
+        UploadRejected: 415 for unsupported containers, codecs, rates or
+            channel counts, 400 for malformed headers, 413 for recordings
+            longer than the limit
+    """
+    container = sniff_container(head)
+    if container is None:
+        raise UploadRejected(415, "Unrecognized audio format. Please upload a WAV, MP3, M4A, or FLAC file.")
+    if container != 'wav':
+        return None
+
+    try:
+        header = parse_wav_header(head)
+    except ValueError as e:
+        raise UploadRejected(400, f"Invalid WAV header: {str(e)}")
+    if header.format_tag not in (WAV_FORMAT_PCM, WAV_FORMAT_FLOAT):
+        raise UploadRejected(
+            415, f"Unsupported WAV codec (format tag 0x{header.format_tag:04x}); use PCM or IEEE float"
+        )
+    if not 0 < header.sample_rate <= limits.max_sample_rate:
+        raise UploadRejected(
+            415, f"Unsupported sample rate {header.sample_rate} Hz (maximum {limits.max_sample_rate} Hz)"
+        )
+    if not 0 < header.channels <= limits.max_channels:
+        raise UploadRejected(
+            415, f"Unsupported channel count {header.channels} (maximum {limits.max_channels})"
+        )
+    duration = header.duration
+    if duration is not None and duration > limits.max_seconds:
+        raise UploadRejected(
+            413, f"Recording is {duration:.1f} s long (maximum {limits.max_seconds:g} s)"
+        )
+    return header
+
+
+class ReceivedUpload:
+    """A validated upload, in memory or spooled to a temporary file"""
+
+    def __init__(self, source, digest, size, header=None):
+        """
+        Args:
+            source: The upload bytearray, or the path of the temporary file holding it
+            digest (str): SHA-256 hex digest of the content
+            size (int): Content length in bytes
+            header (WavHeader): Parsed header of WAV uploads
+        """
+        self.source = source
+        self.digest = digest
+        self.size = size
+        self.header = header
+
+    @property
+    def spooled(self):
+        """Whether the content lives in a temporary file."""
+        return isinstance(self.source, str)
+
+    def close(self):
+        """Delete the temporary file of a spooled upload."""
+        if self.spooled and os.path.exists(self.source):
+            os.unlink(self.source)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+async def receive_upload(file, limits):
+    """
+    Validate an upload from its header, then read it in bounded chunks.
+
+    Args:
+        file (UploadFile): The uploaded file
+        limits (UploadLimits): Limits to enforce
+
+    Returns:
+        ReceivedUpload: The content with its digest; close it when done
+
+    Raises:
+        UploadRejected: If the header or the size fails validation
+    """
+    # Multipart parsing already knows the size of spooled parts
+    if file.size is not None and file.size > limits.max_bytes:
+        raise UploadRejected(413, f"File exceeds the {limits.max_bytes} byte upload limit")
+    head = await file.read(HEADER_BYTES)
+    size = len(head)
+    if size > limits.max_bytes:
+        raise UploadRejected(413, f"File exceeds the {limits.max_bytes} byte upload limit")
+    header = check_header(head, limits)
+
+    hasher = hashlib.sha256(head)
+    # One growing buffer, handed on as is, so small uploads are held only once
+    buffer = bytearray(head)
+    spool = None
+    try:
+        while True:
+            chunk = await file.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limits.max_bytes:
+                raise UploadRejected(413, f"File exceeds the {limits.max_bytes} byte upload limit")
+            hasher.update(chunk)
+            if spool is None and size > limits.spool_bytes:
+                spool = tempfile.NamedTemporaryFile(prefix='upload-', delete=False)
+                spool.write(buffer)
+                buffer = None
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                buffer += chunk
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    if spool is not None:
+        spool.close()
+        upload = ReceivedUpload(spool.name, hasher.hexdigest(), size, header)
+    else:
+        upload = ReceivedUpload(buffer, hasher.hexdigest(), size, header)
+
+    # Streamed WAVs leave the data size open; bound their length by the file size
+    if header is not None and header.duration is None and header.block_align:
+        duration = size / header.block_align / header.sample_rate
+        if duration > limits.max_seconds:
+            upload.close()
+            raise UploadRejected(
+                413, f"Recording is about {duration:.1f} s long (maximum {limits.max_seconds:g} s)"
+            )
+    return upload
+
+
+class _BodyTooLarge(HTTPException):
+    """Raised from receive once a body passes the limit; an HTTPException so body
+    parsing hands it to the exception handlers as a 413 instead of a parse error"""
+
+    def __init__(self, max_bytes):
+        super().__init__(413, f"Request body exceeds the {max_bytes} byte limit")
+
+
+class RequestSizeLimitMiddleware:
+    """ASGI middleware answering 413 to request bodies over a byte limit"""
+
+    def __init__(self, app, max_bytes):
+        """
+        Args:
+            app: The wrapped ASGI application
+            max_bytes (int): Largest accepted request body
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    async def _reject(send, max_bytes):
+        body = json.dumps({"detail": f"Request body exceeds the {max_bytes} byte limit"}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode()),
+                        (b'connection', b'close')],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        # Refuse declared oversize bodies before reading a byte of them
+        for name, value in scope.get('headers', []):
+            if name == b'content-length':
+                if value.isdigit() and int(value) > self.max_bytes:
+                    await self._reject(send, self.max_bytes)
+                    return
+                break
+
+        received = 0
+        response_started = False
+
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    raise _BodyTooLarge(self.max_bytes)
+            return message
+
+        async def send_tracked(message):
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_limited, send_tracked)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(send, self.max_bytes)
@@ -0,0 +1,113 @@
+"""
+Voicing Detection Module
+Frame gates that decide which frames contribute MFCC coefficients
+
+The legacy extractor keeps a frame when ``max(np.correlate(frame, frame,
+'full')[20:]) > 0.1``. For frames longer than 20 samples that slice contains
+lag zero, and an autocorrelation never exceeds its lag-zero value, so the
+rule is exactly ``sum(frame ** 2) > 0.1``. EnergyVoicing evaluates that sum
+directly; AutocorrelationVoicing reproduces the full lag search with one
+batched FFT for the rare case where the slice does not reach lag zero.
+"""
+
+import numpy as np
+
+# Threshold used by the legacy extractor
+VOICING_THRESHOLD = 0.1
+
+
+class EnergyVoicing:
+    """Keep frames whose energy exceeds the threshold (legacy rule)"""
+
+    name = 'energy'
+
+    def __init__(self, threshold=VOICING_THRESHOLD):
+        """Initialize the gate with an energy threshold."""
+        self.threshold = threshold
+
+    def __call__(self, frames):
+        """Return a boolean mask of kept frames for an (n_frames, frame_size) matrix."""
+        return np.einsum('ij,ij->i', frames, frames) > self.threshold
+
+
+class AutocorrelationVoicing:
+    """Legacy autocorrelation peak rule computed for all frames with one FFT"""
+
+    name = 'autocorr'
+
+    def __init__(self, threshold=VOICING_THRESHOLD, min_index=20):
+        """
+        Initialize the gate.
+
+        Args:
+            threshold (float): Peak value a frame must exceed to be kept
+            min_index (int): First index of the 'full' correlation searched
+        """
+        self.threshold = threshold
+        self.min_index = min_index
+
+    def __call__(self, frames):
+        """Return a boolean mask of kept frames for an (n_frames, frame_size) matrix."""
+        n_frames, frame_size = frames.shape
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+        n_fft = 1 << int(2 * frame_size - 1).bit_length()
+        spectrum = np.fft.rfft(frames, n_fft, axis=1)
+        acorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n_fft, axis=1)
+        # Index i of the 'full' correlation is lag i - (frame_size - 1); the
+        # autocorrelation is symmetric so only the absolute lag matters.
+        first_lag = max(0, self.min_index - (frame_size - 1))
+        return acorr[:, first_lag:frame_size].max(axis=1) > self.threshold
+
+
+class EnergyZCRVoicing:
+    """Energy gate that also drops noise-like frames with many zero crossings"""
+
+    name = 'energy-zcr'
+
+    def __init__(self, threshold=VOICING_THRESHOLD, max_zcr=0.25):
+        """
+        Initialize the gate.
+
+        Args:
+            threshold (float): Energy a frame must exceed to be kept
+            max_zcr (float): Largest fraction of sign changes between samples
+        """
+        self.threshold = threshold
+        self.max_zcr = max_zcr
+
+    def __call__(self, frames):
+        """Return a boolean mask of kept frames for an (n_frames, frame_size) matrix."""
+        energy = np.einsum('ij,ij->i', frames, frames)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / max(frames.shape[1] - 1, 1)
+        return (energy > self.threshold) & (zcr < self.max_zcr)
+
+
+VOICING_DETECTORS = {
+    EnergyVoicing.name: EnergyVoicing,
+    AutocorrelationVoicing.name: AutocorrelationVoicing,
+    EnergyZCRVoicing.name: EnergyZCRVoicing,
+}
+
+
+def get_voicing_detector(voicing=None):
+    """
+    Resolve a voicing detector from a name, an instance or None.
+
+    Args:
+        voicing: Detector name ('energy', 'autocorr', 'energy-zcr'), a callable
+            taking a frame matrix, or None for the legacy energy rule
+
+    Returns:
+        callable: Detector returning a boolean mask of kept frames
+    """
+    if voicing is None:
+        return EnergyVoicing()
+    if isinstance(voicing, str):
+        if voicing not in VOICING_DETECTORS:
+            raise ValueError(
+                f"Unknown voicing detector '{voicing}'. Available: {list(VOICING_DETECTORS)}"
+            )
+        return VOICING_DETECTORS[voicing]()
+    return voicing
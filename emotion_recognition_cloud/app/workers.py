@@ -0,0 +1,190 @@
+"""
+Worker Pool Module
+Bounded executors that keep blocking extraction and inference off the event loop
+
+Feature extraction is pure NumPy work that holds the GIL, so it runs in a
+process pool. Model inference runs in a small thread pool. Every request
+takes an admission slot first; once all workers are busy and the queue is
+full, new requests are rejected immediately instead of piling up.
+
+Both pools are started with start() when the application starts, so the
+first requests do not pay for spawning the extraction processes.
+"""
+
+import os
+import asyncio
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ServiceSaturated(Exception):
+    """Raised when every worker is busy and the request queue is full"""
+
+
+def _noop(*args):
+    """Default warm-up task; module-level so worker processes can unpickle it."""
+
+
+class WorkerPool:
+    """Process pool for extraction and thread pool for inference with admission control"""
+
+    def __init__(self, extraction_workers=None, inference_workers=3, max_queue_depth=None,
+                 request_timeout=30.0):
+        """
+        Configure the pool; executors are created by start() or on first use.
+
+        Args:
+            extraction_workers (int): Extraction processes, defaults to the CPU count
+            inference_workers (int): Threads running scaler and model calls
+            max_queue_depth (int): Requests allowed to wait for a busy worker,
+                defaults to twice the number of extraction workers
+            request_timeout (float): Seconds a single stage may take before
+                the request is abandoned
+        """
+        self.extraction_workers = extraction_workers or os.cpu_count() or 1
+        self.inference_workers = inference_workers
+        if max_queue_depth is None:
+            max_queue_depth = 2 * self.extraction_workers
+        self.max_queue_depth = max_queue_depth
+        self.request_timeout = request_timeout
+        self.in_flight = 0
+        self._extraction_executor = None
+        self._inference_executor = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool from the EXTRACTION_WORKERS, INFERENCE_WORKERS,
+        MAX_QUEUE_DEPTH and REQUEST_TIMEOUT environment variables."""
+        def env_int(name):
+            value = os.environ.get(name)
+            return int(value) if value else None
+
+        return cls(
+            extraction_workers=env_int('EXTRACTION_WORKERS'),
+            inference_workers=env_int('INFERENCE_WORKERS') or 3,
+            max_queue_depth=env_int('MAX_QUEUE_DEPTH'),
+            request_timeout=float(os.environ.get('REQUEST_TIMEOUT', 30.0)),
+        )
+
+    @property
+    def capacity(self):
+        """Number of requests admitted at once, running or queued."""
+        return self.extraction_workers + self.max_queue_depth
+
+    @property
+    def queue_depth(self):
+        """Admitted requests that are waiting for a worker."""
+        return max(0, self.in_flight - self.extraction_workers)
+
+    def acquire(self):
+        """
+        Take an admission slot; every call must be paired with release().
+
+        Only called from the event loop thread, so the counter needs no lock.
+
+        Raises:
+            ServiceSaturated: When all slots are taken
+        """
+        if self.in_flight >= self.capacity:
+            raise ServiceSaturated(
+                f"Server busy: {self.in_flight} requests in flight (capacity {self.capacity})"
+            )
+        self.in_flight += 1
+
+    def release(self):
+        """Return an admission slot taken by acquire()."""
+        self.in_flight -= 1
+
+    @contextmanager
+    def admit(self):
+        """
+        Hold an admission slot for the duration of a request.
+
+        Raises:
+            ServiceSaturated: When all slots are taken
+        """
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _extraction(self):
+        if self._extraction_executor is None:
+            # TensorFlow is not fork-safe, so workers are spawned fresh
+            self._extraction_executor = ProcessPoolExecutor(
+                max_workers=self.extraction_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._extraction_executor
+
+    def _inference(self):
+        if self._inference_executor is None:
+            self._inference_executor = ThreadPoolExecutor(
+                max_workers=self.inference_workers, thread_name_prefix='inference'
+            )
+        return self._inference_executor
+
+    async def start(self, warmup=None, *args):
+        """
+        Create both executors and spawn every extraction process.
+
+        Processes are spawned on demand, one per task submitted while the
+        others are busy, so one warm-up task per worker starts them all.
+
+        Args:
+            warmup: Picklable function run by each extraction worker, e.g. to
+                import its modules and build caches; a no-op by default
+            *args: Arguments for warmup
+        """
+        loop = asyncio.get_running_loop()
+        extraction = self._extraction()
+        await asyncio.gather(*(
+            loop.run_in_executor(extraction, warmup or _noop, *args)
+            for _ in range(self.extraction_workers)
+        ))
+        self._inference()
+
+    async def _run(self, executor, fn, *args):
+        """
+        Run fn in executor, waiting at most request_timeout seconds.
+
+        A task the caller stops waiting for is cancelled if it has not
+        started; one that is already running holds an admission slot of its
+        own until it finishes, so abandoned work still counts against the
+        capacity.
+        """
+        loop = asyncio.get_running_loop()
+        future = executor.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.request_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if not future.cancel() and not future.done():
+                self.in_flight += 1
+                future.add_done_callback(lambda _: self._release_from(loop))
+            raise
+
+    def _release_from(self, loop):
+        """Release a slot from an executor callback thread."""
+        try:
+            loop.call_soon_threadsafe(self.release)
+        except RuntimeError:
+            # The loop is closed; nothing is admitted any more
+            pass
+
+    async def run_extraction(self, fn, *args):
+        """Run a picklable extraction function in the process pool."""
+        return await self._run(self._extraction(), fn, *args)
+
+    async def run_inference(self, fn, *args):
+        """Run a model call in the inference thread pool."""
+        return await self._run(self._inference(), fn, *args)
+
+    def shutdown(self):
+        """Stop both executors without waiting for queued work."""
+        for executor in (self._extraction_executor, self._inference_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._extraction_executor = None
+        self._inference_executor = None
@@ -0,0 +1,108 @@
+"""
+Shared fixtures for the tests: synthetic WAV clips, small synthetic models and
+an in-process API client.
+
+The models are trained on random 40-dimensional features in a temporary
+directory, so the tests run without the real saved_models and without
+TensorFlow; their predictions carry no meaning.
+"""
+
+import io
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+from unittest import mock
+from contextlib import contextmanager
+import numpy as np
+import joblib
+import scipy.io.wavfile as wavfile
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.svm import SVC
+from sklearn.neighbors import KNeighborsClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.numpy_mlp import NumpyMLP
+
+EMOTION_CLASSES = [
+    "A angustia", "E disgusto", "F alegria", "L Sorpresa",
+    "L aburrimiento", "N neutral", "T tristeza", "W ira"
+]
+
+
+def make_wav(fs, seconds=1.5, channels=1, seed=0):
+    """Build an in-memory WAV with tones, noise and silent gaps."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(fs * seconds)) / fs
+    tone = 0.4 * np.sin(2 * np.pi * 220 * t) + 0.2 * np.sin(2 * np.pi * 1375 * t)
+    tone *= 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    tone += 0.05 * rng.standard_normal(len(t))
+    # Silent gaps exercise the voicing gate
+    tone[int(0.4 * fs):int(0.6 * fs)] = 0
+    tone[-int(0.2 * fs):] *= 0.001
+    if channels > 1:
+        tone = np.stack([tone, np.roll(tone, 37) * 0.8], axis=1)
+    signal = (tone * 32767 * 0.8).astype(np.int16)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, signal)
+    return buffer.getvalue()
+
+
+_models_dir = None
+
+
+def models_dir():
+    """Directory with a scaler, label encoder and MLP, SVM and KNN models, built once."""
+    global _models_dir
+    if _models_dir is not None:
+        return _models_dir
+    path = tempfile.mkdtemp(prefix='saved_models-')
+    atexit.register(shutil.rmtree, path, True)
+
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((200, 40))
+    y = rng.integers(0, len(EMOTION_CLASSES), 200)
+    X[np.arange(200), y] += 2
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    joblib.dump(scaler, os.path.join(path, 'feature_scaler.pkl'))
+    joblib.dump(LabelEncoder().fit(EMOTION_CLASSES), os.path.join(path, 'label_encoder.pkl'))
+    joblib.dump(SVC(probability=True, random_state=0).fit(X_scaled, y),
+                os.path.join(path, 'svm_emotion_model.pkl'))
+    joblib.dump(KNeighborsClassifier(5).fit(X_scaled, y), os.path.join(path, 'knn_emotion_model.pkl'))
+    NumpyMLP([(rng.standard_normal((40, 16)) * 0.3, np.zeros(16), 'relu'),
+              (rng.standard_normal((16, 8)) * 0.3, np.zeros(8), 'softmax')],
+             scaler.mean_, scaler.scale_).save(os.path.join(path, 'mlp_emotion_model.npz'))
+    _models_dir = path
+    return path
+
+
+@contextmanager
+def api_client(preload=None):
+    """
+    TestClient for the app serving the synthetic models.
+
+    preload is passed to EmotionRecognitionModel; None follows
+    PRELOAD_MODELS, which loads every model up front by default.
+
+    The prediction caches (entries and counters) start empty and the
+    profiler starts disabled and empty, so tests do not see each other's
+    results or settings.
+
+    Yields:
+        tuple: (TestClient, the app.main module)
+    """
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.model_loader import EmotionRecognitionModel
+    from app.prediction_cache import PredictionCache
+    from app.profiling import SamplingProfiler
+
+    model = EmotionRecognitionModel(models_dir(), preload=preload)
+    with mock.patch.object(main, 'emotion_model', model), \
+            mock.patch.object(main, 'prediction_cache', PredictionCache.from_env()), \
+            mock.patch.object(main, 'profiler', SamplingProfiler()):
+        with TestClient(main.app) as client:
+            yield client, main
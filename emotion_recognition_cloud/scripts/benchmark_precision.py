@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark float32 against float64 feature extraction and compare predictions.
+
+Extracts the test split of the metadata manifests in both precisions,
+reporting throughput and peak NumPy memory, then scores both feature sets
+with every available model and reports how often the predicted labels agree
+and how far the probabilities move. Without the audio data, --synthetic
+generates test clips so the timing part can still run.
+
+Example:
+    python scripts/benchmark_precision.py --data-dir ../data --models-dir saved_models
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.mfcc_engine import extract_mfcc_batch, PRECISIONS
+from app.model_loader import EmotionRecognitionModel
+from featurize_dataset import read_manifest
+from synthetic_speech import speech_like_signal
+
+DEFAULT_MANIFESTS = sorted(glob.glob(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'metadata', '*.csv')))
+
+
+def load_test_split(manifests, data_dir, split):
+    """Return the readable audio paths of one split across the manifests."""
+    paths = []
+    for manifest in manifests:
+        # Manifests are named "<dataset> - testSize 0.3.csv"
+        dataset = os.path.basename(manifest).split(' - ')[0]
+        manifest_paths, _, splits = read_manifest(manifest, data_dir, dataset)
+        paths += [p for p, s in zip(manifest_paths, splits) if s == split and os.path.exists(p)]
+    return paths
+
+
+def synthetic_clips(n_clips, fs=16000, seconds=3.0):
+    """Speech-like test clips as (signal, fs) tuples."""
+    rng = np.random.default_rng(0)
+    return [(speech_like_signal(fs, seconds, rng), fs) for _ in range(n_clips)]
+
+
+def benchmark(sources, precision, repeats):
+    """Time extraction in one precision and record its peak traced memory."""
+    extract_mfcc_batch(sources[:1], precision=precision)
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        features, errors = extract_mfcc_batch(sources, precision=precision)
+        timings.append(time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    extract_mfcc_batch(sources, precision=precision)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return features, errors, min(timings), peak
+
+
+def main(args):
+    if args.synthetic:
+        sources = synthetic_clips(args.synthetic)
+        print(f"🎛️  Using {len(sources)} synthetic clips")
+    else:
+        sources = load_test_split(args.manifest or DEFAULT_MANIFESTS, args.data_dir, args.split)
+        if not sources:
+            print("❌ No audio found for the manifests; pass --data-dir or use --synthetic N")
+            return 1
+        print(f"🎛️  Using {len(sources)} '{args.split}' files")
+
+    print("\n⏱️  Extraction")
+    results = {}
+    for precision in PRECISIONS:
+        features, errors, elapsed, peak = benchmark(sources, precision, args.repeats)
+        results[precision] = (features, errors)
+        print(f"{precision:>8} | {len(sources) / elapsed:8.1f} files/s | "
+              f"peak {peak / 2 ** 20:8.1f} MiB")
+
+    (f64, e64), (f32, e32) = results['float64'], results['float32']
+    valid = [i for i, (a, b) in enumerate(zip(e64, e32)) if a is None and b is None]
+    f64, f32 = f64[valid], f32[valid]
+    finite = np.isfinite(f64).all(axis=1)
+    print(f"🔍 Max feature difference: {np.max(np.abs(f64[finite] - f32[finite])):.2e}")
+
+    if not os.path.exists(os.path.join(args.models_dir, 'feature_scaler.pkl')):
+        print("⚠️  No trained models found, skipping the prediction parity report")
+        return 0
+
+    print("\n🎯 Prediction parity (float32 against float64)")
+    reference = EmotionRecognitionModel(args.models_dir, preload=[], precision='float64')
+    serving = EmotionRecognitionModel(args.models_dir, preload=[], precision='float32')
+    for model_name in reference.get_available_models():
+        labels64, proba64 = reference.predict_features(f64, model_name)
+        labels32, proba32 = serving.predict_features(f32, model_name)
+        agreement = float(np.mean(np.asarray(labels64) == np.asarray(labels32)))
+        print(f"{model_name:>8} | label agreement {agreement:7.2%} | "
+              f"max |dp| {np.max(np.abs(proba64 - proba32)):.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark float32 and float64 feature extraction")
+    parser.add_argument('--manifest', action='append', help="Metadata CSV (repeatable, default: all)")
+    parser.add_argument('--data-dir', default='../data', help="Directory with one folder per dataset")
+    parser.add_argument('--split', default='test', help="Manifest split to use")
+    parser.add_argument('--models-dir', default='saved_models', help="Directory with the trained models")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed extraction runs per precision")
+    parser.add_argument('--synthetic', type=int, default=0, help="Use N synthetic clips instead of audio files")
+    sys.exit(main(parser.parse_args()))
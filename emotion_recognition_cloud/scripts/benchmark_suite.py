@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite for the extraction, inference and API hot paths.
+
+Generates synthetic WAV fixtures (several durations, 16/44.1/48 kHz, mono and
+stereo) and times:
+
+- extraction: the reference MelFreqCepsCoef class and the vectorized engine
+  as the API runs it (resampled to SAMPLE_RATE if set, in FEATURE_PRECISION)
+- inference: scaler plus model latency per model for single rows and batches
+- api: full /predict and /predict-ensemble requests through an in-process
+  ASGI client, with the prediction caches disabled so every request extracts
+
+Results are written as JSON. Passing a stored result file as --baseline
+compares the latencies and exits with status 1 when any benchmark is slower
+than the baseline by more than --tolerance, so the suite can gate a
+deployment. Baselines are only comparable on the same hardware.
+
+Run from the emotion_recognition_cloud directory; the inference and API
+stages load the models from saved_models like the server does, and the API
+stage needs httpx for FastAPI's TestClient.
+
+Example:
+    python scripts/benchmark_suite.py --output baseline.json
+    python scripts/benchmark_suite.py --baseline baseline.json --tolerance 0.2
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+import numpy as np
+import scipy
+import scipy.io.wavfile as wavfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.feature_extractor import MelFreqCepsCoef
+from app.mfcc_engine import extract_features
+from synthetic_speech import speech_like_signal
+
+DURATIONS = (1.0, 3.0, 10.0)
+QUICK_DURATIONS = (1.0, 3.0)
+SAMPLE_RATES = (16000, 44100, 48000)
+CHANNELS = (1, 2)
+BATCH_SIZES = (1, 32)
+
+# Shortest duration of one timed sample
+MIN_SAMPLE_MS = 50.0
+
+
+def make_fixture(fs, seconds, channels=1, seed=0):
+    """Speech-like WAV bytes with a pause."""
+    signal = speech_like_signal(fs, seconds, np.random.default_rng(seed), channels, pause=True)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, signal)
+    return buffer.getvalue()
+
+
+def fixtures(durations):
+    """Fixture name to (WAV bytes, duration in seconds) for every combination."""
+    result = {}
+    for seconds in durations:
+        for fs in SAMPLE_RATES:
+            for channels in CHANNELS:
+                name = f"{seconds:g}s-{fs}hz-{'mono' if channels == 1 else 'stereo'}"
+                result[name] = (make_fixture(fs, seconds, channels, seed=len(result)), seconds)
+    return result
+
+
+def time_call(fn, repeats, warmup=1, min_sample_ms=MIN_SAMPLE_MS):
+    """
+    Time fn and summarize the per-call latency in milliseconds.
+
+    Like timeit's autorange, each of the repeats samples calls fn as often
+    as needed to last min_sample_ms, so sub-millisecond calls are not
+    dominated by timer and scheduling noise.
+    """
+    for _ in range(warmup):
+        start_time = time.perf_counter()
+        fn()
+        first_ms = (time.perf_counter() - start_time) * 1000
+    number = max(1, int(np.ceil(min_sample_ms / max(first_ms, 1e-3))))
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start_time) * 1000 / number)
+    timings = np.array(timings)
+    return {
+        'runs': int(repeats),
+        'calls_per_run': number,
+        'median_ms': round(float(np.median(timings)), 4),
+        'p95_ms': round(float(np.percentile(timings, 95)), 4),
+        'min_ms': round(float(timings.min()), 4),
+        'mean_ms': round(float(timings.mean()), 4),
+    }
+
+
+def bench_extraction(fixture_set, repeats, sample_rate, precision, results):
+    """Time the reference and vectorized extractors on every fixture."""
+    for name, (data, seconds) in fixture_set.items():
+        for kind, fn in (
+            ('legacy', lambda: MelFreqCepsCoef(io.BytesIO(data))),
+            ('engine', lambda: extract_features(data, sample_rate=sample_rate, precision=precision)),
+        ):
+            stats = time_call(fn, repeats)
+            # Seconds of audio processed per second of wall time
+            stats['realtime_factor'] = round(seconds * 1000 / stats['median_ms'], 2)
+            results[f'extraction/{kind}/{name}'] = stats
+            print(f"  extraction/{kind}/{name:<22} {stats['median_ms']:10.3f} ms "
+                  f"({stats['realtime_factor']:.0f}x realtime)")
+
+
+def bench_inference(models_dir, repeats, precision, results):
+    """Time scaler plus model calls per model and batch size."""
+    from app.model_loader import EmotionRecognitionModel
+
+    if not os.path.exists(os.path.join(models_dir, 'feature_scaler.pkl')):
+        print("  ⚠️  No trained models found, skipping inference")
+        return
+    model = EmotionRecognitionModel(models_dir, precision=precision)
+    rng = np.random.default_rng(0)
+    n_features = model.scaler.n_features_in_
+    for model_name in model.get_available_models():
+        for batch_size in BATCH_SIZES:
+            features = rng.standard_normal((batch_size, n_features))
+            stats = time_call(lambda: model.predict_features(features, model_name), repeats)
+            stats['rows_per_second'] = round(batch_size * 1000 / stats['median_ms'], 1)
+            results[f'inference/{model_name}/batch{batch_size}'] = stats
+            print(f"  inference/{model_name}/batch{batch_size:<4} {stats['median_ms']:10.3f} ms")
+
+
+def bench_api(repeats, results):
+    """Time full prediction requests through the ASGI app in process."""
+    # Every request must extract and score, not hit the caches
+    os.environ['CACHE_MAX_FEATURES'] = '0'
+    os.environ['CACHE_MAX_PREDICTIONS'] = '0'
+    try:
+        from fastapi.testclient import TestClient
+    except (ImportError, RuntimeError) as e:
+        print(f"  ⚠️  TestClient unavailable ({e}), skipping the API benchmarks")
+        return
+    from app.main import app, emotion_model
+
+    # The app logs at INFO, which would print every test request
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    if emotion_model is None:
+        print("  ⚠️  No trained models found, skipping the API benchmarks")
+        return
+    data = make_fixture(16000, 3.0)
+    with TestClient(app) as client:
+        def post(path):
+            response = client.post(path, files={'file': ('fixture.wav', data, 'audio/wav')})
+            response.raise_for_status()
+
+        paths = [f'/predict?model={m}' for m in emotion_model.get_available_models()]
+        paths.append('/predict-ensemble')
+        for path in paths:
+            stats = time_call(lambda: post(path), repeats, warmup=2)
+            key = 'api' + path.replace('?model=', '/')
+            results[key] = stats
+            print(f"  {key:<35} {stats['median_ms']:10.3f} ms")
+
+
+def environment_info(args):
+    """Machine, library versions and settings the results were recorded with."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'repeats': args.repeats,
+        'quick': args.quick,
+        'sample_rate': args.sample_rate,
+        'precision': args.precision,
+    }
+
+
+def compare(results, baseline, tolerance, statistic='min_ms'):
+    """
+    Compare latencies with a baseline.
+
+    The fastest run is the default statistic, being the least affected by
+    other load on the machine.
+
+    Returns:
+        list: Names of the benchmarks slower than baseline * (1 + tolerance)
+    """
+    regressions = []
+    print(f"\n📊 Against baseline ({statistic}, tolerance {tolerance:.0%})")
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"  {name:<45} new")
+            continue
+        ratio = stats[statistic] / reference[statistic]
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<45} {reference[statistic]:10.3f} -> {stats[statistic]:10.3f} ms "
+              f"({ratio:5.2f}x){'  ❌ REGRESSION' if regressed else ''}")
+    for name in sorted(set(baseline) - set(results)):
+        print(f"  {name:<45} missing from this run")
+    return regressions
+
+
+def main(args):
+    results = {}
+    stages = set(args.stage or ('extraction', 'inference', 'api'))
+
+    if 'extraction' in stages:
+        print("⏱️  Extraction")
+        bench_extraction(fixtures(QUICK_DURATIONS if args.quick else DURATIONS), args.repeats,
+                         args.sample_rate or None, args.precision, results)
+    if 'inference' in stages:
+        print("⏱️  Inference")
+        bench_inference(args.models_dir, args.repeats, args.precision, results)
+    if 'api' in stages:
+        print("⏱️  API")
+        bench_api(args.repeats, results)
+
+    report = {'environment': environment_info(args), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance, args.statistic)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) regressed")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark extraction, inference and API latency")
+    parser.add_argument('--stage', action='append', choices=('extraction', 'inference', 'api'),
+                        help="Stage to run (repeatable, default: all)")
+    parser.add_argument('--repeats', type=int, default=7, help="Timed runs per benchmark")
+    parser.add_argument('--quick', action='store_true', help="Skip the longest fixtures")
+    parser.add_argument('--models-dir', default='saved_models', help="Directory with the trained models")
+    parser.add_argument('--sample-rate', type=int, default=int(os.environ.get('SAMPLE_RATE', 0)),
+                        help="Rate the engine resamples to, 0 keeps the fixture rate")
+    parser.add_argument('--precision', default=os.environ.get('FEATURE_PRECISION', 'float32'),
+                        choices=('float32', 'float64'), help="Engine and model input precision")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--baseline', help="Results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed slowdown relative to the baseline")
+    parser.add_argument('--statistic', default='min_ms', choices=('min_ms', 'median_ms', 'p95_ms'),
+                        help="Latency statistic compared with the baseline")
+    sys.exit(main(parser.parse_args()))
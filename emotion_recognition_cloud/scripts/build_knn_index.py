@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Build the KNN serving index next to the trained scikit-learn model.
+
+Reads saved_models/knn_emotion_model.pkl, writes knn_emotion_index.npz
+(float32 reference vectors and labels) plus knn_emotion_index.tree.pkl
+when --backend kdtree is used, and compares the index with the original
+classifier on perturbed reference vectors.
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.knn_backend import KNNIndex, BACKENDS
+
+
+def build_index(models_dir, backend, n_check=500):
+    """Build, save and verify the KNN index."""
+    model = joblib.load(os.path.join(models_dir, 'knn_emotion_model.pkl'))
+    index = KNNIndex.from_sklearn(model, backend)
+    output_path = os.path.join(models_dir, 'knn_emotion_index.npz')
+    index.save(output_path)
+    print(f"💾 Index with {len(index.reference)} reference vectors saved to {output_path}")
+
+    # Query near the reference points, where neighbor ordering matters most
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, len(index.reference), n_check)
+    X = index.reference[rows] + 0.1 * rng.standard_normal((n_check, index.reference.shape[1]))
+    X = X.astype(np.float64)
+
+    loaded = KNNIndex.load(output_path, backend)
+    labels, probabilities = loaded.predict_with_proba(X)
+    agreement = float(np.mean(labels == model.predict(X)))
+    max_error = float(np.max(np.abs(probabilities - model.predict_proba(X))))
+    print(f"🔍 Label agreement with scikit-learn: {agreement:.2%}")
+    print(f"🔍 Max probability difference: {max_error:.2e}")
+    return agreement
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the KNN serving index")
+    parser.add_argument('--models-dir', default='saved_models', help="Directory with the trained models")
+    parser.add_argument('--backend', default='brute', choices=BACKENDS, help="Search backend to prebuild")
+    args = parser.parse_args()
+    build_index(args.models_dir, args.backend)
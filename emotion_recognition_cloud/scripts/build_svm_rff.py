@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Build the random Fourier feature approximation of the trained SVM.
+
+Reads saved_models/svm_emotion_model.pkl, reports how closely the exact
+single-pass scorer and RFF approximations of several sizes follow
+scikit-learn on perturbed support vectors, and writes the chosen size to
+saved_models/svm_emotion_rff.npz (served with SVM_BACKEND=rff).
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.svm_backend import SVMScorer, RFFSVMScorer
+
+
+def report(name, scorer, X, expected_labels, expected_proba):
+    """Print agreement and timing of one scorer against scikit-learn."""
+    start_time = time.perf_counter()
+    labels, probabilities = scorer.predict_with_proba(X)
+    elapsed = time.perf_counter() - start_time
+    agreement = float(np.mean(labels == expected_labels))
+    error = np.abs(probabilities - expected_proba)
+    print(f"{name:>14} | agreement {agreement:7.2%} | max |dp| {error.max():.2e} | "
+          f"mean |dp| {error.mean():.2e} | {1000 * elapsed / len(X):.3f} ms/row")
+    return agreement
+
+
+def build_rff(models_dir, components, sizes, n_check=1000, noise=0.1):
+    """Compare the SVM backends and save the RFF approximation."""
+    model = joblib.load(os.path.join(models_dir, 'svm_emotion_model.pkl'))
+    exact = SVMScorer.from_sklearn(model)
+    print(f"📥 SVM with {len(exact.support_vectors)} support vectors, kernel '{exact.kernel}'")
+
+    # Query near the support vectors, where the decision boundaries are
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, len(exact.support_vectors), n_check)
+    X = exact.support_vectors[rows] + noise * rng.standard_normal((n_check, exact.support_vectors.shape[1]))
+
+    start_time = time.perf_counter()
+    expected_labels = model.predict(X)
+    expected_proba = model.predict_proba(X)
+    elapsed = time.perf_counter() - start_time
+    print(f"{'sklearn':>14} | predict + predict_proba {1000 * elapsed / n_check:.3f} ms/row")
+
+    report('exact', exact, X, expected_labels, expected_proba)
+    for n_components in sorted(set(sizes) | {components}):
+        approx = RFFSVMScorer.from_scorer(exact, n_components)
+        report(f'rff-{n_components}', approx, X, expected_labels, expected_proba)
+
+    output_path = os.path.join(models_dir, 'svm_emotion_rff.npz')
+    RFFSVMScorer.from_scorer(exact, components).save(output_path)
+    print(f"💾 RFF approximation with {components} components saved to {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the RFF approximation of the SVM")
+    parser.add_argument('--models-dir', default='saved_models', help="Directory with the trained models")
+    parser.add_argument('--components', type=int, default=4096, help="Random features in the saved approximation")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[512, 1024, 2048, 8192],
+                        help="Additional sizes to report on")
+    args = parser.parse_args()
+    build_rff(args.models_dir, args.components, args.sizes)
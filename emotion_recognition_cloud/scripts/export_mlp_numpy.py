@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Export the trained Keras MLP to a pure-NumPy weights artifact.
+
+Reads saved_models/mlp_emotion_model.h5 and feature_scaler.pkl, writes
+saved_models/mlp_emotion_model.npz and checks that the NumPy forward pass
+matches Keras. Needs TensorFlow (requirements-training.txt); the API
+serving the exported artifact does not.
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.numpy_mlp import NumpyMLP
+
+# Largest absolute difference allowed between Keras and NumPy probabilities
+TOLERANCE = 1e-5
+
+
+def export_mlp(models_dir, n_check=1000):
+    """Export the MLP and verify it against Keras on random scaled inputs."""
+    import tensorflow as tf
+
+    model_path = os.path.join(models_dir, 'mlp_emotion_model.h5')
+    output_path = os.path.join(models_dir, 'mlp_emotion_model.npz')
+
+    print(f"📥 Loading model from {model_path}...")
+    model = tf.keras.models.load_model(model_path, compile=False)
+    scaler = joblib.load(os.path.join(models_dir, 'feature_scaler.pkl'))
+
+    runtime = NumpyMLP.from_keras(model, scaler)
+    runtime.save(output_path)
+    print(f"💾 Weights saved to {output_path}")
+
+    # Compare on standard-normal inputs, which is what scaled features look like
+    x = np.random.default_rng(0).standard_normal((n_check, len(scaler.mean_))).astype(np.float32)
+    expected = model.predict(x, verbose=0)
+    actual = NumpyMLP.load(output_path).predict(x)
+    max_error = float(np.max(np.abs(expected - actual)))
+    agreement = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+
+    print(f"🔍 Max probability difference: {max_error:.2e} (tolerance {TOLERANCE:.0e})")
+    print(f"🔍 Predicted class agreement: {agreement:.2%}")
+    if max_error > TOLERANCE:
+        print("❌ NumPy runtime does not match Keras")
+        return False
+    print("✅ NumPy runtime matches Keras")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the MLP to a NumPy artifact")
+    parser.add_argument('--models-dir', default='saved_models', help="Directory with the trained models")
+    args = parser.parse_args()
+    sys.exit(0 if export_mlp(args.models_dir) else 1)
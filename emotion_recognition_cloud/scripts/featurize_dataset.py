@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Parallel dataset featurization into the content-addressed feature store.
+
+Reads the metadata CSV manifests, hashes every referenced audio file and
+extracts MFCC features only for content that is not in the store yet.
+Work is fanned out over a process pool in chunks; each finished chunk is
+appended to the store immediately, so an interrupted run resumes where it
+stopped.
+
+Example:
+    python scripts/featurize_dataset.py \\
+        --manifest "../metadata/EMODB - testSize 0.3.csv" --dataset EMODB \\
+        --data-dir ../data --store feature_store --output emodb_features.npz
+"""
+
+import os
+import sys
+import csv
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.feature_store import FeatureStore, DEFAULT_PARAMS, file_digest
+from app.mfcc_engine import extract_mfcc_batch
+
+
+def read_manifest(manifest_path, data_dir, dataset):
+    """Return (file paths, class names, split) from a metadata CSV."""
+    paths, labels, splits = [], [], []
+    with open(manifest_path, newline='') as f:
+        for row in csv.DictReader(f):
+            paths.append(os.path.join(data_dir, dataset, row['slice_file_name']))
+            labels.append(row['class_name'])
+            splits.append(row.get('if', ''))
+    return paths, labels, splits
+
+
+def featurize(paths, store, workers, chunk_size):
+    """
+    Compute and store features for every path whose content is new.
+
+    Returns:
+        tuple: (content digest per path or None, errors by path)
+    """
+    errors = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        digests = []
+        for path, digest in zip(paths, pool.map(_safe_digest, paths, chunksize=chunk_size)):
+            if digest is None:
+                errors[path] = 'File not found or unreadable'
+            digests.append(digest)
+
+        # Identical content under different paths is only extracted once
+        pending = {}
+        for path, digest in zip(paths, digests):
+            if digest is not None and digest not in store and digest not in pending:
+                pending[digest] = path
+
+        print(f"📦 {len(store)} vectors in store, {len(pending)} files to extract")
+        items = list(pending.items())
+        futures = {}
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            future = pool.submit(extract_mfcc_batch, [path for _, path in chunk], **store.params)
+            futures[future] = chunk
+
+        done = 0
+        for future in as_completed(futures):
+            chunk = futures[future]
+            features, chunk_errors = future.result()
+            ok = [i for i, error in enumerate(chunk_errors) if error is None]
+            store.add([chunk[i][0] for i in ok], features[ok])
+            for (_, path), error in zip(chunk, chunk_errors):
+                if error is not None:
+                    errors[path] = error
+            done += len(chunk)
+            print(f"Processed {done}/{len(items)} files...")
+
+    return digests, errors
+
+
+def _safe_digest(path):
+    """Content digest of a file, or None when it cannot be read."""
+    try:
+        return file_digest(path)
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Featurize audio datasets into a feature store")
+    parser.add_argument('--manifest', required=True, action='append',
+                        help="Metadata CSV (repeat for several manifests)")
+    parser.add_argument('--dataset', required=True, action='append',
+                        help="Dataset sub-directory for each manifest, e.g. EMODB or EMOVO")
+    parser.add_argument('--data-dir', default='data', help="Directory holding the datasets")
+    parser.add_argument('--store', default='feature_store', help="Feature store directory")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--chunk-size', type=int, default=16, help="Files per worker task")
+    parser.add_argument('--output', help="Optional .npz with features, labels, files and split")
+    parser.add_argument('--sample-rate', type=int,
+                        help="Resample every file to this rate, matching the API's SAMPLE_RATE")
+    args = parser.parse_args()
+
+    if len(args.manifest) != len(args.dataset):
+        parser.error("Pass one --dataset per --manifest")
+
+    paths, labels, splits = [], [], []
+    for manifest, dataset in zip(args.manifest, args.dataset):
+        manifest_paths, manifest_labels, manifest_splits = read_manifest(manifest, args.data_dir, dataset)
+        paths += manifest_paths
+        labels += manifest_labels
+        splits += manifest_splits
+
+    params = dict(DEFAULT_PARAMS)
+    if args.sample_rate:
+        params['sample_rate'] = args.sample_rate
+    store = FeatureStore(args.store, params)
+    print(f"🎵 Featurizing {len(paths)} files with {args.workers} workers...")
+    start_time = time.time()
+    digests, errors = featurize(paths, store, args.workers, args.chunk_size)
+    print(f"✅ Featurization completed in {time.time() - start_time:.2f} seconds")
+
+    for path, error in errors.items():
+        print(f"❌ {path}: {error}")
+
+    if args.output:
+        # Failed files get zero features, like the notebook's extraction loop
+        features = np.zeros((len(paths), store.n_mfcc))
+        stored = [i for i, digest in enumerate(digests) if digest in store]
+        features[stored] = store.get_many([digests[i] for i in stored])
+        features = np.nan_to_num(features, nan=0.0, posinf=0.0, neginf=0.0)
+        np.savez(args.output, features=features, labels=np.array(labels),
+                 files=np.array(paths), split=np.array(splits))
+        print(f"💾 Features saved to {args.output}: {features.shape}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for the MicroBatcher that coalesces concurrent /predict rows.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.batching import MicroBatcher
+from api_fixtures import api_client, make_wav
+
+
+class RecordingScorer:
+    """score_batch stand-in returning each row's first value as its class"""
+
+    def __init__(self, fail_models=()):
+        self.calls = []
+        self.fail_models = set(fail_models)
+
+    async def __call__(self, features, model_name):
+        self.calls.append((model_name, len(features)))
+        if model_name in self.fail_models:
+            raise RuntimeError(f"{model_name} failed")
+        predicted_class_idx = features[:, 0].astype(int)
+        return predicted_class_idx, features * 2
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_rows_form_one_batch():
+    """Rows submitted together are scored in one call, each getting its own row back."""
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=32, max_wait_ms=50)
+
+    async def main():
+        try:
+            return await asyncio.gather(*(
+                batcher.predict(np.array([i, i + 0.5]), 'MLP') for i in range(10)
+            ))
+        finally:
+            batcher.shutdown()
+
+    results = run(main())
+    assert scorer.calls == [('MLP', 10)]
+    for i, (predicted_class_idx, probabilities) in enumerate(results):
+        assert predicted_class_idx == i
+        np.testing.assert_array_equal(probabilities, [2 * i, 2 * i + 1])
+
+
+def test_batches_respect_max_size_and_model():
+    """Full batches are dispatched at max_batch_size and models never share a batch."""
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=4, max_wait_ms=50)
+
+    async def main():
+        try:
+            await asyncio.gather(
+                *(batcher.predict(np.array([i]), 'MLP') for i in range(10)),
+                *(batcher.predict(np.array([i]), 'SVM') for i in range(3)),
+            )
+        finally:
+            batcher.shutdown()
+
+    run(main())
+    assert sorted(n for model, n in scorer.calls if model == 'MLP') == [2, 4, 4]
+    assert [n for model, n in scorer.calls if model == 'SVM'] == [3]
+
+
+def test_lone_row_flushed_after_max_wait():
+    """A row without company is scored once the wait expires, not held back."""
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=32, max_wait_ms=20)
+
+    async def main():
+        try:
+            start_time = time.perf_counter()
+            result = await asyncio.wait_for(batcher.predict(np.array([3.0]), 'KNN'), 1.0)
+            return result, time.perf_counter() - start_time
+        finally:
+            batcher.shutdown()
+
+    (predicted_class_idx, _), elapsed = run(main())
+    assert predicted_class_idx == 3
+    assert scorer.calls == [('KNN', 1)]
+    assert 0.015 <= elapsed < 0.5
+
+
+def test_errors_reach_every_row_of_the_failed_batch():
+    """A failing model call fails its own rows only, and the dispatcher keeps serving."""
+    scorer = RecordingScorer(fail_models=['SVM'])
+    batcher = MicroBatcher(scorer, max_batch_size=32, max_wait_ms=10)
+
+    async def main():
+        try:
+            results = await asyncio.gather(
+                *(batcher.predict(np.array([i]), 'SVM') for i in range(3)),
+                batcher.predict(np.array([1]), 'MLP'),
+                return_exceptions=True,
+            )
+            scorer.fail_models.clear()
+            return results, await batcher.predict(np.array([2]), 'SVM')
+        finally:
+            batcher.shutdown()
+
+    results, recovered = run(main())
+    for result in results[:3]:
+        assert isinstance(result, RuntimeError) and str(result) == "SVM failed"
+    assert results[3][0] == 1
+    assert recovered[0] == 2
+
+
+def test_abandoned_rows_are_skipped():
+    """Rows whose caller gave up before dispatch are left out of the model call."""
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=32, max_wait_ms=30)
+
+    async def main():
+        try:
+            abandoned = asyncio.ensure_future(batcher.predict(np.array([7]), 'MLP'))
+            kept = asyncio.ensure_future(batcher.predict(np.array([8]), 'MLP'))
+            await asyncio.sleep(0)
+            abandoned.cancel()
+            return await kept
+        finally:
+            batcher.shutdown()
+
+    predicted_class_idx, _ = run(main())
+    assert predicted_class_idx == 8
+    assert scorer.calls == [('MLP', 1)]
+
+
+def test_batch_values_reach_every_row():
+    """Values returned after the probabilities, such as timings, are passed to every row of the batch."""
+    async def scorer(features, model_name):
+        return features[:, 0].astype(int), features, (0.25, 0.5)
+
+    batcher = MicroBatcher(scorer, max_batch_size=32, max_wait_ms=30)
+
+    async def main():
+        try:
+            return await asyncio.gather(*(batcher.predict(np.array([i]), 'MLP') for i in range(3)))
+        finally:
+            batcher.shutdown()
+
+    for i, (predicted_class_idx, _, durations) in enumerate(run(main())):
+        assert predicted_class_idx == i
+        assert durations == (0.25, 0.5)
+
+
+def test_server_timing_includes_scoring_stages():
+    """Micro-batched /predict requests report the scaler and model calls in Server-Timing."""
+    wav_bytes = make_wav(16000, seed=41)
+    with api_client() as (client, _):
+        response = client.post('/predict?model=SVM', files={'file': ('clip.wav', wav_bytes, 'audio/wav')})
+        assert response.status_code == 200, response.text
+        stages = {entry.split(';')[0].strip() for entry in response.headers['Server-Timing'].split(',')}
+        assert {'scale', 'model', 'inference'} <= stages, stages
+
+
+if __name__ == "__main__":
+    print("🧪 Testing micro-batching...")
+    print("=" * 50)
+    for test in (test_concurrent_rows_form_one_batch, test_batches_respect_max_size_and_model,
+                 test_lone_row_flushed_after_max_wait, test_errors_reach_every_row_of_the_failed_batch,
+                 test_abandoned_rows_are_skipped, test_batch_values_reach_every_row,
+                 test_server_timing_includes_scoring_stages):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
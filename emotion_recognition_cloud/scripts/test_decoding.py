@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for block decoding, chunked resampling and WAV header parsing.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import io
+import os
+import sys
+from unittest import mock
+import numpy as np
+import soundfile
+import scipy.io.wavfile as wavfile
+from scipy.signal import resample_poly
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import streaming
+from app.decoding import (
+    DecodedBlocks, PolyphaseResampler, decode_stream, parse_wav_header, WAV_FORMAT_PCM, WAV_FORMAT_FLOAT
+)
+from app.mfcc_engine import extract_features, PARITY_RTOL, PARITY_ATOL
+from app.streaming import extract_stream
+from api_fixtures import make_wav
+
+
+
+def test_chunked_resampling():
+    """Chunked polyphase resampling equals resample_poly on the whole signal."""
+    rng = np.random.default_rng(5)
+    for fs_in, fs_out, up, down in ((48000, 16000, 1, 3), (44100, 16000, 160, 441),
+                                    (8000, 16000, 2, 1)):
+        signal = rng.standard_normal((20000, 2))
+        resampler = PolyphaseResampler(fs_in, fs_out)
+        pieces, position = [], 0
+        while position < len(signal):
+            size = int(rng.integers(1, 5000))
+            pieces.append(resampler.push(signal[position:position + size]))
+            position += size
+        pieces.append(resampler.finish())
+        np.testing.assert_allclose(np.concatenate(pieces), resample_poly(signal, up, down, axis=0),
+                                   rtol=1e-12, atol=1e-9)
+
+
+def test_compressed_decoding():
+    """FLAC uploads decode block by block to the same features as WAV."""
+    wav_bytes = make_wav(44100, channels=2, seed=13)
+    _, signal = wavfile.read(io.BytesIO(wav_bytes))
+    flac = io.BytesIO()
+    soundfile.write(flac, signal, 44100, format='FLAC')
+    for sample_rate in (None, 16000):
+        np.testing.assert_allclose(
+            extract_features(flac.getvalue(), sample_rate=sample_rate),
+            extract_features(wav_bytes, sample_rate=sample_rate),
+            rtol=PARITY_RTOL, atol=PARITY_ATOL
+        )
+
+
+def test_decoder_release():
+    """Decoded blocks release their decoder on close, even when never iterated."""
+    released = []
+    blocks = DecodedBlocks(iter([np.zeros((4, 1))]), lambda: released.append(True))
+    blocks.close()
+    blocks.close()
+    assert released == [True]
+
+    wav_bytes = make_wav(44100, seed=17)
+    _, signal = wavfile.read(io.BytesIO(wav_bytes))
+    flac = io.BytesIO()
+    soundfile.write(flac, signal, 44100, format='FLAC')
+    opened = []
+
+    def tracking_decode_stream(*args, **kwargs):
+        result = decode_stream(*args, **kwargs)
+        opened.append(result[2])
+        return result
+
+    # An extractor that fails before the first block must not leak the decoder
+    with mock.patch.object(streaming, 'decode_stream', tracking_decode_stream), \
+            mock.patch.object(streaming, 'IncrementalMFCC', side_effect=ValueError("bad parameters")):
+        try:
+            extract_stream(flac.getvalue(), sample_rate=16000)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("extract_stream should fail")
+    assert len(opened) == 1
+    try:
+        next(opened[0])
+    except (StopIteration, RuntimeError, ValueError):
+        pass
+    else:
+        raise AssertionError("the decoder is still open")
+
+
+def test_wav_header_parsing():
+    """Header fields read from the first bytes match the full file."""
+    for fs, channels in ((16000, 1), (44100, 2)):
+        wav_bytes = make_wav(fs, seconds=2, channels=channels)
+        header = parse_wav_header(wav_bytes[:64])
+        _, signal = wavfile.read(io.BytesIO(wav_bytes))
+        assert (header.format_tag, header.sample_rate, header.channels) == (WAV_FORMAT_PCM, fs, channels)
+        assert header.duration == len(signal) / fs
+
+    # Extensible headers resolve to their subformat
+    buffer = io.BytesIO()
+    soundfile.write(buffer, np.zeros((800, 3), dtype=np.float32), 8000, format='WAV', subtype='FLOAT')
+    header = parse_wav_header(buffer.getvalue()[:256])
+    assert (header.format_tag, header.channels, header.duration) == (WAV_FORMAT_FLOAT, 3, 0.1)
+
+    try:
+        parse_wav_header(make_wav(16000)[:30])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("A header cut before the data chunk must be rejected")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing audio decoding...")
+    print("=" * 50)
+    for test in (test_chunked_resampling, test_compressed_decoding, test_decoder_release,
+                 test_wav_header_parsing):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for /predict-ensemble soft voting.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+from unittest import mock
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import api_client, make_wav
+
+
+def post_ensemble(client, wav_bytes, query=''):
+    return client.post(f'/predict-ensemble{query}', files={'file': ('clip.wav', wav_bytes, 'audio/wav')})
+
+
+def test_weight_parsing():
+    """Weight specs are parsed per model, omitted models get 0 and bad specs fail."""
+    from app.main import _parse_weights
+
+    models = ['MLP', 'SVM', 'KNN']
+    assert _parse_weights('', models) == {'MLP': 1.0, 'SVM': 1.0, 'KNN': 1.0}
+    assert _parse_weights('MLP:0.5, SVM:1.5', models) == {'MLP': 0.5, 'SVM': 1.5, 'KNN': 0.0}
+    for spec in ('RNN:1', 'MLP', 'MLP:abc', 'MLP:-1', 'MLP:0,SVM:0'):
+        try:
+            _parse_weights(spec, models)
+        except ValueError:
+            continue
+        raise AssertionError(f"'{spec}' should be rejected")
+
+
+def test_weights_are_normalized():
+    """The ensemble is the weighted average of the per-model probabilities, whatever the weight scale."""
+    wav_bytes = make_wav(16000, seed=31)
+    with api_client() as (client, _):
+        responses = [post_ensemble(client, wav_bytes, f'?weights={spec}')
+                     for spec in ('SVM:3,KNN:1', 'SVM:0.75,KNN:0.25')]
+        for response in responses:
+            assert response.status_code == 200, response.text
+        body = responses[0].json()
+        assert body['models_used'] == ['MLP', 'SVM', 'KNN']
+        assert body['weights'] == {'MLP': 0.0, 'SVM': 3.0, 'KNN': 1.0}
+
+        classes = list(body['all_probabilities'])
+        per_model = {name: np.array([result['all_probabilities'][c] for c in classes])
+                     for name, result in body['models'].items()}
+        expected = 0.75 * per_model['SVM'] + 0.25 * per_model['KNN']
+        ensemble = np.array([body['all_probabilities'][c] for c in classes])
+        np.testing.assert_allclose(ensemble, expected, atol=1e-6)
+        np.testing.assert_allclose(ensemble.sum(), 1.0, atol=1e-6)
+        assert body['predicted_emotion'] == classes[int(np.argmax(expected))]
+        assert responses[1].json()['all_probabilities'] == body['all_probabilities']
+
+        # ENSEMBLE_WEIGHTS is the default, and a model subset only uses its own weights
+        with mock.patch('app.main.ENSEMBLE_WEIGHTS', 'SVM:1,KNN:3'):
+            body = post_ensemble(client, wav_bytes, '?models=SVM,MLP').json()
+        assert body['models_used'] == ['SVM', 'MLP']
+        assert body['weights'] == {'SVM': 1.0, 'MLP': 0.0}
+        assert body['all_probabilities'] == body['models']['SVM']['all_probabilities']
+
+
+def test_rejects_unknown_models_and_bad_weights():
+    """Unknown models, malformed weights and zero-weight selections answer 400."""
+    wav_bytes = make_wav(16000, seed=32)
+    with api_client() as (client, _):
+        for query in ('?models=SVM,RNN', '?models=,', '?weights=RNN:1', '?weights=SVM:x',
+                      '?weights=SVM:-1', '?models=KNN&weights=SVM:1'):
+            response = post_ensemble(client, wav_bytes, query)
+            assert response.status_code == 400, (query, response.status_code)
+        response = post_ensemble(client, wav_bytes, '?models=SVM,RNN')
+        assert 'Available models' in response.json()['detail']
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the ensemble endpoint...")
+    print("=" * 50)
+    for test in (test_weight_parsing, test_weights_are_normalized,
+                 test_rejects_unknown_models_and_bad_weights):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
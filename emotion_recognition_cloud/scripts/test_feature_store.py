@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only feature store and resumable dataset featurization.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import make_wav
+from featurize_dataset import featurize
+from app.feature_store import FeatureStore, DEFAULT_PARAMS
+from app.mfcc_engine import extract_mfcc_batch
+
+
+def filled_store(root, n=3):
+    """A store holding n random vectors under keys k0..k{n-1}."""
+    store = FeatureStore(root)
+    vectors = np.random.default_rng(n).standard_normal((n, store.n_mfcc))
+    store.add([f'k{i}' for i in range(n)], vectors)
+    return store, vectors
+
+
+def append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def assert_contents(store, vectors):
+    assert len(store) == len(vectors)
+    np.testing.assert_array_equal(store.get_many([f'k{i}' for i in range(len(vectors))]), vectors)
+    assert os.path.getsize(store.vectors_path) == len(vectors) * store.row_bytes
+    with open(store.keys_path) as f:
+        assert f.read() == ''.join(f'k{i}\n' for i in range(len(vectors)))
+
+
+def test_add_and_reopen():
+    """Stored vectors survive reopening, and keys already stored are not appended again."""
+    with tempfile.TemporaryDirectory() as root:
+        store, vectors = filled_store(root)
+        store.add(['k1', 'k3', 'k3'], np.ones((3, store.n_mfcc)))
+        vectors = np.vstack([vectors, np.ones(store.n_mfcc)])
+        assert_contents(FeatureStore(root), vectors)
+        assert 'k3' in store and 'k4' not in store
+        # Every parameter set has its own directory
+        assert len(FeatureStore(root, dict(DEFAULT_PARAMS, n_mfcc=13))) == 0
+
+
+def test_torn_vector_append():
+    """Rows written without their keys, whole or partial, are dropped on open."""
+    with tempfile.TemporaryDirectory() as root:
+        store, vectors = filled_store(root)
+        # Crash mid-row: a partial row and no key
+        append(store.vectors_path, b'\x01' * (store.row_bytes // 2))
+        assert_contents(FeatureStore(root), vectors)
+        # Crash after the row was synced but before its key was written
+        append(store.vectors_path, np.ones(store.n_mfcc).tobytes())
+        recovered = FeatureStore(root)
+        assert_contents(recovered, vectors)
+
+        # The repaired store keeps appending at the right row
+        recovered.add(['k3'], np.full((1, store.n_mfcc), 2.0))
+        assert_contents(FeatureStore(root), np.vstack([vectors, np.full(store.n_mfcc, 2.0)]))
+
+
+def test_torn_key_append():
+    """Keys without a row and partial key lines are dropped on open."""
+    with tempfile.TemporaryDirectory() as root:
+        store, vectors = filled_store(root)
+        append(store.keys_path, b'k3\n')
+        assert_contents(FeatureStore(root), vectors)
+        append(store.keys_path, b'k3')
+        append(store.vectors_path, np.ones(store.n_mfcc).tobytes())
+        recovered = FeatureStore(root)
+        assert_contents(recovered, vectors)
+        assert 'k3' not in recovered
+
+
+def test_featurize_resumes():
+    """A rerun only extracts content missing from the store, as after an interrupted run."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(5):
+            paths.append(os.path.join(tmp, f'clip{i}.wav'))
+            with open(paths[-1], 'wb') as f:
+                f.write(make_wav(16000, seconds=0.5, seed=i))
+        # Same content under another name
+        paths.append(os.path.join(tmp, 'copy.wav'))
+        with open(paths[-1], 'wb') as f:
+            f.write(make_wav(16000, seconds=0.5, seed=0))
+        paths.append(os.path.join(tmp, 'missing.wav'))
+        root = os.path.join(tmp, 'store')
+
+        def run(run_paths):
+            output = io.StringIO()
+            with redirect_stdout(output):
+                digests, errors = featurize(run_paths, FeatureStore(root), workers=2, chunk_size=2)
+            return digests, errors, output.getvalue()
+
+        # The first run stops after two files
+        run(paths[:2])
+        digests, errors, output = run(paths)
+        assert '2 vectors in store, 3 files to extract' in output
+        assert list(errors) == [paths[-1]] and digests[-1] is None and digests[5] == digests[0]
+
+        store = FeatureStore(root)
+        assert len(store) == 5
+        expected, _ = extract_mfcc_batch(paths[:5], **store.params)
+        np.testing.assert_allclose(store.get_many(digests[:5]), expected)
+
+        size = os.path.getsize(store.vectors_path)
+        _, _, output = run(paths)
+        assert '5 vectors in store, 0 files to extract' in output
+        assert os.path.getsize(store.vectors_path) == size
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the feature store...")
+    print("=" * 50)
+    for test in (test_add_and_reopen, test_torn_vector_append, test_torn_key_append,
+                 test_featurize_resumes):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
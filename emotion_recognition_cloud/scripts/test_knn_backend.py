@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the KNNIndex serving backend against scikit-learn.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.knn_backend import KNNIndex
+
+# KNNIndex searches in float32
+PROBA_ATOL = 1e-6
+
+
+def make_data(n_classes, seed=0):
+    """Training vectors with string labels and queries that include training rows."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((150, 8))
+    if n_classes == 2:
+        y = np.where(X[:, 0] > 0, 'pos', 'neg')
+    else:
+        y = np.array(['angry', 'calm', 'happy', 'sad'])[(X[:, 0] > 0) * 2 + (X[:, 1] > 0)]
+    # Queries equal to training rows exercise the zero-distance case
+    queries = np.vstack([rng.standard_normal((60, 8)), X[:10]])
+    return X, y, queries
+
+
+def assert_parity(model, index, queries):
+    """Compare labels and probabilities of an index with its scikit-learn model."""
+    predicted, probabilities = index.predict_with_proba(queries)
+    np.testing.assert_array_equal(predicted, model.predict(queries))
+    np.testing.assert_allclose(probabilities, model.predict_proba(queries), atol=PROBA_ATOL)
+    np.testing.assert_array_equal(index.predict(queries), predicted)
+    np.testing.assert_allclose(index.predict_proba(queries), probabilities)
+
+
+def test_uniform_parity():
+    """Uniform votes match on multiclass and binary labels with both search backends."""
+    for n_classes in (4, 2):
+        X, y, queries = make_data(n_classes, seed=n_classes)
+        model = KNeighborsClassifier(n_neighbors=5).fit(X, y)
+        for backend in ('brute', 'kdtree'):
+            assert_parity(model, KNNIndex.from_sklearn(model, backend), queries)
+
+
+def test_distance_weighting_parity():
+    """Inverse-distance votes match, exact matches taking all the weight."""
+    for n_classes in (4, 2):
+        X, y, queries = make_data(n_classes, seed=10 + n_classes)
+        model = KNeighborsClassifier(n_neighbors=7, weights='distance').fit(X, y)
+        for backend in ('brute', 'kdtree'):
+            index = KNNIndex.from_sklearn(model, backend)
+            assert_parity(model, index, queries)
+            # A query on a training row is that row's class with certainty
+            _, probabilities = index.predict_with_proba(X[:10])
+            assert np.all(probabilities.max(axis=1) == 1.0)
+
+
+def test_binary_labels():
+    """Binary problems keep two probability columns in classes_ order."""
+    X, y, queries = make_data(2, seed=3)
+    model = KNeighborsClassifier(n_neighbors=4).fit(X, y)
+    index = KNNIndex.from_sklearn(model)
+    predicted, probabilities = index.predict_with_proba(queries)
+    assert list(index.classes_) == ['neg', 'pos']
+    assert probabilities.shape == (len(queries), 2)
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+    assert set(predicted) <= {'neg', 'pos'}
+
+
+def test_save_and_load():
+    """A saved index, with or without its tree, scores like the original."""
+    X, y, queries = make_data(4, seed=5)
+    model = KNeighborsClassifier(n_neighbors=5, weights='distance').fit(X, y)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'knn_emotion_index.npz')
+        KNNIndex.from_sklearn(model, 'kdtree').save(path)
+        assert os.path.exists(os.path.join(tmp, 'knn_emotion_index.tree.pkl'))
+        for backend in ('brute', 'kdtree'):
+            assert_parity(model, KNNIndex.load(path, backend), queries)
+
+
+def test_unsupported_models():
+    """Non-euclidean metrics and callable weights are refused."""
+    X, y, _ = make_data(4)
+    for model in (KNeighborsClassifier(metric='manhattan').fit(X, y),
+                  KNeighborsClassifier(weights=lambda d: 1 / (d + 1)).fit(X, y)):
+        try:
+            KNNIndex.from_sklearn(model)
+        except ValueError:
+            continue
+        raise AssertionError(f"{model} should be rejected")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing KNN backend parity...")
+    print("=" * 50)
+    for test in (test_uniform_parity, test_distance_weighting_parity, test_binary_labels,
+                 test_save_and_load, test_unsupported_models):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
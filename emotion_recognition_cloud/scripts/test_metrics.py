@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the /metrics exposition and the Server-Timing header.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import api_client, make_wav
+
+
+def metric_value(client, name):
+    """Value of an unlabelled counter in the GET /metrics exposition text, 0 before its first sample."""
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    lines = response.text.splitlines()
+    assert f'# TYPE {name} counter' in lines
+    for line in lines:
+        if line.startswith(name + ' '):
+            return float(line.split()[1])
+    return 0.0
+
+
+def timing_stages(response):
+    """Stage names of the Server-Timing header, checking every entry has a duration."""
+    stages = []
+    for entry in response.headers['Server-Timing'].split(', '):
+        stage, duration = entry.split(';dur=')
+        assert float(duration) >= 0
+        stages.append(stage)
+    return stages
+
+
+def test_batch_audio_seconds_and_timing():
+    """/predict-batch counts the seconds of every extracted clip and times its stages."""
+    files = [('files', ('a.wav', make_wav(16000, seconds=1.5, seed=81), 'audio/wav')),
+             ('files', ('b.wav', make_wav(22050, seconds=2, channels=2, seed=82), 'audio/wav'))]
+    with api_client() as (client, _):
+        before = metric_value(client, 'emotion_audio_seconds_total')
+        response = client.post('/predict-batch?model=SVM', files=files)
+        assert response.status_code == 200, response.text
+        assert abs(metric_value(client, 'emotion_audio_seconds_total') - before - 3.5) < 0.01
+        stages = timing_stages(response)
+        assert {'upload', 'queue', 'mfcc', 'extract', 'scale', 'model', 'inference'} <= set(stages)
+        assert stages[-1] == 'total'
+
+        # Cached clips are not extracted, so they add no audio
+        response = client.post('/predict-batch?model=SVM', files=files)
+        assert response.status_code == 200
+        assert abs(metric_value(client, 'emotion_audio_seconds_total') - before - 3.5) < 0.01
+
+
+def test_timeline_audio_seconds_and_timing():
+    """/predict-timeline counts the seconds of its recording and times its stages."""
+    with api_client() as (client, _):
+        before = metric_value(client, 'emotion_audio_seconds_total')
+        response = client.post('/predict-timeline?model=SVM&window=1&hop=0.5',
+                               files={'file': ('long.wav', make_wav(16000, seconds=4, seed=83), 'audio/wav')})
+        assert response.status_code == 200, response.text
+        assert abs(metric_value(client, 'emotion_audio_seconds_total') - before - 4.0) < 0.01
+        assert {'upload', 'queue', 'mfcc', 'extract', 'inference'} <= set(timing_stages(response))
+
+        metrics = client.get('/metrics').text
+        assert 'emotion_stage_duration_seconds_count{stage="mfcc"}' in metrics
+        assert 'emotion_model_requests_total{endpoint="/predict-timeline",model="SVM"} 1' in metrics
+
+
+if __name__ == "__main__":
+    print("🧪 Testing metrics...")
+    print("=" * 50)
+    for test in (test_batch_audio_seconds_and_timing, test_timeline_audio_seconds_and_timing):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
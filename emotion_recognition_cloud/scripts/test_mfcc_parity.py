@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the vectorized MFCC engine against the legacy MelFreqCepsCoef.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import io
+import os
+import sys
+import numpy as np
+import scipy.io.wavfile as wavfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.feature_extractor import MelFreqCepsCoef
+from app.mfcc_engine import (
+    VectorizedMFCC, extract_mfcc, extract_mfcc_batch, extract_timeline, get_extraction_plan,
+    PARITY_RTOL, PARITY_ATOL
+)
+from api_fixtures import make_wav
+
+SAMPLE_RATES = [16000, 22050, 44100, 48000]
+
+
+def assert_parity(wav_bytes):
+    """Compare the legacy and vectorized extractors on one WAV payload."""
+    legacy = MelFreqCepsCoef(io.BytesIO(wav_bytes))
+    fast = VectorizedMFCC(io.BytesIO(wav_bytes))
+    assert fast.n_frames == legacy.n_frames
+    assert fast.nl == legacy.nl
+    np.testing.assert_allclose(fast.coef, legacy.coef, rtol=PARITY_RTOL, atol=PARITY_ATOL)
+    np.testing.assert_allclose(
+        fast.mfccsscalade, legacy.mfccsscalade, rtol=PARITY_RTOL, atol=PARITY_ATOL
+    )
+
+
+def test_mono_parity():
+    """Mono signals at every supported sample rate."""
+    for fs in SAMPLE_RATES:
+        assert_parity(make_wav(fs, channels=1, seed=fs))
+
+
+def test_stereo_parity():
+    """Stereo signals are averaged the same way."""
+    for fs in (16000, 48000):
+        assert_parity(make_wav(fs, channels=2, seed=fs + 1))
+
+
+def test_frame_boundaries():
+    """Signal lengths around the frame grid produce the same frame count."""
+    fs = 16000
+    for n_samples in (480, 481, 720, 721, 959, 960, 961):
+        rng = np.random.default_rng(n_samples)
+        signal = (rng.standard_normal(n_samples) * 8000).astype(np.int16)
+        buffer = io.BytesIO()
+        wavfile.write(buffer, fs, signal)
+        assert_parity(buffer.getvalue())
+
+
+def test_custom_parameters():
+    """Non-default extractor parameters follow the legacy formulas."""
+    wav_bytes = make_wav(44100, seed=7)
+    for params in ({'n_mfcc': 13}, {'n_filters': 26, 'overlap': 75}, {'frame_length': 0.025}):
+        legacy = MelFreqCepsCoef(io.BytesIO(wav_bytes), **params)
+        fs, signal = wavfile.read(io.BytesIO(wav_bytes))
+        np.testing.assert_allclose(
+            extract_mfcc(signal, fs, **params), legacy.mfccsscalade,
+            rtol=PARITY_RTOL, atol=PARITY_ATOL
+        )
+
+
+def test_silent_input():
+    """Fully silent audio yields NaN features, as the legacy class does."""
+    buffer = io.BytesIO()
+    wavfile.write(buffer, 16000, np.zeros(16000, dtype=np.int16))
+    fast = VectorizedMFCC(io.BytesIO(buffer.getvalue()))
+    assert fast.nl == 0
+    assert np.isnan(fast.mfccsscalade).all()
+
+
+def test_plan_cache():
+    """Plans are shared per parameter tuple and cannot be modified."""
+    plan = get_extraction_plan(16000)
+    assert get_extraction_plan(16000.0, 40, 0.03, 50, 22) is plan
+    assert get_extraction_plan(48000) is not plan
+    assert not plan.mel_filter_bank.flags.writeable
+    try:
+        plan.window[0] = 0.0
+        raise AssertionError("plan arrays must be read-only")
+    except ValueError:
+        pass
+
+
+def test_batch_extraction():
+    """Batched extraction matches per-file results and isolates bad inputs."""
+    payloads = [make_wav(16000, seed=1), make_wav(48000, channels=2, seed=2),
+                make_wav(16000, seconds=0.02, seed=3), make_wav(16000, seconds=2.5, seed=4)]
+    silent = (np.zeros(16000, dtype=np.int16), 16000)
+    sources = [io.BytesIO(p) for p in payloads] + [io.BytesIO(b'not a wav'), silent]
+    for max_frames in (50000, 100):
+        for source in sources[:4]:
+            source.seek(0)
+        features, errors = extract_mfcc_batch(sources, max_frames=max_frames)
+        assert features.shape == (6, 40)
+        assert errors[4] is not None and errors[:4] == [None] * 4 and errors[5] is None
+        for row, payload in zip(features, payloads):
+            expected = MelFreqCepsCoef(io.BytesIO(payload)).mfccsscalade
+            np.testing.assert_allclose(row, expected, rtol=PARITY_RTOL, atol=PARITY_ATOL)
+        assert np.isnan(features[4]).all() and np.isnan(features[5]).all()
+
+
+def test_in_memory_sources():
+    """Bytes, file objects and arrays give the same features as each other."""
+    wav_bytes = make_wav(16000, seed=5)
+    fs, signal = wavfile.read(io.BytesIO(wav_bytes))
+    expected = VectorizedMFCC(io.BytesIO(wav_bytes)).mfccsscalade
+    np.testing.assert_array_equal(VectorizedMFCC(wav_bytes).mfccsscalade, expected)
+    np.testing.assert_array_equal(VectorizedMFCC(memoryview(wav_bytes)).mfccsscalade, expected)
+    np.testing.assert_array_equal(VectorizedMFCC(signal, fs=fs).mfccsscalade, expected)
+    try:
+        VectorizedMFCC(signal)
+        raise AssertionError("array input without a sample rate must fail")
+    except ValueError:
+        pass
+
+
+def test_timeline_extraction():
+    """Every timeline window matches extracting its slice on its own."""
+    fs = 16000
+    _, signal = wavfile.read(io.BytesIO(make_wav(fs, seconds=4, seed=11)))
+    plan = get_extraction_plan(fs)
+    # Blocks smaller than a window put block edges inside most windows
+    for block_frames in (8192, 7):
+        starts, ends, features = extract_timeline((signal, fs), window=1.0, hop=0.4,
+                                                  block_frames=block_frames)
+        assert int(round(ends[-1] * fs)) == (plan.n_frames(len(signal)) - 1) * plan.hop_size + plan.frame_size
+        for start, end, row in zip(starts, ends, features):
+            first, stop = int(round(start * fs)), int(round(end * fs))
+            # One extra sample so the slice keeps its last frame
+            expected = extract_mfcc(signal[first:stop + 1], fs)
+            np.testing.assert_allclose(row, expected, rtol=PARITY_RTOL, atol=PARITY_ATOL)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing MFCC engine parity...")
+    print("=" * 50)
+    for test in (test_mono_parity, test_stereo_parity, test_frame_boundaries,
+                 test_custom_parameters, test_silent_input, test_plan_cache, test_batch_extraction,
+                 test_in_memory_sources, test_timeline_extraction):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for lazy model loading, warm-up and eviction.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import api_client, models_dir, make_wav
+from app.model_loader import EmotionRecognitionModel
+
+
+def test_lazy_loading_and_eviction():
+    """No model loads at startup; the first request loads one, eviction frees it and the next request reloads it."""
+    with api_client(preload='') as (client, main):
+        def predict(seed):
+            response = client.post('/predict?model=SVM',
+                                   files={'file': ('clip.wav', make_wav(16000, seed=seed), 'audio/wav')})
+            assert response.status_code == 200, response.text
+
+        def status():
+            return client.get('/models').json()['model_status']
+
+        assert main.emotion_model.models == {}
+        assert all(not entry['loaded'] for entry in status().values())
+
+        predict(81)
+        svm = status()['SVM']
+        assert svm['loaded'] is True and svm['last_used'] is not None
+        assert svm['load_time_seconds'] >= 0 and svm['warmup_time_seconds'] >= 0
+        assert svm['memory_bytes'] > 0
+        assert not status()['MLP']['loaded'] and not status()['KNN']['loaded']
+
+        assert client.delete('/models/SVM').json() == {"model": "SVM", "evicted": True}
+        assert 'SVM' not in main.emotion_model.models
+        entry = status()['SVM']
+        assert entry['loaded'] is False and 'evicted_at' in entry
+        assert client.delete('/models/SVM').json()['evicted'] is False
+        assert client.delete('/models/RNN').status_code == 404
+
+        # A new clip, so the prediction cache does not answer it
+        predict(82)
+        reloaded = status()['SVM']
+        assert reloaded['loaded'] is True and reloaded['loaded_at'] > svm['loaded_at']
+
+
+def test_concurrent_use_and_eviction():
+    """Lookups racing evictions always return a model and leave the stats matching the load state."""
+    model = EmotionRecognitionModel(models_dir(), preload=['KNN'])
+    errors = []
+
+    def use():
+        try:
+            for _ in range(200):
+                assert model.get_model('KNN') is not None
+        except Exception as e:
+            errors.append(e)
+
+    def evict():
+        for _ in range(50):
+            model.evict_model('KNN')
+
+    threads = [threading.Thread(target=use) for _ in range(3)] + [threading.Thread(target=evict)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    stats = model.model_stats['KNN']
+    assert stats['loaded'] == ('KNN' in model.models)
+    assert ('last_used' in stats) == stats['loaded']
+
+
+if __name__ == "__main__":
+    print("🧪 Testing lazy model loading...")
+    print("=" * 50)
+    for test in (test_lazy_loading_and_eviction, test_concurrent_use_and_eviction):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
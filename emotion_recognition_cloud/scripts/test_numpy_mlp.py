@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the TensorFlow-free NumpyMLP runtime and its loading.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from unittest import mock
+import numpy as np
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import models_dir
+from app.numpy_mlp import NumpyMLP
+from app.model_loader import EmotionRecognitionModel
+
+
+def make_layers(rng, sizes=(40, 24, 16, 8)):
+    """Dense layers with relu, linear and softmax activations."""
+    activations = ['relu', 'linear', 'softmax']
+    return [(rng.standard_normal((n_in, n_out)) * 0.3, rng.standard_normal(n_out) * 0.1, activation)
+            for n_in, n_out, activation in zip(sizes[:-1], sizes[1:], activations)]
+
+
+def reference_forward(layers, x):
+    """Plain float64 forward pass written out layer by layer."""
+    (w1, b1, _), (w2, b2, _), (w3, b3, _) = layers
+    hidden = np.maximum(x @ w1 + b1, 0)
+    hidden = hidden @ w2 + b2
+    logits = hidden @ w3 + b3
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def test_forward_matches_reference():
+    """predict reproduces the hand-written forward pass within float32 precision."""
+    rng = np.random.default_rng(0)
+    layers = make_layers(rng)
+    x = rng.standard_normal((64, 40))
+    probabilities = NumpyMLP(layers).predict(x, verbose=0)
+    assert probabilities.dtype == np.float32 and probabilities.shape == (64, 8)
+    np.testing.assert_allclose(probabilities, reference_forward(layers, x), rtol=1e-4, atol=1e-6)
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0, atol=1e-5)
+    # Rows are scored independently of their batch
+    np.testing.assert_allclose(NumpyMLP(layers).predict(x[:1]), probabilities[:1], rtol=1e-6)
+
+    try:
+        NumpyMLP([(np.ones((2, 2)), np.zeros(2), 'gelu')])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unsupported activations must be rejected")
+
+
+def test_save_and_load():
+    """An .npz round trip keeps the weights, activations and scaler statistics."""
+    rng = np.random.default_rng(1)
+    mlp = NumpyMLP(make_layers(rng), rng.standard_normal(40), rng.random(40) + 0.5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'mlp.npz')
+        mlp.save(path)
+        loaded = NumpyMLP.load(path)
+    assert [a for _, _, a in loaded.layers] == ['relu', 'linear', 'softmax']
+    for (kernel, bias, _), (loaded_kernel, loaded_bias, _) in zip(mlp.layers, loaded.layers):
+        np.testing.assert_array_equal(kernel, loaded_kernel)
+        np.testing.assert_array_equal(bias, loaded_bias)
+    np.testing.assert_array_equal(loaded.scaler_mean, mlp.scaler_mean)
+    np.testing.assert_array_equal(loaded.scaler_scale, mlp.scaler_scale)
+
+
+def test_served_by_model_loader():
+    """load_mlp prefers the .npz without importing TensorFlow, and predict_scaled serves it."""
+    rng = np.random.default_rng(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in os.listdir(models_dir()):
+            shutil.copy(os.path.join(models_dir(), name), tmp)
+        scaler = joblib.load(os.path.join(tmp, 'feature_scaler.pkl'))
+        layers = make_layers(rng)
+        NumpyMLP(layers, scaler.mean_, scaler.scale_).save(os.path.join(tmp, 'mlp_emotion_model.npz'))
+        # A Keras file next to it is ignored
+        with open(os.path.join(tmp, 'mlp_emotion_model.h5'), 'wb') as f:
+            f.write(b'not a keras model')
+
+        # With tensorflow set to None in sys.modules, importing it raises
+        with mock.patch.dict(sys.modules, {'tensorflow': None}):
+            model = EmotionRecognitionModel(tmp, preload=['MLP'], precision='float64')
+            assert isinstance(model.get_model('MLP'), NumpyMLP)
+            x = rng.standard_normal((5, 40))
+            predicted_class_idx, probabilities = model.predict_scaled(x, 'MLP')
+            expected = reference_forward(layers, x)
+            np.testing.assert_allclose(probabilities, expected, rtol=1e-4, atol=1e-6)
+            np.testing.assert_array_equal(predicted_class_idx, expected.argmax(axis=1))
+
+            # Forcing the Keras runtime needs TensorFlow
+            with mock.patch.dict(os.environ, {'MLP_RUNTIME': 'keras'}):
+                try:
+                    model.load_mlp()
+                except ImportError:
+                    pass
+                else:
+                    raise AssertionError("MLP_RUNTIME=keras must not fall back to the .npz")
+
+        # An export made with another scaler is refused
+        NumpyMLP(layers, scaler.mean_ + 1, scaler.scale_).save(os.path.join(tmp, 'mlp_emotion_model.npz'))
+        try:
+            model.load_mlp()
+        except ValueError as e:
+            assert 'different feature scaler' in str(e)
+        else:
+            raise AssertionError("a mismatched scaler must be rejected")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the NumPy MLP runtime...")
+    print("=" * 50)
+    for test in (test_forward_matches_reference, test_save_and_load, test_served_by_model_loader):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for /predict-batch, streamed as NDJSON and not.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+import json
+import asyncio
+from unittest import mock
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import api_client, make_wav
+
+
+def batch_files():
+    """Two clips, a file with an unsupported extension, a WAV with a broken header and undecodable MP3 bytes."""
+    return [
+        ('files', ('a.wav', make_wav(16000, seed=71), 'audio/wav')),
+        ('files', ('b.wav', make_wav(22050, channels=2, seed=72), 'audio/wav')),
+        ('files', ('notes.txt', b'not audio', 'text/plain')),
+        ('files', ('broken.wav', make_wav(16000, seed=73)[:30], 'audio/wav')),
+        ('files', ('noise.mp3', b'ID3\x04' + bytes(4096), 'audio/mpeg')),
+    ]
+
+
+def stream_lines(client, files, model='SVM'):
+    response = client.post(f'/predict-batch?model={model}&stream=true', files=files)
+    assert response.status_code == 200, response.text
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    assert response.text.endswith('\n')
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_format():
+    """Every file gets one JSON line with its index, and a final end event closes the stream."""
+    with api_client() as (client, main):
+        lines = stream_lines(client, batch_files())
+        assert lines[-1] == {"event": "end", "model_used": "SVM", "total_files": 5}
+        entries = {entry['index']: entry for entry in lines[:-1]}
+        assert len(lines) == 6 and sorted(entries) == [0, 1, 2, 3, 4]
+        for i in (0, 1):
+            assert entries[i]['success'] is True
+            assert entries[i]['predicted_emotion'] in entries[i]['all_probabilities']
+        assert [entries[i]['filename'] for i in range(5)] == [name for _, (name, _, _) in batch_files()]
+
+        # The same files give the same entries without streaming
+        response = client.post('/predict-batch?model=SVM', files=batch_files())
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [dict(entry, index=i) for i, entry in enumerate(results)] == [entries[i] for i in range(5)]
+        assert main.worker_pool.in_flight == 0
+
+
+def test_stream_reports_errors_per_file():
+    """Rejected and undecodable files fail on their own line while the others succeed."""
+    with api_client() as (client, main):
+        entries = {entry['index']: entry for entry in stream_lines(client, batch_files())[:-1]}
+        assert entries[2] == {"filename": "notes.txt", "success": False,
+                              "error": "Unsupported file format", "index": 2}
+        assert entries[3]['success'] is False and 'Invalid WAV header' in entries[3]['error']
+        assert entries[4]['success'] is False and entries[4]['error'].startswith('Prediction failed:')
+
+        # Cached files are answered first, before the extraction of the rest
+        client.delete('/cache')
+        stream_lines(client, batch_files()[1:2])
+        lines = stream_lines(client, batch_files()[:2])
+        assert [line.get('index') for line in lines] == [1, 0, None]
+        assert main.worker_pool.in_flight == 0
+
+
+def test_model_errors_fail_their_files():
+    """A model that raises fails the files it was scoring, not the whole batch, streamed or not."""
+    with api_client() as (client, main):
+        with mock.patch.object(main.emotion_model, 'predict_scaled', side_effect=RuntimeError("model exploded")):
+            response = client.post('/predict-batch?model=SVM', files=batch_files())
+            assert response.status_code == 200, response.text
+            results = response.json()['results']
+            streamed = {entry['index']: entry for entry in stream_lines(client, batch_files())[:-1]}
+        for i in (0, 1):
+            assert results[i] == {"filename": batch_files()[i][1][0], "success": False,
+                                  "error": "Prediction failed: model exploded"}
+            assert streamed[i] == dict(results[i], index=i)
+        assert results[2]['error'] == "Unsupported file format"
+        assert 'Invalid WAV header' in results[3]['error']
+        assert main.worker_pool.in_flight == 0
+
+        # Nothing failed is cached, so the next batch succeeds
+        results = client.post('/predict-batch?model=SVM', files=batch_files()).json()['results']
+        assert results[0]['success'] and results[1]['success']
+
+
+def aborted_request(main, files, fail_after):
+    """
+    Call the app directly with a send that fails after fail_after messages,
+    as a broken connection would.
+
+    Returns:
+        tuple: (in-flight count once the app returned, messages sent)
+    """
+    request = httpx.Request('POST', 'http://testserver/predict-batch?model=SVM&stream=true', files=files)
+    body = request.read()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+        'scheme': 'http', 'path': '/predict-batch', 'raw_path': b'/predict-batch',
+        'query_string': b'model=SVM&stream=true', 'root_path': '',
+        'headers': [(k.lower().encode(), v.encode()) for k, v in request.headers.items()],
+        'client': ('testclient', 50000), 'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if len(sent) >= fail_after:
+            raise ConnectionResetError("client went away")
+        sent.append(message)
+
+    async def call():
+        try:
+            await main.app(scope, receive, send)
+        except ConnectionResetError:
+            pass
+        # Let cancelled chunk tasks finish unwinding
+        await asyncio.sleep(0.1)
+        return main.worker_pool.in_flight
+
+    return asyncio.run(call()), len(sent)
+
+
+def test_aborted_stream_releases_its_slot():
+    """The admission slot returns whether the response fails before its first line or midway."""
+    with api_client() as (client, main):
+        assert main.worker_pool.in_flight == 0
+        # Failing on the response start leaves the body generator unstarted
+        assert aborted_request(main, batch_files(), fail_after=0) == (0, 0)
+        assert aborted_request(main, batch_files(), fail_after=2) == (0, 2)
+        assert main.worker_pool.in_flight == 0
+        # The pool still serves complete streams afterwards
+        assert stream_lines(client, batch_files())[-1]['event'] == 'end'
+        assert main.worker_pool.in_flight == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing /predict-batch...")
+    print("=" * 50)
+    for test in (test_stream_format, test_stream_reports_errors_per_file,
+                 test_model_errors_fail_their_files, test_aborted_stream_releases_its_slot):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-level prediction cache and its /cache endpoints.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+from unittest import mock
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import api_client, make_wav
+from app import prediction_cache as cache_module
+from app.prediction_cache import LRUCache, PredictionCache
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are dropped on lookup and counted as expired misses."""
+    clock = FakeClock()
+    with mock.patch.object(cache_module.time, 'monotonic', clock):
+        cache = LRUCache(max_entries=4, ttl=10.0)
+        cache.put('a', 1)
+        clock.now += 9.0
+        assert cache.get('a') == 1
+        clock.now += 2.0
+        assert cache.get('a') is None
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['expirations'], stats['entries']) == (1, 1, 1, 0)
+
+        # A TTL of 0 keeps entries until they are evicted
+        forever = LRUCache(max_entries=4, ttl=0)
+        forever.put('a', 1)
+        clock.now += 1e9
+        assert forever.get('a') == 1
+
+
+def test_lru_eviction():
+    """The least recently used entry goes first, and lookups refresh recency."""
+    cache = LRUCache(max_entries=2, ttl=0)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+    disabled = LRUCache(max_entries=0)
+    disabled.put('a', 1)
+    assert disabled.get('a') is None and disabled.stats()['entries'] == 0
+
+
+def test_cached_values_are_read_only():
+    """Callers cannot alter the shared cached arrays."""
+    cache = PredictionCache()
+    key = cache.upload_key('digest', {'n_mfcc': 40})
+    cache.put_features(key, np.ones(40))
+    features = cache.get_features(key)
+    assert not features.flags.writeable
+    cache.put_prediction(features, 'SVM', (3, np.full(8, 0.125)))
+    predicted_class_idx, probabilities = cache.get_prediction(features, 'SVM')
+    assert predicted_class_idx == 3 and not probabilities.flags.writeable
+    assert cache.get_prediction(features, 'KNN') is None
+    # Keys depend on the extractor parameters
+    assert cache.get_features(cache.upload_key('digest', {'n_mfcc': 13})) is None
+
+
+def test_cache_endpoints():
+    """Resubmitted uploads hit the cache, /cache/stats counts it and DELETE /cache empties it."""
+    wav_bytes = make_wav(16000, seed=21)
+    with api_client() as (client, _):
+        def predict(model):
+            response = client.post(f'/predict?model={model}',
+                                   files={'file': ('clip.wav', wav_bytes, 'audio/wav')})
+            assert response.status_code == 200
+            return response.json()
+
+        first = predict('SVM')
+        stats = client.get('/cache/stats').json()
+        assert stats['features']['entries'] == 1 and stats['predictions']['entries'] == 1
+        assert stats['features']['hits'] == 0
+
+        assert predict('SVM') == first
+        predict('KNN')
+        stats = client.get('/cache/stats').json()
+        assert stats['features']['hits'] == 2
+        assert stats['predictions']['hits'] == 1
+        assert stats['predictions']['entries'] == 2
+
+        cleared = client.delete('/cache').json()
+        assert cleared['cleared'] is True
+        assert cleared['features']['entries'] == 0 and cleared['predictions']['entries'] == 0
+        # Counters survive a clear; the next request misses again
+        assert cleared['features']['hits'] == 2
+        predict('SVM')
+        assert client.get('/cache/stats').json()['features']['misses'] == stats['features']['misses'] + 1
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the prediction cache...")
+    print("=" * 50)
+    for test in (test_ttl_expiry, test_lru_eviction, test_cached_values_are_read_only,
+                 test_cache_endpoints):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the sampling profiler and its /profiling endpoints.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import api_client, make_wav
+from app.profiling import SamplingProfiler, profile_call
+
+
+def parse_collapsed(text):
+    """Map each 'frame;frame value' line to (frames tuple, value)."""
+    stacks = {}
+    for line in text.splitlines():
+        frames, _, value = line.rpartition(' ')
+        assert frames and value.isdigit(), line
+        stacks[tuple(frames.split(';'))] = int(value)
+    return stacks
+
+
+def test_collapsed_format():
+    """Stacks are merged under their root, dumped in microseconds, with ';' escaped and sub-microsecond stacks dropped."""
+    profiler = SamplingProfiler()
+    assert profiler.collapsed() == ''
+    profiler.add({('main', 'a;b'): 2500, ('main',): 999}, root=('predict', 'extract'))
+    profiler.add({('main', 'a;b'): 1500}, root=('predict', 'extract'))
+    text = profiler.collapsed()
+    assert text == 'predict;extract;main;a:b 4\n'
+    assert profiler.stats() == {'enabled': False, 'sample_rate': 0.0, 'profiles': 2, 'stacks': 2}
+
+    profiler.reset()
+    assert profiler.collapsed() == '' and profiler.stats()['profiles'] == 0
+
+
+def test_profile_call_records_stacks():
+    """profile_call returns the function's result and the stacks it ran through."""
+    def busy(n):
+        return sum(i * i for i in range(n))
+
+    result, stacks = profile_call(busy, 10000)
+    assert result == busy(10000)
+    assert stacks and all(nanoseconds >= 0 for nanoseconds in stacks.values())
+    assert any(frame.startswith('busy (') for key in stacks for frame in key)
+
+
+def test_sample_rate_validation():
+    """Sample rates outside [0, 1] are rejected and 0 never samples."""
+    for rate in (-0.1, 1.5):
+        try:
+            SamplingProfiler(rate)
+        except ValueError:
+            continue
+        raise AssertionError(f"sample rate {rate} should be rejected")
+    profiler = SamplingProfiler(0)
+    assert not any(profiler.should_sample() for _ in range(100))
+    profiler.set_sample_rate(1)
+    assert all(profiler.should_sample() for _ in range(100))
+
+
+def test_profiling_endpoints():
+    """PUT /profiling toggles sampling, profiled requests fill /profiling/stacks and DELETE clears it."""
+    wav_bytes = make_wav(16000, seed=51)
+    with api_client() as (client, _):
+        def predict():
+            response = client.post('/predict?model=SVM', files={'file': ('clip.wav', wav_bytes, 'audio/wav')})
+            assert response.status_code == 200, response.text
+            return response.json()
+
+        assert client.get('/profiling').json()['enabled'] is False
+        unprofiled = predict()
+        assert client.get('/profiling/stacks').text == ''
+
+        for rate in (-1, 2, 'x'):
+            assert client.put(f'/profiling?sample_rate={rate}').status_code == 422
+        assert client.put('/profiling').status_code == 422
+
+        stats = client.put('/profiling?sample_rate=1').json()
+        assert stats['enabled'] is True and stats['sample_rate'] == 1.0
+        client.delete('/cache')
+        # A profiled request is scored on its own and answers the same
+        assert predict()['all_probabilities'] == unprofiled['all_probabilities']
+        assert client.get('/profiling').json()['profiles'] == 2
+
+        response = client.get('/profiling/stacks')
+        assert response.headers['content-type'].startswith('text/plain')
+        stacks = parse_collapsed(response.text)
+        roots = {key[:2] for key in stacks}
+        assert roots == {('predict', 'extract'), ('predict', 'inference')}, roots
+        assert all(value > 0 for value in stacks.values())
+
+        cleared = client.delete('/profiling/stacks').json()
+        assert cleared['profiles'] == 0 and cleared['stacks'] == 0 and cleared['enabled'] is True
+        assert client.get('/profiling/stacks').text == ''
+
+        assert client.put('/profiling?sample_rate=0').json()['enabled'] is False
+        client.delete('/cache')
+        predict()
+        assert client.get('/profiling').json()['profiles'] == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the request profiler...")
+    print("=" * 50)
+    for test in (test_collapsed_format, test_profile_call_records_stacks, test_sample_rate_validation,
+                 test_profiling_endpoints):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental, memory-mapped and rolling-window extraction.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import io
+import os
+import sys
+import tempfile
+from unittest import mock
+import numpy as np
+import soundfile
+import scipy.io.wavfile as wavfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.feature_extractor import MelFreqCepsCoef
+from app.mfcc_engine import (
+    extract_mfcc, extract_mfcc_batch, extract_timeline, get_extraction_plan, PARITY_RTOL, PARITY_ATOL
+)
+from app.streaming import IncrementalMFCC, StreamSession, extract_file_mmap
+from api_fixtures import make_wav
+
+
+
+def test_incremental_extraction():
+    """Chunked pushes reproduce the whole-signal feature vector."""
+    rng = np.random.default_rng(7)
+    for fs, channels in ((16000, 1), (44100, 2)):
+        wav_bytes = make_wav(fs, channels=channels, seed=fs)
+        _, signal = wavfile.read(io.BytesIO(wav_bytes))
+        flat = signal.reshape(-1)
+        extractor = IncrementalMFCC(fs, channels=channels)
+        position = 0
+        while position < len(flat):
+            size = int(rng.integers(1, 4000)) * channels
+            extractor.push(flat[position:position + size])
+            position += size
+        legacy = MelFreqCepsCoef(io.BytesIO(wav_bytes))
+        assert extractor.n_frames == legacy.n_frames
+        np.testing.assert_allclose(
+            extractor.finalize(), legacy.mfccsscalade, rtol=PARITY_RTOL, atol=PARITY_ATOL
+        )
+
+    # Snapshots follow the prefix seen so far; silence alone yields NaN
+    _, signal = wavfile.read(io.BytesIO(make_wav(16000, seed=3)))
+    extractor = IncrementalMFCC(16000)
+    extractor.push(signal[:8000])
+    np.testing.assert_allclose(
+        extractor.snapshot(), extract_mfcc(signal[:8000], 16000), rtol=PARITY_RTOL, atol=PARITY_ATOL
+    )
+    silent = IncrementalMFCC(16000)
+    silent.push(np.zeros(16000, dtype=np.int16))
+    assert np.isnan(silent.finalize()).all()
+
+
+def test_mmap_extraction():
+    """Block-wise extraction from a memory-mapped WAV file."""
+    for channels in (1, 2):
+        wav_bytes = make_wav(22050, seconds=2, channels=channels, seed=channels)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'clip.wav')
+            with open(path, 'wb') as f:
+                f.write(wav_bytes)
+            features = extract_file_mmap(path, block_samples=1000)
+        legacy = MelFreqCepsCoef(io.BytesIO(wav_bytes))
+        np.testing.assert_allclose(features, legacy.mfccsscalade, rtol=PARITY_RTOL, atol=PARITY_ATOL)
+
+
+def test_block_read_sources():
+    """Batches and timelines of spooled and compressed files are read in blocks, same results."""
+    wav_bytes = make_wav(22050, seconds=4, channels=2, seed=14)
+    _, signal = wavfile.read(io.BytesIO(wav_bytes))
+    flac = io.BytesIO()
+    soundfile.write(flac, signal, 22050, format='FLAC')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'clip.wav')
+        with open(path, 'wb') as f:
+            f.write(wav_bytes)
+        for sample_rate in (None, 16000):
+            expected_batch, _ = extract_mfcc_batch([wav_bytes], sample_rate=sample_rate)
+            expected_timeline = extract_timeline(wav_bytes, window=1.0, hop=0.4, sample_rate=sample_rate)
+            with mock.patch('app.mfcc_engine.MMAP_MIN_BYTES', 0), \
+                    mock.patch('app.mfcc_engine.load_audio', side_effect=AssertionError("loaded whole")):
+                features, errors = extract_mfcc_batch([path, flac.getvalue()], sample_rate=sample_rate)
+                timelines = [extract_timeline(source, window=1.0, hop=0.4, sample_rate=sample_rate)
+                             for source in (path, flac.getvalue())]
+            assert errors == [None, None]
+            for row in features:
+                np.testing.assert_allclose(row, expected_batch[0], rtol=PARITY_RTOL, atol=PARITY_ATOL)
+            for timeline in timelines:
+                for actual, expected in zip(timeline, expected_timeline):
+                    np.testing.assert_allclose(actual, expected, rtol=PARITY_RTOL, atol=PARITY_ATOL)
+
+
+def test_stream_session_windows():
+    """Every streamed window matches extracting its slice on its own, silent windows included."""
+    rng = np.random.default_rng(12)
+    for fs, channels in ((16000, 1), (22050, 2)):
+        _, clip = wavfile.read(io.BytesIO(make_wav(fs, seconds=2, channels=channels, seed=fs)))
+        silence = np.zeros((fs,) + clip.shape[1:], dtype=np.int16)
+        signal = np.concatenate([clip, silence, clip])
+        session = StreamSession(fs, channels, window=0.5, hop=0.2)
+        flat = signal.reshape(-1)
+        windows, position = [], 0
+        while position < len(flat):
+            size = int(rng.integers(1, 3000)) * channels
+            windows += session.push(flat[position:position + size])
+            position += size
+        windows += session.finish()
+
+        plan = get_extraction_plan(fs)
+        assert len(windows) >= (plan.n_frames(len(signal)) - session.window_frames) // session.hop_frames
+        unvoiced = 0
+        for w in windows:
+            first, stop = int(round(w['start'] * fs)), int(round(w['end'] * fs))
+            # One extra sample so the slice keeps its last frame
+            expected = extract_mfcc(signal[first:stop + 1], fs)
+            if np.isnan(expected).all():
+                unvoiced += 1
+                assert np.isnan(w['features']).all(), (w['start'], w['end'])
+            else:
+                np.testing.assert_allclose(w['features'], expected, rtol=PARITY_RTOL, atol=PARITY_ATOL)
+        assert unvoiced > 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing streaming extraction...")
+    print("=" * 50)
+    for test in (test_incremental_extraction, test_mmap_extraction, test_block_read_sources,
+                 test_stream_session_windows):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
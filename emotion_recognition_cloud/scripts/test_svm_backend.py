@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the SVMScorer serving backend against scikit-learn.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+import tempfile
+import warnings
+import numpy as np
+from sklearn.svm import SVC
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.svm_backend import SVMScorer, RFFSVMScorer
+
+KERNELS = ('rbf', 'linear', 'poly', 'sigmoid')
+
+
+def make_data(n_classes, seed=0):
+    """Training vectors with string labels and unseen queries."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((160, 6))
+    if n_classes == 2:
+        y = np.where(X[:, 0] + 0.5 * X[:, 2] > 0, 'pos', 'neg')
+    else:
+        y = np.array(['angry', 'calm', 'happy', 'sad'])[(X[:, 0] > 0) * 2 + (X[:, 1] > 0)]
+    return X, y, rng.standard_normal((50, 6))
+
+
+def fit_svc(X, y, **params):
+    """Fit an SVC, silencing the deprecation of probability=True in recent scikit-learn."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        model = SVC(random_state=0, **params).fit(X, y)
+        scorer = SVMScorer.from_sklearn(model)
+    return model, scorer
+
+
+def sklearn_proba(model, X):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        return model.predict_proba(X)
+
+
+def test_multiclass_probability_parity():
+    """Labels and coupled probabilities match SVC for every kernel."""
+    X, y, queries = make_data(4)
+    for kernel in KERNELS:
+        model, scorer = fit_svc(X, y, kernel=kernel, probability=True)
+        predicted, probabilities = scorer.predict_with_proba(queries)
+        np.testing.assert_array_equal(predicted, model.predict(queries))
+        np.testing.assert_allclose(probabilities, sklearn_proba(model, queries), atol=1e-10)
+
+
+def test_binary_probability_parity():
+    """Two-class models keep libsvm's sign convention and two probability columns."""
+    X, y, queries = make_data(2, seed=1)
+    for kernel in KERNELS:
+        model, scorer = fit_svc(X, y, kernel=kernel, probability=True)
+        predicted, probabilities = scorer.predict_with_proba(queries)
+        np.testing.assert_array_equal(predicted, model.predict(queries))
+        np.testing.assert_allclose(probabilities, sklearn_proba(model, queries), atol=1e-10)
+        # scikit-learn flips the libsvm decision value for binary problems
+        np.testing.assert_allclose(scorer.decision_values(queries)[:, 0],
+                                   -model.decision_function(queries), atol=1e-10)
+
+
+def test_without_probabilities():
+    """Models trained without probability=True vote like SVC and return one-hot rows."""
+    for n_classes in (4, 2):
+        X, y, queries = make_data(n_classes, seed=2 + n_classes)
+        for kernel in KERNELS:
+            model, scorer = fit_svc(X, y, kernel=kernel, decision_function_shape='ovo')
+            assert scorer.prob_a is None
+            predicted, probabilities = scorer.predict_with_proba(queries)
+            np.testing.assert_array_equal(predicted, model.predict(queries))
+            assert probabilities.shape == (len(queries), n_classes)
+            np.testing.assert_array_equal(probabilities.sum(axis=1), 1.0)
+            np.testing.assert_array_equal(scorer.classes_[probabilities.argmax(axis=1)], predicted)
+            if n_classes > 2:
+                np.testing.assert_allclose(scorer.decision_values(queries),
+                                           model.decision_function(queries), atol=1e-10)
+
+
+def test_rff_approximation():
+    """The RFF scorer agrees with the exact one on most labels and survives a save/load."""
+    X, y, queries = make_data(4, seed=7)
+    _, scorer = fit_svc(X, y, kernel='rbf', probability=True)
+    approx = RFFSVMScorer.from_scorer(scorer, n_components=4096)
+    agreement = np.mean(approx.predict(queries) == scorer.predict(queries))
+    assert agreement >= 0.9, f"RFF agreement {agreement:.2f}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'svm_emotion_rff.npz')
+        approx.save(path)
+        loaded = RFFSVMScorer.load(path)
+    predicted, probabilities = approx.predict_with_proba(queries)
+    loaded_predicted, loaded_probabilities = loaded.predict_with_proba(queries)
+    np.testing.assert_array_equal(loaded_predicted, predicted)
+    np.testing.assert_allclose(loaded_probabilities, probabilities)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing SVM backend parity...")
+    print("=" * 50)
+    for test in (test_multiclass_probability_parity, test_binary_probability_parity,
+                 test_without_probabilities, test_rff_approximation):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for /predict-timeline: window boundaries and silent segments.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import io
+import os
+import sys
+import numpy as np
+import scipy.io.wavfile as wavfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.mfcc_engine import extract_mfcc, get_extraction_plan, window_frame_counts
+from api_fixtures import api_client, make_wav
+
+
+def speech_and_silence(fs):
+    """Two seconds of clip, two of digital silence and two more of clip."""
+    _, clip = wavfile.read(io.BytesIO(make_wav(fs, seconds=2, seed=91)))
+    signal = np.concatenate([clip, np.zeros(2 * fs, dtype=np.int16), clip])
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, signal)
+    return signal, buffer.getvalue()
+
+
+def test_segments_match_their_slices():
+    """Segments start every hop, the last ends on the last frame, and each scores like its slice."""
+    fs = 16000
+    signal, wav_bytes = speech_and_silence(fs)
+    plan = get_extraction_plan(fs)
+    window_frames, hop_frames = window_frame_counts(plan, 1.0, 0.5)
+    with api_client() as (client, main):
+        response = client.post('/predict-timeline?model=SVM&window=1&hop=0.5',
+                               files={'file': ('talk.wav', wav_bytes, 'audio/wav')})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        segments = body['segments']
+        assert (body['window'], body['hop']) == (1.0, 0.5)
+
+        n_frames = plan.n_frames(len(signal))
+        n_full = (n_frames - window_frames) // hop_frames + 1
+        assert len(segments) == n_full + 1
+        length = ((window_frames - 1) * plan.hop_size + plan.frame_size) / fs
+        for i, segment in enumerate(segments[:n_full]):
+            assert segment['start'] == round(i * hop_frames * plan.hop_size / fs, 3)
+            assert abs(segment['end'] - segment['start'] - length) < 2e-3
+        # The final window ends on the last frame, covering the frames after the last hop
+        assert segments[-1]['end'] == round(((n_frames - 1) * plan.hop_size + plan.frame_size) / fs, 3)
+
+        silent = 0
+        for segment in segments:
+            first = int(round(segment['start'] * fs / plan.hop_size)) * plan.hop_size
+            stop = first + (window_frames - 1) * plan.hop_size + plan.frame_size
+            # One extra sample so the slice keeps its last frame
+            expected = extract_mfcc(signal[first:stop + 1], fs, precision=main.emotion_model.precision)
+            if np.isnan(expected).all():
+                silent += 1
+                assert segment['predicted_emotion'] is None
+                assert segment['confidence'] is None and segment['probabilities'] is None
+                continue
+            idx, probabilities = main.emotion_model.predict_features(expected[None, :], 'SVM')
+            assert segment['predicted_emotion'] == main.emotion_model.label_encoder.classes_[idx[0]]
+            np.testing.assert_allclose(segment['probabilities'], probabilities[0], atol=2e-4)
+        assert silent > 0
+
+
+def test_clip_shorter_than_window():
+    """A clip shorter than the window gives one segment covering all of it."""
+    fs = 16000
+    wav_bytes = make_wav(fs, seconds=0.8, seed=92)
+    with api_client() as (client, _):
+        response = client.post('/predict-timeline?model=SVM&window=3&hop=1',
+                               files={'file': ('short.wav', wav_bytes, 'audio/wav')})
+        assert response.status_code == 200, response.text
+        segments = response.json()['segments']
+        assert len(segments) == 1
+        assert segments[0]['start'] == 0.0 and segments[0]['end'] <= 0.8
+        assert segments[0]['predicted_emotion'] is not None
+
+
+if __name__ == "__main__":
+    print("🧪 Testing /predict-timeline...")
+    print("=" * 50)
+    for test in (test_segments_match_their_slices, test_clip_shorter_than_window):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tests for the upload limits and WAV sample type handling.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import io
+import os
+import sys
+import struct
+import asyncio
+import tempfile
+from unittest import mock
+import numpy as np
+import soundfile
+import scipy.io.wavfile as wavfile
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import api_client, make_wav
+from app import mfcc_engine
+from app.mfcc_engine import extract_features
+from app.uploads import (
+    UploadLimits, UploadRejected, RequestSizeLimitMiddleware, check_header, receive_upload
+)
+
+
+def patch_wav(wav_bytes, offset, fmt, value):
+    """Overwrite one field of the canonical 44-byte header scipy writes."""
+    data = bytearray(wav_bytes)
+    struct.pack_into(fmt, data, offset, value)
+    return bytes(data)
+
+
+def rejection(fn, *args):
+    """Status code of the UploadRejected raised by fn, or None."""
+    try:
+        fn(*args)
+    except UploadRejected as e:
+        return e.status_code
+    return None
+
+
+def receive(data, limits, declared_size=None):
+    """Run receive_upload on bytes, as multipart parsing would hand them over."""
+    return asyncio.run(receive_upload(UploadFile(io.BytesIO(data), size=declared_size), limits))
+
+
+def encodings(fs=16000, channels=1, seed=0):
+    """The same clip as int16, float32, 24-bit, 32-bit and 8-bit WAV bytes, the clip quantized to 8 bits first."""
+    _, signal = wavfile.read(io.BytesIO(make_wav(fs, channels=channels, seed=seed)))
+    # Keeping only the top 8 bits lets every encoding hold the clip exactly
+    signal = (signal // 256 * 256).astype(np.int16)
+    variants = {
+        'int16': signal,
+        'float32': signal.astype(np.float32) / 32768,
+        'int32': signal.astype(np.int32) << 16,
+        'uint8': (signal // 256 + 128).astype(np.uint8),
+    }
+    encoded = {}
+    for name, samples in variants.items():
+        buffer = io.BytesIO()
+        wavfile.write(buffer, fs, samples)
+        encoded[name] = buffer.getvalue()
+    # wavfile writes no 24-bit PCM
+    buffer = io.BytesIO()
+    soundfile.write(buffer, variants['int32'], fs, format='WAV', subtype='PCM_24')
+    encoded['int24'] = buffer.getvalue()
+    return encoded
+
+
+def test_check_header():
+    """Headers are accepted or rejected with 415, 400 or 413 before any sample is read."""
+    limits = UploadLimits(max_seconds=2.0, max_sample_rate=48000, max_channels=2)
+    wav_bytes = make_wav(16000, seconds=1.5, channels=2)
+    header = check_header(wav_bytes, limits)
+    assert (header.sample_rate, header.channels, header.bits_per_sample) == (16000, 2, 16)
+    assert header.duration == 1.5
+    # Other containers are left to the decoder
+    assert check_header(b'fLaC' + bytes(60), limits) is None
+    assert check_header(b'ID3\x04' + bytes(60), limits) is None
+
+    assert rejection(check_header, b'not audio at all', limits) == 415
+    assert rejection(check_header, patch_wav(wav_bytes, 20, '<H', 0x0002), limits) == 415  # ADPCM
+    assert rejection(check_header, patch_wav(wav_bytes, 24, '<I', 96000), limits) == 415
+    assert rejection(check_header, patch_wav(wav_bytes, 22, '<H', 6), limits) == 415
+    assert rejection(check_header, patch_wav(wav_bytes, 22, '<H', 0), limits) == 415
+    assert rejection(check_header, wav_bytes[:30], limits) == 400
+    assert rejection(check_header, wav_bytes[:36], limits) == 400
+    assert rejection(check_header, b'RIFF\x00\x00\x00\x00WAVEdata' + bytes(8), limits) == 400
+    assert rejection(check_header, make_wav(16000, seconds=2.5), limits) == 413
+
+
+def test_receive_upload_limits():
+    """Oversized files answer 413 whether or not their size is declared, and large ones are spooled."""
+    wav_bytes = make_wav(16000, seconds=1.0)
+    limits = UploadLimits(max_bytes=len(wav_bytes) - 1)
+    assert rejection(receive, wav_bytes, limits, len(wav_bytes)) == 413
+    assert rejection(receive, wav_bytes, limits) == 413
+
+    upload = receive(wav_bytes, UploadLimits(spool_bytes=len(wav_bytes)))
+    assert not upload.spooled and upload.source == wav_bytes and upload.size == len(wav_bytes)
+
+    # Spooling starts once the body outgrows the header read
+    long_wav = make_wav(16000, seconds=3.0)
+    with receive(long_wav, UploadLimits(spool_bytes=1024)) as upload:
+        assert upload.spooled and upload.header.duration == 3.0
+        with open(upload.source, 'rb') as f:
+            assert f.read() == long_wav
+    assert not os.path.exists(upload.source)
+
+    # A streamed WAV leaves its data size open and is bounded by the file size
+    streamed = patch_wav(make_wav(16000, seconds=3.0), 40, '<I', 0xFFFFFFFF)
+    assert check_header(streamed, UploadLimits(max_seconds=2.0)).duration is None
+    assert rejection(receive, streamed, UploadLimits(max_seconds=2.0)) == 413
+    assert receive(streamed, UploadLimits(max_seconds=4.0)).size == len(streamed)
+
+
+def test_predict_status_codes():
+    """/predict answers 413, 415 and 400 for the uploads the limits reject."""
+    wav_bytes = make_wav(16000, seconds=1.5)
+    with api_client() as (client, main):
+        def post(data, filename='clip.wav'):
+            response = client.post('/predict?model=SVM', files={'file': (filename, data, 'audio/wav')})
+            return response.status_code, response.json()['detail']
+
+        assert client.post('/predict?model=SVM', files={'file': ('clip.wav', wav_bytes, 'audio/wav')}).status_code == 200
+        with mock.patch.object(main.upload_limits, 'max_bytes', len(wav_bytes) - 1):
+            status, detail = post(wav_bytes)
+            assert status == 413 and 'upload limit' in detail
+        with mock.patch.object(main.upload_limits, 'max_seconds', 1.0):
+            status, detail = post(wav_bytes)
+            assert status == 413 and '1.5 s' in detail
+        status, detail = post(patch_wav(wav_bytes, 20, '<H', 0x0055))  # MPEG layer 3 inside RIFF
+        assert status == 415 and 'codec' in detail
+        assert post(b'\x00' * 4096)[0] == 415
+        assert post(wav_bytes, 'clip.txt')[0] == 415
+        status, detail = post(wav_bytes[:30])
+        assert status == 400 and 'Invalid WAV header' in detail
+
+
+def test_request_size_middleware():
+    """Bodies over the limit answer 413, declared or not, and smaller ones reach the app."""
+    async def echo(request):
+        return PlainTextResponse(str(len(await request.body())))
+
+    app = Starlette(routes=[Route('/', echo, methods=['POST'])])
+    app.add_middleware(RequestSizeLimitMiddleware, max_bytes=1000)
+    with TestClient(app) as client:
+        assert client.post('/', content=bytes(1000)).text == '1000'
+        response = client.post('/', content=bytes(1001))
+        assert response.status_code == 413 and '1000 byte limit' in response.json()['detail']
+        # Without a Content-Length the received bytes are counted
+        response = client.post('/', content=iter([bytes(600), bytes(600)]))
+        assert response.status_code == 413
+
+
+def test_sample_types_give_matching_features():
+    """Float, 8-, 24- and 32-bit WAVs give the features of the int16 WAV, in memory and memory-mapped."""
+    for channels in (1, 2):
+        encoded = encodings(channels=channels, seed=61)
+        expected = extract_features(encoded['int16'])
+        assert np.all(np.isfinite(expected)) and np.ptp(expected) > 1
+        for name, wav_bytes in encoded.items():
+            np.testing.assert_allclose(extract_features(wav_bytes), expected, rtol=1e-6, atol=1e-6,
+                                       err_msg=f"{name}, {channels} channel(s)")
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(mfcc_engine, 'MMAP_MIN_BYTES', 0):
+            for name, wav_bytes in encoded.items():
+                path = os.path.join(tmp, f'{name}.wav')
+                with open(path, 'wb') as f:
+                    f.write(wav_bytes)
+                np.testing.assert_allclose(extract_features(path), expected, rtol=1e-6, atol=1e-6,
+                                           err_msg=f"memory-mapped {name}, {channels} channel(s)")
+
+
+def test_float_upload_predicts_like_int16():
+    """/predict answers the same for the float and int16 WAV of a clip."""
+    encoded = encodings(seed=62)
+    with api_client() as (client, _):
+        bodies = [client.post('/predict?model=SVM', files={'file': ('clip.wav', encoded[name], 'audio/wav')}).json()
+                  for name in ('int16', 'float32')]
+    assert bodies[0]['success'] and bodies[1]['success']
+    for emotion, probability in bodies[0]['all_probabilities'].items():
+        assert abs(bodies[1]['all_probabilities'][emotion] - probability) < 1e-4, emotion
+
+
+if __name__ == "__main__":
+    print("🧪 Testing upload limits...")
+    print("=" * 50)
+    for test in (test_check_header, test_receive_upload_limits, test_predict_status_codes,
+                 test_request_size_middleware, test_sample_types_give_matching_features, test_float_upload_predicts_like_int16):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
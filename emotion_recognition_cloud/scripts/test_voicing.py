@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched voicing gates against the legacy per-frame rule.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import io
+import os
+import sys
+import numpy as np
+import scipy.io.wavfile as wavfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.mfcc_engine import VectorizedMFCC, frame_signal, get_extraction_plan, to_mono
+from app.voicing import AutocorrelationVoicing, EnergyVoicing, EnergyZCRVoicing
+from api_fixtures import make_wav
+
+
+
+def test_voicing_detectors():
+    """Batched gates reproduce the per-frame np.correlate rule."""
+    wav_bytes = make_wav(16000, seed=3)
+    fs, signal = wavfile.read(io.BytesIO(wav_bytes))
+    plan = get_extraction_plan(fs)
+    frames = frame_signal(to_mono(signal), plan)
+    expected = np.array([np.amax(np.correlate(f, f, mode='full')[20:]) > 0.1 for f in frames])
+    np.testing.assert_array_equal(EnergyVoicing()(frames), expected)
+    np.testing.assert_array_equal(AutocorrelationVoicing()(frames), expected)
+    # The zero-crossing gate only ever removes frames
+    assert not np.any(EnergyZCRVoicing()(frames) & ~expected)
+    fast = VectorizedMFCC(io.BytesIO(wav_bytes), voicing='autocorr')
+    np.testing.assert_array_equal(fast.voiced, expected)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing voicing gates...")
+    print("=" * 50)
+    for test in (test_voicing_detectors,):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
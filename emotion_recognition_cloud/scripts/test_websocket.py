@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the /ws/predict streaming endpoint.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+import json
+from unittest import mock
+import numpy as np
+from starlette.websockets import WebSocketDisconnect
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_fixtures import api_client
+
+
+def reject_constant(token):
+    raise ValueError(f"{token} is not valid JSON")
+
+
+def noise(seconds, fs=8000, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * fs)) * 3000).astype('<i2')
+
+
+def stream_pcm(client, pcm, fs=8000, query='window=1&hop=1'):
+    """
+    Stream int16 samples in 0.5 s messages, then "end".
+
+    Returns:
+        list: The text messages received parsed as JSON, then the close code
+    """
+    messages = []
+    with client.websocket_connect(f'/ws/predict?model=SVM&sample_rate={fs}&{query}') as ws:
+        try:
+            for start in range(0, len(pcm), fs // 2):
+                ws.send_bytes(pcm[start:start + fs // 2].tobytes())
+            ws.send_text('end')
+            while True:
+                # Parsed strictly, so NaN tokens fail
+                messages.append(json.loads(ws.receive_text(), parse_constant=reject_constant))
+        except WebSocketDisconnect as e:
+            messages.append(e.code)
+    return messages
+
+
+def test_streams_unbounded_by_default():
+    """MAX_AUDIO_SECONDS only limits uploads; WebSocket streams run as long as the client sends."""
+    with api_client() as (client, main):
+        with mock.patch.object(main.upload_limits, 'max_seconds', 1.0):
+            messages = stream_pcm(client, noise(3))
+        assert main.worker_pool.in_flight == 0
+    assert messages[-2]['event'] == 'end' and messages[-2]['duration'] == 3.0
+    assert all(m['success'] for m in messages[:-2]), messages[:-2]
+
+
+def test_max_stream_seconds():
+    """With MAX_STREAM_SECONDS set, longer streams get an error and close code 1009."""
+    with api_client() as (client, main):
+        with mock.patch.object(main, 'MAX_STREAM_SECONDS', 1.5):
+            messages = stream_pcm(client, noise(3))
+    assert messages[-1] == 1009
+    assert messages[-2] == {"success": False, "error": "Stream exceeds 1.5 s"}
+
+
+def test_unvoiced_windows_are_null():
+    """Silent windows are sent with null predictions instead of scoring NaN features."""
+    pcm = np.concatenate([noise(1), np.zeros(16000, dtype='<i2'), noise(1, seed=1)])
+    with api_client() as (client, _):
+        messages = stream_pcm(client, pcm, query='window=0.5&hop=0.5')
+    windows = messages[:-2]
+    assert messages[-2]['event'] == 'end' and messages[-2]['windows'] == len(windows)
+    silent = [w for w in windows if w['start'] >= 1.0 and w['end'] <= 3.0]
+    assert silent and all(w['predicted_emotion'] is None and w['all_probabilities'] is None
+                          and w['confidence'] is None for w in silent)
+    assert windows[0]['predicted_emotion'] in windows[0]['all_probabilities']
+    assert all(w['success'] for w in windows)
+
+
+def test_stream_holds_an_admission_slot():
+    """An open stream holds one slot, and a saturated server closes new streams with 1013."""
+    with api_client() as (client, main):
+        with client.websocket_connect('/ws/predict?model=SVM&sample_rate=8000&window=0.5&hop=0.5') as ws:
+            ws.send_bytes(noise(1).tobytes())
+            # A window arriving shows the stream is being served
+            assert ws.receive_json()['success'] is True
+            assert main.worker_pool.in_flight == 1
+            ws.send_text('end')
+            while 'event' not in ws.receive_json():
+                pass
+        assert main.worker_pool.in_flight == 0
+
+        with mock.patch.object(type(main.worker_pool), 'capacity', 0):
+            messages = stream_pcm(client, noise(1))
+        assert messages[-1] == 1013
+        assert messages[0]['success'] is False and 'Server busy' in messages[0]['error']
+        assert main.worker_pool.in_flight == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the WebSocket endpoint...")
+    print("=" * 50)
+    for test in (test_streams_unbounded_by_default, test_max_stream_seconds,
+                 test_unvoiced_windows_are_null, test_stream_holds_an_admission_slot):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the WorkerPool admission control and the 429/503 back-pressure paths.
+Run directly or through pytest from the emotion_recognition_cloud directory.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.workers import WorkerPool, ServiceSaturated
+from api_fixtures import api_client, make_wav
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll condition until it holds or timeout seconds have passed."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_timed_out_work_holds_its_slot():
+    """A running task abandoned by a timeout keeps a slot until it finishes; a queued one is cancelled."""
+    pool = WorkerPool(extraction_workers=1, inference_workers=1, max_queue_depth=1,
+                      request_timeout=0.1)
+    finished = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(pool.run_inference(finished.wait, 5))
+        queued = asyncio.ensure_future(pool.run_inference(time.sleep, 0))
+        for task in (running, queued):
+            try:
+                await task
+                raise AssertionError("Expected a timeout")
+            except asyncio.TimeoutError:
+                pass
+        await asyncio.sleep(0.05)
+        # Only the running task still holds a slot
+        assert pool.in_flight == 1
+        pool.acquire()
+        try:
+            pool.acquire()
+            raise AssertionError("Expected ServiceSaturated")
+        except ServiceSaturated:
+            pass
+        pool.release()
+
+        finished.set()
+        for _ in range(100):
+            if pool.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.in_flight == 0
+
+    try:
+        asyncio.run(main())
+    finally:
+        finished.set()
+        pool.shutdown()
+
+
+def test_saturated_pool_returns_429():
+    """Requests beyond the capacity are rejected with 429 and a Retry-After header."""
+    with api_client() as (client, main):
+        pool = main.worker_pool
+        held = pool.capacity - pool.in_flight
+        for _ in range(held):
+            pool.acquire()
+        try:
+            response = client.post('/predict', files={'file': ('a.wav', make_wav(16000), 'audio/wav')})
+        finally:
+            for _ in range(held):
+                pool.release()
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        assert pool.in_flight == 0
+
+        response = client.post('/predict', files={'file': ('a.wav', make_wav(16000), 'audio/wav')})
+        assert response.status_code == 200
+
+
+def test_timeout_returns_503_and_holds_slot():
+    """A stage that times out returns 503 and its slot is released only when the work ends."""
+    finished = threading.Event()
+    with api_client() as (client, main):
+        pool = main.worker_pool
+        predict_scaled = main.emotion_model.predict_scaled
+
+        def slow_predict(features_scaled, model_name):
+            finished.wait(5)
+            return predict_scaled(features_scaled, model_name)
+
+        try:
+            with mock.patch.object(main.emotion_model, 'predict_scaled', slow_predict), \
+                    mock.patch.object(pool, 'request_timeout', 0.2):
+                response = client.post('/predict', files={'file': ('a.wav', make_wav(16000), 'audio/wav')})
+                assert response.status_code == 503
+                assert pool.in_flight == 1
+                finished.set()
+                assert wait_until(lambda: pool.in_flight == 0)
+        finally:
+            finished.set()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing worker pool admission...")
+    print("=" * 50)
+    for test in (test_timed_out_work_holds_its_slot, test_saturated_pool_returns_429,
+                 test_timeout_returns_503_and_holds_slot):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")